@@ -0,0 +1,266 @@
+"""Micro-benchmarks for the coordinator and sensor hot path.
+
+Run from the repository root:
+
+    python benchmarks/bench_hot_path.py            # compare with baselines
+    python benchmarks/bench_hot_path.py --save     # record new baselines
+
+Everything runs offline: ``dt_util.utcnow`` is frozen and the aiohttp
+session is replaced by one that serves a canned JSON body, so the numbers
+cover the API client's decoding, the coordinator's ``exp`` scan and the
+sensors' property getters, not the network.
+
+Each case reports the best time per call and the peak memory allocated
+during one call (tracemalloc). Against saved baselines, a case that is
+slower or allocates more than the tolerance allows is reported as a
+regression and the script exits with status 1. Differences under 1 us or
+1 KiB are ignored, so sub-microsecond cases do not flake. Baselines are
+machine specific; record them on the machine that runs the comparison.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.localvolts.coordinator import (  # noqa: E402
+    LocalvoltsDataUpdateCoordinator,
+)
+from custom_components.localvolts.ratelimit import RequestScheduler  # noqa: E402
+from custom_components.localvolts import sensor  # noqa: E402
+
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+
+NOW = datetime.datetime(2024, 5, 3, 12, 0, 1, tzinfo=datetime.timezone.utc)
+PAYLOAD_SIZES = (1, 288, 10_000)
+REPEATS = 5
+DEFAULT_TOLERANCE = 0.5
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_SLOWDOWN_US = 1.0
+
+
+def make_payload(rows):
+    """Return a JSON body of ``rows`` intervals ending with the current 'exp'."""
+    records = []
+    for n in range(rows):
+        interval_end = NOW.replace(second=0) + datetime.timedelta(minutes=5 * (n - rows + 1))
+        records.append(
+            {
+                "quality": "exp" if n == rows - 1 else "act",
+                "intervalEnd": interval_end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "lastUpdate": (interval_end - datetime.timedelta(minutes=4, seconds=40))
+                .strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                "NMI": "1234567890",
+                "costsAll": 3.41,
+                "costsFlexUp": 27.2,
+                "earningsFlexUp": 8.5,
+                "importsAll": 0.112,
+                "exportsAll": 0.0,
+                "demandInterval": 0,
+            }
+        )
+    return json.dumps(records).encode()
+
+
+class FakeResponse:
+    """Successful response serving a fixed body, whole or in chunks."""
+
+    status = 200
+    headers = {}
+
+    def __init__(self, body):
+        self._body = body
+        self.content = self
+
+    async def json(self):
+        return json.loads(self._body)
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self._body), size):
+            yield self._body[start : start + size]
+
+    def raise_for_status(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Session whose every GET returns the same body."""
+
+    def __init__(self, body):
+        self.body = body
+
+    def get(self, url, headers=None):
+        return FakeResponse(self.body)
+
+
+def make_coordinator():
+    """Return a coordinator whose client is not rate limited."""
+    coordinator = LocalvoltsDataUpdateCoordinator(
+        MagicMock(), "key", "partner", "1234567890", forecast_hours=0
+    )
+    coordinator._store = MagicMock()
+    coordinator.client.scheduler = RequestScheduler(rate=1e9, burst=1e9)
+    coordinator.hass.async_create_background_task = lambda coro, name: asyncio.ensure_future(coro)
+    return coordinator
+
+
+def bench_update(rows, loop):
+    """Return a callable running one boundary poll over a ``rows`` payload."""
+    coordinator = make_coordinator()
+    session = FakeSession(make_payload(rows))
+
+    def run():
+        coordinator.intervalEnd = None
+        coordinator.accumulator.last_interval_end = None
+        with patch(
+            "custom_components.localvolts.coordinator.async_get_clientsession",
+            return_value=session,
+        ):
+            loop.run_until_complete(coordinator._async_update_data())
+
+    return run
+
+
+def bench_exp_scan(rows):
+    """Return a callable running only the 'exp' scan over a decoded payload."""
+    data = json.loads(make_payload(rows))
+
+    def run():
+        for item in data:
+            if item.get("quality", "").lower() == "exp":
+                LocalvoltsDataUpdateCoordinator._parse_time(item["intervalEnd"])
+                break
+
+    return run
+
+
+def bench_format_time():
+    """Return a callable formatting one request timestamp."""
+    return lambda: LocalvoltsDataUpdateCoordinator._format_time(NOW)
+
+
+def bench_sensors(loop):
+    """Return a callable reading every sensor's state and attributes."""
+    coordinator = make_coordinator()
+    coordinator.forecast_hours = 1
+    session = FakeSession(make_payload(1))
+    with patch(
+        "custom_components.localvolts.coordinator.async_get_clientsession",
+        return_value=session,
+    ):
+        loop.run_until_complete(coordinator._async_update_data())
+        loop.run_until_complete(coordinator._forecast_task)
+    entities = [
+        sensor.LocalvoltsCostsFlexUpSensor(coordinator),
+        sensor.LocalvoltsEarningsFlexUpSensor(coordinator),
+        sensor.LocalvoltsActualCostSensor(coordinator),
+        sensor.LocalvoltsEnergyUsedSensor(coordinator),
+        sensor.LocalvoltsDataLagSensor(coordinator),
+        sensor.LocalvoltsIntervalEndSensor(coordinator),
+        sensor.LocalvoltsTotalSensor(coordinator, sensor.ACTUAL_COST, sensor.TODAY),
+        sensor.LocalvoltsTotalSensor(coordinator, sensor.ENERGY_USED, sensor.LIFETIME),
+        sensor.LocalvoltsNextPriceSensor(coordinator, sensor.COSTS_FLEX_UP),
+        sensor.LocalvoltsCheapestImportSensor(coordinator),
+    ]
+
+    def run():
+        for entity in entities:
+            entity.native_value
+            entity.extra_state_attributes
+
+    return run
+
+
+def measure(func):
+    """Return (best microseconds per call, peak KiB allocated in one call)."""
+    func()
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=REPEATS, number=number)) / number
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best * 1e6, peak / 1024
+
+
+def cases(loop):
+    """Yield (name, callable) for every benchmark case."""
+    for rows in PAYLOAD_SIZES:
+        yield f"update_data[{rows}]", bench_update(rows, loop)
+    for rows in PAYLOAD_SIZES:
+        yield f"exp_scan[{rows}]", bench_exp_scan(rows)
+    yield "format_time", bench_format_time()
+    yield "sensor_getters", bench_sensors(loop)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="record new baselines")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="allowed fractional slowdown or extra allocation (default 0.5)",
+    )
+    args = parser.parse_args(argv)
+
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    results = {}
+    regressions = []
+    loop = asyncio.new_event_loop()
+    with patch(
+        "custom_components.localvolts.coordinator.dt_util.utcnow", return_value=NOW
+    ), patch("custom_components.localvolts.api.dt_util.utcnow", return_value=NOW):
+        print(f"{'case':<22} {'time':>12} {'peak':>12} {'vs baseline':>14}")
+        for name, func in cases(loop):
+            time_us, peak_kib = measure(func)
+            results[name] = {"time_us": round(time_us, 3), "peak_kib": round(peak_kib, 1)}
+            baseline = baselines.get(name)
+            note = ""
+            if baseline:
+                ratio = time_us / baseline["time_us"]
+                note = f"{ratio:>6.2f}x"
+                if (
+                    ratio > 1 + args.tolerance
+                    and time_us - baseline["time_us"] > MIN_SLOWDOWN_US
+                ):
+                    regressions.append(f"{name}: {ratio:.2f}x slower")
+                if peak_kib > baseline["peak_kib"] * (1 + args.tolerance) + 1:
+                    regressions.append(
+                        f"{name}: peak {peak_kib:.1f} KiB vs {baseline['peak_kib']} KiB"
+                    )
+            print(f"{name:<22} {time_us:>10.2f}us {peak_kib:>9.1f}KiB {note:>14}")
+    loop.close()
+
+    if args.save:
+        BASELINES.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baselines to {BASELINES}")
+        return 0
+    if regressions:
+        print("\nPERFORMANCE REGRESSION:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Compare Localvolts timestamp parsing against dateutil.
+
+Run from the repository root:
+
+    python benchmarks/bench_timestamps.py
+
+Each payload row carries an ``intervalEnd`` and a ``lastUpdate`` timestamp,
+as returned by ``/v1/customer/interval``. "cold" parses a payload with an
+empty cache; "warm" re-parses the same payload, as happens when forecasts
+are refreshed every interval.
+"""
+
+import datetime
+import sys
+import timeit
+from pathlib import Path
+
+from dateutil import parser, tz
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.localvolts.timeparse import parse_timestamp  # noqa: E402
+
+BASE = datetime.datetime(2024, 5, 3, tzinfo=datetime.timezone.utc)
+REPEATS = 5
+
+
+def make_payload(rows):
+    """Return timestamp strings shaped like a payload of ``rows`` intervals."""
+    payload = []
+    for n in range(rows):
+        interval_end = BASE + datetime.timedelta(minutes=5 * (n + 1))
+        last_update = interval_end - datetime.timedelta(minutes=4, seconds=37)
+        payload.append(
+            (
+                interval_end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                last_update.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            )
+        )
+    return payload
+
+
+def parse_dateutil(payload):
+    """The previous coordinator code path."""
+    for interval_end, last_update in payload:
+        for value in (interval_end, last_update):
+            parsed = parser.isoparse(value)
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=tz.UTC)
+
+
+def parse_fast(payload):
+    """The current coordinator code path."""
+    for interval_end, last_update in payload:
+        parse_timestamp(interval_end)
+        parse_timestamp(last_update)
+
+
+def per_row_us(func, payload, clear_cache):
+    """Return the best per-row time in microseconds over REPEATS runs."""
+
+    def run():
+        if clear_cache:
+            parse_timestamp.cache_clear()
+        func(payload)
+
+    best = min(timeit.repeat(run, number=1, repeat=REPEATS))
+    return best / len(payload) * 1e6
+
+
+def main():
+    print(f"{'rows':>6} {'dateutil':>10} {'cold':>10} {'warm':>10} {'speedup':>14}")
+    for rows in (288, 10_000):
+        payload = make_payload(rows)
+        baseline = per_row_us(parse_dateutil, payload, clear_cache=False)
+        cold = per_row_us(parse_fast, payload, clear_cache=True)
+        warm = per_row_us(parse_fast, payload, clear_cache=False)
+        print(
+            f"{rows:>6} {baseline:>8.2f}us {cold:>8.2f}us {warm:>8.2f}us"
+            f" {baseline / cold:>5.1f}x/{baseline / warm:>5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Soak test many NMIs against the stand-in API under an accelerated clock.
+
+Run from the repository root:
+
+    python benchmarks/soak.py --nmis 200 --hours 24 --speed 240
+
+Starts ``standin_server`` on a local port, then runs one
+``LocalvoltsDataUpdateCoordinator`` per NMI under the partner's
+``LocalvoltsFetchEngine``, with its shared API client and connection pool,
+as in Home Assistant. NMIs are spread over partners of ``--per-partner``
+meters. ``dt_util.utcnow``, the engines' timers and the request
+scheduler's clock and sleeps (rate limit, circuit breaker, retry back-off)
+all run on one accelerated clock shared with the server, so a simulated
+day passes in minutes of real time.
+
+Reports CPU time, memory growth (tracemalloc), requests per meter per
+simulated hour, how many intervals were found versus expected, and the
+delay between publication and detection. Compare runs with and without
+``--low-latency`` to see what that mode gains and costs.
+"""
+
+import argparse
+import asyncio
+import datetime
+import gc
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.standin_server import PATH, AcceleratedClock, StandinApi  # noqa: E402
+from custom_components.localvolts.api import LocalvoltsApiClient  # noqa: E402
+from custom_components.localvolts.connection import (  # noqa: E402
+    LocalvoltsConnectionPool,
+)
+from custom_components.localvolts.coordinator import (  # noqa: E402
+    LocalvoltsDataUpdateCoordinator,
+)
+from custom_components.localvolts.engine import LocalvoltsFetchEngine  # noqa: E402
+from custom_components.localvolts.metrics import percentiles  # noqa: E402
+from custom_components.localvolts.ratelimit import RequestScheduler  # noqa: E402
+
+START = datetime.datetime(2024, 5, 3, 0, 0, 30, tzinfo=datetime.timezone.utc)
+REPORT_EVERY = datetime.timedelta(hours=1)
+
+
+def make_hass(loop):
+    """Return the little of Home Assistant the engine and coordinators use."""
+    hass = MagicMock()
+    hass.loop = loop
+    hass.is_stopping = False
+    hass.tasks = set()
+
+    def create_task(coro, name):
+        task = loop.create_task(coro, name=name)
+        hass.tasks.add(task)
+        task.add_done_callback(hass.tasks.discard)
+        return task
+
+    hass.async_create_background_task = create_task
+    hass.async_add_executor_job = lambda func, *args: loop.run_in_executor(None, func, *args)
+    return hass
+
+
+def accelerated_timer(clock, speed):
+    """Return ``async_track_point_in_utc_time`` running on the accelerated clock."""
+
+    def track(hass, action, point):
+        def fire():
+            result = action(point)
+            if asyncio.iscoroutine(result):
+                hass.async_create_background_task(result, "soak timer")
+
+        delay = max((point - clock()).total_seconds() / speed, 0)
+        return hass.loop.call_later(delay, fire).cancel
+
+    return track
+
+
+def _memory_kib():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 1024
+
+
+async def soak(args):
+    clock = AcceleratedClock(START, args.speed)
+    api = StandinApi(clock, lag=args.lag, error_rate=args.error_rate, seed=1)
+    runner = web.AppRunner(api.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}{PATH}"
+
+    hass = make_hass(asyncio.get_running_loop())
+    until = START + datetime.timedelta(hours=args.hours)
+
+    def simulated_seconds():
+        return (clock() - START).total_seconds()
+
+    async def simulated_sleep(seconds):
+        await asyncio.sleep(seconds / args.speed)
+
+    coordinators = {}
+    engines = {}
+    for n in range(args.nmis):
+        partner = str(n // args.per_partner)
+        engine = engines.get(partner)
+        if engine is None:
+            engine = engines[partner] = LocalvoltsFetchEngine(hass, partner)
+            engine.client = LocalvoltsApiClient(partner, api_url=url)
+            engine.client.scheduler = RequestScheduler(
+                clock=simulated_seconds, sleep=simulated_sleep
+            )
+            engine.connections = LocalvoltsConnectionPool(hass, url, engine.client.metrics)
+        nmi = f"NMI{n:07d}"
+        coordinator = LocalvoltsDataUpdateCoordinator(
+            hass,
+            "0" * 32,
+            partner,
+            nmi,
+            forecast_hours=args.forecast_hours,
+            client=engine.client,
+            low_latency=args.low_latency,
+            connections=engine.connections,
+        )
+        coordinator._store = MagicMock()
+        coordinator.archive = None
+        coordinators[nmi] = coordinator
+
+    tracemalloc.start()
+    memory_start = _memory_kib()
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+
+    async def report():
+        next_report = START + REPORT_EVERY
+        while next_report <= until:
+            await asyncio.sleep(max((next_report - clock()).total_seconds() / args.speed, 0))
+            elapsed = (clock() - START).total_seconds() / 3600
+            print(
+                f"{clock():%H:%M} sim  requests/meter/h "
+                f"{sum(api.requests.values()) / args.nmis / elapsed:6.1f}  "
+                f"memory +{_memory_kib() - memory_start:8.1f} KiB  "
+                f"cpu {time.process_time() - cpu_start:6.1f}s"
+            )
+            next_report += REPORT_EVERY
+
+    # dt_util is one module, so this moves the clock for every user of it
+    with patch("homeassistant.util.dt.utcnow", side_effect=clock), patch(
+        "custom_components.localvolts.engine.async_track_point_in_utc_time",
+        accelerated_timer(clock, args.speed),
+    ):
+        for nmi, coordinator in coordinators.items():
+            engines[coordinator.partner_id].async_add_coordinator(nmi, coordinator)
+        await report()
+        await asyncio.sleep(max((until - clock()).total_seconds() / args.speed, 0))
+        for nmi, coordinator in coordinators.items():
+            engines[coordinator.partner_id].async_remove_coordinator(nmi)
+        for task in list(hass.tasks):
+            task.cancel()
+        await asyncio.gather(*hass.tasks, return_exceptions=True)
+
+    cpu = time.process_time() - cpu_start
+    wall = time.monotonic() - wall_start
+    memory = _memory_kib() - memory_start
+    tracemalloc.stop()
+    clients = {partner: engine.client for partner, engine in engines.items()}
+    connections = {
+        name: sum(client.metrics.counters[name] for client in clients.values())
+        for name in ("connections_created", "connections_reused")
+    }
+    for engine in engines.values():
+        await engine.async_shutdown()
+    await runner.cleanup()
+
+    # The interval current at the start, then one per 5 minutes
+    expected = int(args.hours * 12) + 1
+    found = [
+        len(c.metrics.samples.get("polls_per_interval", ())) for c in coordinators.values()
+    ]
+    print()
+    print(f"NMIs                    {args.nmis} over {len(clients)} partners")
+    print(f"simulated               {args.hours}h in {wall:.1f}s real")
+    print(f"cpu                     {cpu:.1f}s ({cpu / args.nmis / args.hours * 1000:.2f} ms/meter/h)")
+    print(f"memory growth           {memory:.1f} KiB ({memory / args.nmis:.2f} KiB/meter)")
+    print(f"requests                {sum(api.requests.values())} "
+          f"({sum(api.requests.values()) / args.nmis / args.hours:.1f}/meter/h)")
+    print(f"statuses                {dict(api.statuses)}")
+    print(f"intervals found         min {min(found)}, max {max(found)} of ~{expected}")
+    reaction = percentiles(
+        value
+        for c in coordinators.values()
+        for value in c.metrics.samples.get("reaction_delay", ())
+    )
+    if reaction:
+        print(
+            f"reaction delay          p50 {reaction['p50']:.1f}s  p95 {reaction['p95']:.1f}s"
+            f"  max {reaction['max']:.1f}s"
+        )
+    hedged = sum(client.metrics.counters["hedged_requests"] for client in clients.values())
+    print(f"hedged requests         {hedged}")
+    print(
+        f"connections             {connections['connections_created']} opened, "
+        f"{connections['connections_reused']} reuses"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test against the stand-in API")
+    parser.add_argument("--nmis", type=int, default=100)
+    parser.add_argument(
+        "--per-partner", type=int, default=10, help="NMIs sharing a fetch engine"
+    )
+    parser.add_argument("--hours", type=float, default=6.0, help="simulated hours")
+    parser.add_argument("--speed", type=float, default=120.0, help="clock speed-up factor")
+    parser.add_argument("--lag", type=float, default=20.0, help="seconds until 'exp' is published")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="fraction of 429/5xx answers")
+    parser.add_argument("--forecast-hours", type=int, default=0)
+    parser.add_argument("--low-latency", action="store_true", help="enable low-latency polling")
+    parser.add_argument("--verbose", action="store_true", help="show integration warnings and errors")
+    logging.basicConfig(level=logging.WARNING)
+    args = parser.parse_args(argv)
+    if not args.verbose:
+        logging.getLogger("custom_components.localvolts").setLevel(logging.CRITICAL)
+    asyncio.run(soak(args))
+
+
+if __name__ == "__main__":
+    main()
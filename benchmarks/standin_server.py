@@ -0,0 +1,197 @@
+"""Local stand-in for the Localvolts ``/v1/customer/interval`` endpoint.
+
+Run it on its own:
+
+    python benchmarks/standin_server.py --port 8080 --lag 20 --error-rate 0.02
+
+or embed it, as ``benchmarks/soak.py`` does, sharing an accelerated clock
+with the code under test. Any NMI is accepted. Intervals move through the
+quality states on 5-minute boundaries the way the real API reports them:
+
+* ``fcst`` until ``lag`` seconds after the interval starts,
+* ``exp`` from then until ``settle`` seconds after it ends,
+* ``act`` after that.
+
+Prices and usage are deterministic per NMI and interval, so repeated
+requests agree with each other. A fraction of requests can be answered
+with 429 (with Retry-After) or 5xx instead.
+"""
+
+import argparse
+import datetime
+import hashlib
+import math
+import random
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+
+INTERVAL = datetime.timedelta(minutes=5)
+PATH = "/v1/customer/interval"
+
+Clock = Callable[[], datetime.datetime]
+
+
+def system_clock() -> datetime.datetime:
+    """Return the real time in UTC."""
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class AcceleratedClock:
+    """UTC clock starting at ``start`` and running ``speed`` times real time."""
+
+    def __init__(self, start: datetime.datetime, speed: float) -> None:
+        self.start = start
+        self.speed = speed
+        self._t0 = time.monotonic()
+
+    def __call__(self) -> datetime.datetime:
+        return self.start + datetime.timedelta(
+            seconds=(time.monotonic() - self._t0) * self.speed
+        )
+
+
+def _format(value: datetime.datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _parse(value: str) -> datetime.datetime:
+    return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(
+        tzinfo=datetime.timezone.utc
+    )
+
+
+def _ceil_boundary(value: datetime.datetime) -> datetime.datetime:
+    length = int(INTERVAL.total_seconds())
+    timestamp = -(-int(value.timestamp()) // length) * length
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+
+def _noise(nmi: str, interval_end: datetime.datetime) -> float:
+    """Return a repeatable value in [0, 1) for an NMI and interval."""
+    digest = hashlib.blake2b(
+        f"{nmi}{interval_end.timestamp()}".encode(), digest_size=4
+    ).digest()
+    return int.from_bytes(digest, "big") / 2**32
+
+
+class StandinApi:
+    """State and request handler of the stand-in server."""
+
+    def __init__(
+        self,
+        clock: Clock = system_clock,
+        lag: float = 20.0,
+        settle: float = 900.0,
+        error_rate: float = 0.0,
+        rate_limit_share: float = 0.5,
+        retry_after: float = 2.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.clock = clock
+        self.lag = datetime.timedelta(seconds=lag)
+        self.settle = datetime.timedelta(seconds=settle)
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+
+    def app(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application()
+        app.router.add_get(PATH, self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Answer one interval request."""
+        nmi = request.query.get("NMI", "")
+        self.requests[nmi] += 1
+        if not request.headers.get("Authorization", "").startswith("apikey "):
+            return self._status(401)
+        if not request.headers.get("partner"):
+            return self._status(403)
+        if self.error_rate and self._random.random() < self.error_rate:
+            if self._random.random() < self.rate_limit_share:
+                return self._status(429, {"Retry-After": f"{self.retry_after:g}"})
+            return self._status(self._random.choice((500, 502, 503)))
+        try:
+            from_time = _parse(request.query["from"])
+            to_time = _parse(request.query["to"])
+        except (KeyError, ValueError):
+            return self._status(400)
+
+        self.statuses[200] += 1
+        return web.json_response(self.intervals(nmi, from_time, to_time))
+
+    def _status(self, status: int, headers: Optional[Dict[str, str]] = None) -> web.Response:
+        self.statuses[status] += 1
+        return web.Response(status=status, headers=headers)
+
+    def intervals(
+        self, nmi: str, from_time: datetime.datetime, to_time: datetime.datetime
+    ) -> List[dict]:
+        """Return the records of intervals ending in (from_time, to_time]."""
+        now = self.clock()
+        records = []
+        interval_end = _ceil_boundary(from_time)
+        if interval_end == from_time:
+            interval_end += INTERVAL
+        while interval_end <= _ceil_boundary(to_time):
+            records.append(self.record(nmi, interval_end, now))
+            interval_end += INTERVAL
+        return records
+
+    def record(self, nmi: str, interval_end: datetime.datetime, now: datetime.datetime) -> dict:
+        """Return one interval as the API would report it at ``now``."""
+        interval_start = interval_end - INTERVAL
+        published = interval_start + self.lag
+        settled = interval_end + self.settle
+        if now < published:
+            quality, last_update = "fcst", min(now, published)
+        elif now < settled:
+            quality, last_update = "exp", published
+        else:
+            quality, last_update = "act", settled
+
+        noise = _noise(nmi, interval_end)
+        hour = interval_end.hour + interval_end.minute / 60
+        price = 20 + 15 * math.sin((hour - 10) / 24 * 2 * math.pi) + 10 * noise
+        imports = round(0.05 + 0.3 * noise, 3) if quality != "fcst" else 0.0
+        exports = round(0.2 * (1 - noise), 3) if 9 <= hour < 16 and quality != "fcst" else 0.0
+        return {
+            "NMI": nmi,
+            "intervalEnd": _format(interval_end),
+            "lastUpdate": _format(last_update),
+            "quality": quality,
+            "costsFlexUp": round(price, 4),
+            "earningsFlexUp": round(price * 0.6, 4),
+            "costsAll": round(imports * price - exports * price * 0.6, 4),
+            "importsAll": imports,
+            "exportsAll": exports,
+            "demandInterval": 1 if 16 <= hour < 21 else 0,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Localvolts API stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--lag", type=float, default=20.0, help="seconds until 'exp' is published")
+    parser.add_argument("--settle", type=float, default=900.0, help="seconds after the end until 'act'")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 429/5xx answers")
+    parser.add_argument("--speed", type=float, default=1.0, help="clock speed-up factor")
+    args = parser.parse_args(argv)
+
+    clock = AcceleratedClock(system_clock(), args.speed) if args.speed != 1 else system_clock
+    api = StandinApi(clock, lag=args.lag, settle=args.settle, error_rate=args.error_rate)
+    print(f"Serving http://{args.host}:{args.port}{PATH}", file=sys.stderr)
+    web.run_app(api.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,26 @@ import voluptuous as vol
 from homeassistant.helpers import config_validation as cv
 
 from .coordinator import LocalvoltsDataUpdateCoordinator
+from .dispatch import BatterySpec
+from .engine import LocalvoltsFetchEngine
+from .events import parse_thresholds
+from .services import async_setup_services
 
 from .const import (
     DOMAIN,
     CONF_API_KEY,
     CONF_PARTNER_ID,
     CONF_NMI_ID,
+    CONF_FORECAST_HOURS,
+    CONF_LOW_LATENCY,
+    CONF_PRICE_THRESHOLDS,
+    CONF_BATTERY_CAPACITY,
+    CONF_BATTERY_POWER,
+    CONF_BATTERY_SOC_ENTITY,
+    DEFAULT_FORECAST_HOURS,
+    DEFAULT_LOW_LATENCY,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_BATTERY_POWER,
 )
 
 CONFIG_SCHEMA = vol.Schema(
@@ -38,35 +52,79 @@ async def async_setup_entry(hass: HomeAssistant, config_entry):
     api_key = config_entry.data[CONF_API_KEY]
     partner_id = config_entry.data[CONF_PARTNER_ID]
     nmi_id = config_entry.data[CONF_NMI_ID]
+    forecast_hours = _entry_option(config_entry, CONF_FORECAST_HOURS, DEFAULT_FORECAST_HOURS)
+    low_latency = _entry_option(config_entry, CONF_LOW_LATENCY, DEFAULT_LOW_LATENCY)
+    price_thresholds = parse_thresholds(_entry_option(config_entry, CONF_PRICE_THRESHOLDS, ""))
+    battery_capacity = _entry_option(config_entry, CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY)
+    battery = None
+    if battery_capacity and forecast_hours:
+        battery = BatterySpec(
+            battery_capacity,
+            _entry_option(config_entry, CONF_BATTERY_POWER, DEFAULT_BATTERY_POWER),
+        )
 
-    # Initialize coordinator
-    coordinator = LocalvoltsDataUpdateCoordinator(hass, api_key, partner_id, nmi_id)
-
-    try:
-        await coordinator.async_refresh()
-        if not coordinator.last_update_success:
-            _LOGGER.error("Initial data fetch failed")
-            return False
-    except Exception as err:
-        _LOGGER.error("Error initializing coordinator: %s", err)
-        return False
+    domain_data = hass.data.setdefault(DOMAIN, {"coordinators": {}, "engines": {}})
+    engine = domain_data["engines"].get(partner_id)
+    if engine is None:
+        engine = LocalvoltsFetchEngine(hass, partner_id)
+        domain_data["engines"][partner_id] = engine
 
-    # Store data
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN]['coordinator'] = coordinator
+    # Initialize coordinator
+    coordinator = LocalvoltsDataUpdateCoordinator(
+        hass,
+        api_key,
+        partner_id,
+        nmi_id,
+        forecast_hours=forecast_hours,
+        low_latency=low_latency,
+        price_thresholds=price_thresholds,
+        client=engine.client,
+        connections=engine.connections,
+        battery=battery,
+        battery_soc_entity=_entry_option(config_entry, CONF_BATTERY_SOC_ENTITY, "") or None,
+    )
+    # Entities start from the last interval and totals saved on disk; the
+    # first fetch runs in the background once the engine picks the NMI up,
+    # and a failed fetch is retried on the engine's next tick.
+    await coordinator.async_restore()
+
+    # Register the coordinator and hand it to the partner's shared fetch engine
+    domain_data["coordinators"][config_entry.entry_id] = coordinator
+    engine.async_add_coordinator(config_entry.entry_id, coordinator)
 
     # Load the sensor platform
     await hass.config_entries.async_forward_entry_setups(config_entry, ["sensor"])
+    config_entry.async_on_unload(config_entry.add_update_listener(_async_update_listener))
 
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, config_entry):
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(config_entry.entry_id)
+
+
+def _entry_option(config_entry, key, default):
+    """Return a setting from the entry options, falling back to its data."""
+    return config_entry.options.get(key, config_entry.data.get(key, default))
+
+
 async def async_unload_entry(hass: HomeAssistant, config_entry):
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(config_entry, ["sensor"])
     if unload_ok and DOMAIN in hass.data:
-        hass.data[DOMAIN].pop("coordinator", None)
-        if not hass.data[DOMAIN]:
+        domain_data = hass.data[DOMAIN]
+        coordinator = domain_data["coordinators"].pop(config_entry.entry_id, None)
+        partner_id = config_entry.data[CONF_PARTNER_ID]
+        engine = domain_data["engines"].get(partner_id)
+        idle = engine is not None and engine.async_remove_coordinator(config_entry.entry_id)
+        # Cancel the coordinator's background work before its pool closes
+        if coordinator is not None:
+            await coordinator.async_shutdown()
+        if idle:
+            domain_data["engines"].pop(partner_id)
+            await engine.async_shutdown()
+        if not domain_data["coordinators"]:
             hass.data.pop(DOMAIN)
     return unload_ok
 
@@ -75,6 +133,7 @@ async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the localvolts component."""
     _LOGGER.debug("Setting up the localvolts component.")
     # No action needed for YAML configuration, as we are using config entries now
+    async_setup_services(hass)
     return True
 
 def validate_api_key(api_key):
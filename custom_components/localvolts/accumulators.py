@@ -0,0 +1,97 @@
+"""Running daily and lifetime totals for Localvolts interval data."""
+
+import datetime
+import logging
+from typing import Any, Dict, Optional
+
+from homeassistant.util import dt as dt_util
+
+from .const import INTERVAL_LENGTH
+
+_LOGGER = logging.getLogger(__name__)
+
+ACCUMULATED_FIELDS = ("costsAll", "importsAll", "exportsAll")
+
+
+class IntervalAccumulator:
+    """Sum interval fields for the current local day and for all time.
+
+    Each interval is added once, keyed by its ``intervalEnd``; anything at or
+    before the last interval added is ignored. The daily totals restart when
+    an interval (or the clock) crosses local midnight.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty totals."""
+        self.day: Optional[datetime.date] = None
+        self.last_interval_end: Optional[datetime.datetime] = None
+        self.today: Dict[str, float] = dict.fromkeys(ACCUMULATED_FIELDS, 0.0)
+        self.lifetime: Dict[str, float] = dict.fromkeys(ACCUMULATED_FIELDS, 0.0)
+
+    @property
+    def day_start(self) -> Optional[datetime.datetime]:
+        """Return local midnight at the start of the accumulated day."""
+        if self.day is None:
+            return None
+        return dt_util.start_of_local_day(self.day)
+
+    def add(self, interval_end: datetime.datetime, item: Dict[str, Any]) -> bool:
+        """Add one interval. Return False if it was already counted."""
+        if self.last_interval_end is not None and interval_end <= self.last_interval_end:
+            return False
+
+        # An interval belongs to the day in which it starts
+        self._start_day(dt_util.as_local(interval_end - INTERVAL_LENGTH).date())
+        for field in ACCUMULATED_FIELDS:
+            value = item.get(field)
+            if value is None:
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                _LOGGER.debug("Ignoring non-numeric %s=%r", field, value)
+                continue
+            self.today[field] += value
+            self.lifetime[field] += value
+        self.last_interval_end = interval_end
+        return True
+
+    def roll_over(self, now: datetime.datetime) -> bool:
+        """Reset the daily totals if local midnight has passed. Return True if reset."""
+        day = dt_util.as_local(now).date()
+        if self.day is None or day <= self.day:
+            return False
+        self._start_day(day)
+        return True
+
+    def _start_day(self, day: datetime.date) -> None:
+        """Begin accumulating a new local day."""
+        if day != self.day:
+            self.day = day
+            self.today = dict.fromkeys(ACCUMULATED_FIELDS, 0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable copy of the totals."""
+        return {
+            "day": self.day.isoformat() if self.day else None,
+            "last_interval_end": (
+                self.last_interval_end.isoformat() if self.last_interval_end else None
+            ),
+            "today": dict(self.today),
+            "lifetime": dict(self.lifetime),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IntervalAccumulator":
+        """Rebuild totals saved by as_dict."""
+        accumulator = cls()
+        if data.get("day"):
+            accumulator.day = datetime.date.fromisoformat(data["day"])
+        if data.get("last_interval_end"):
+            accumulator.last_interval_end = dt_util.parse_datetime(
+                data["last_interval_end"]
+            )
+        for field in ACCUMULATED_FIELDS:
+            accumulator.today[field] = float(data.get("today", {}).get(field, 0.0))
+            accumulator.lifetime[field] = float(data.get("lifetime", {}).get(field, 0.0))
+        return accumulator
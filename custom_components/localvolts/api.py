@@ -0,0 +1,381 @@
+"""Localvolts API client shared by every NMI of a partner."""
+
+import asyncio
+import codecs
+import collections
+import contextlib
+import datetime
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import INTERVAL_LENGTH
+from .metrics import MetricsRecorder
+from .ratelimit import RequestScheduler, parse_retry_after
+
+_LOGGER = logging.getLogger(__name__)
+
+API_URL = "https://api.localvolts.com/v1/customer/interval"
+
+# Responses are reused until the end of the interval they were fetched in
+RESPONSE_CACHE_SIZE = 128
+
+# Response bodies are decoded in chunks of this many bytes
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+# (NMI, from, to) as sent to the API
+Query = Tuple[str, str, str]
+# (NMI, first interval, last interval) a request covers
+CacheKey = Tuple[str, int, int]
+
+
+def format_time(dt_obj: datetime.datetime) -> str:
+    """Format datetime as Localvolts API expects (UTC, Z suffix)."""
+    if dt_obj.tzinfo is None:
+        dt_obj = dt_obj.replace(tzinfo=datetime.timezone.utc)
+    else:
+        dt_obj = dt_obj.astimezone(datetime.timezone.utc)
+    return dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def interval_key(dt_obj: datetime.datetime) -> int:
+    """Return the number of the 5-minute interval containing ``dt_obj``."""
+    if dt_obj.tzinfo is None:
+        dt_obj = dt_obj.replace(tzinfo=datetime.timezone.utc)
+    return int(dt_obj.timestamp()) // int(INTERVAL_LENGTH.total_seconds())
+
+
+def interval_end_after(now: datetime.datetime) -> datetime.datetime:
+    """Return the end of the 5-minute interval containing ``now``."""
+    length = int(INTERVAL_LENGTH.total_seconds())
+    timestamp = (int(now.timestamp()) // length + 1) * length
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Yield the elements of a JSON array as its bytes arrive.
+
+    Only the current partial element is held in memory, so peak memory
+    does not grow with the length of the array. Raises ValueError if the
+    body is not a JSON array or ends early.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = False
+    async for chunk in chunks:
+        buffer += text.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            if buffer[pos] == ",":
+                pos += 1
+                continue
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element continues in the next chunk
+                break
+            yield item
+        buffer = buffer[pos:]
+    raise ValueError("JSON array ended early")
+
+
+class LocalvoltsApiClient:
+    """Fetch intervals with response caching and single-flight requests.
+
+    Requests are keyed by NMI and the intervals ``from`` and ``to`` fall
+    in, so callers asking for the same window a few seconds apart are
+    treated alike. A response is cached until the end of the interval it
+    was fetched in, and concurrent callers asking for the same window share
+    one in-flight request instead of each hitting the rate-limited API.
+    Every request is admitted by the client's RequestScheduler; only
+    boundary polls are marked critical.
+    """
+
+    def __init__(self, partner_id: str, api_url: str = API_URL) -> None:
+        """Initialize the client; ``api_url`` points it at a stand-in server."""
+        self.partner_id = partner_id
+        self.api_url = api_url
+        # key -> (expiry, response), least recently used first
+        self._cache: collections.OrderedDict = collections.OrderedDict()
+        self._in_flight: Dict[CacheKey, asyncio.Task] = {}
+        self.scheduler = RequestScheduler()
+        # Request latency (time to response headers), statuses and retries
+        self.metrics = MetricsRecorder()
+
+    async def async_get_intervals(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str,
+        nmi_id: str,
+        from_time: datetime.datetime,
+        to_time: datetime.datetime,
+        use_cache: bool = True,
+        critical: bool = False,
+        hedge_after: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return intervals for an NMI between from_time and to_time.
+
+        With ``use_cache`` False a cached response is ignored, but the call
+        still joins an identical in-flight request and refreshes the cache.
+        ``critical`` requests may use the rate limit's reserve. With
+        ``hedge_after`` set, a request still unanswered after that many
+        seconds is sent a second time and the first answer wins.
+        The returned list is shared between callers and must not be mutated.
+        """
+        query: Query = (nmi_id, format_time(from_time), format_time(to_time))
+        key: CacheKey = (nmi_id, interval_key(from_time), interval_key(to_time))
+        if use_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                _LOGGER.debug("Cache hit for %s", key)
+                return cached
+
+        task = self._in_flight.get(key)
+        if task is None:
+            if hedge_after is None:
+                request = self._async_request(session, api_key, query, critical)
+            else:
+                request = self._async_hedged_request(
+                    session, api_key, query, critical, hedge_after
+                )
+            task = asyncio.ensure_future(request)
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            _LOGGER.debug("Joining in-flight request for %s", key)
+        # Shield so one caller giving up does not cancel the request for the rest
+        data = await asyncio.shield(task)
+        self._cache_put(key, data)
+        return data
+
+    def _cache_get(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        """Return a cached response that has not expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, data = entry
+        if dt_util.utcnow() >= expires:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return data
+
+    def _cache_put(self, key: CacheKey, data: List[Dict[str, Any]]) -> None:
+        """Cache a response until the end of the current interval."""
+        now = dt_util.utcnow()
+        self._cache[key] = (interval_end_after(now), data)
+        self._cache.move_to_end(key)
+        expired = [k for k, (expires, _) in self._cache.items() if now >= expires]
+        for expired_key in expired:
+            del self._cache[expired_key]
+        while len(self._cache) > RESPONSE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def async_stream_intervals(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str,
+        nmi_id: str,
+        from_time: datetime.datetime,
+        to_time: datetime.datetime,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield intervals one at a time as the response body is decoded.
+
+        Meant for large history ranges: records go straight to the caller
+        without the whole response being held in memory, and bypass the
+        response cache.
+        """
+        query: Query = (nmi_id, format_time(from_time), format_time(to_time))
+        async with self._async_response(session, api_key, query) as response:
+            async for item in self._async_decode(response):
+                yield item
+
+    async def _async_request(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str,
+        query: Query,
+        critical: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Fetch interval data from the Localvolts API.
+
+        Responses here are an hour or so of intervals, which the C JSON
+        decoder handles faster in one go; only async_stream_intervals
+        decodes incrementally.
+        """
+        async with self._async_response(session, api_key, query, critical) as response:
+            try:
+                data: Any = await response.json()
+            except ValueError as err:
+                raise UpdateFailed(
+                    "Unexpected API response format: expected list of intervals"
+                ) from err
+
+        if isinstance(data, list) and not data:
+            _LOGGER.warning(
+                "No data received, check that your NMI, PartnerID and API Key are correct."
+            )
+            raise UpdateFailed("No data received: Invalid NMI?")
+
+        if not isinstance(data, list):
+            raise UpdateFailed("Unexpected API response format: expected list of intervals")
+
+        return data
+
+    async def _async_hedged_request(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str,
+        query: Query,
+        critical: bool,
+        hedge_after: float,
+    ) -> List[Dict[str, Any]]:
+        """Fetch, sending one duplicate if the first request is slow."""
+        first = asyncio.ensure_future(self._async_request(session, api_key, query, critical))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if done:
+                return first.result()
+
+            self.metrics.increment("hedged_requests")
+            hedge = asyncio.ensure_future(
+                self._async_request(session, api_key, query, critical)
+            )
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.metrics.increment("hedge_wins")
+                        return task.result()
+            # Both failed; report the original request's error
+            return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @contextlib.asynccontextmanager
+    async def _async_response(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str,
+        query: Query,
+        critical: bool = False,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Open a successful response for a request, retrying transient errors."""
+        nmi_id, from_time_str, to_time_str = query
+
+        url: str = f"{self.api_url}?NMI={nmi_id}&from={from_time_str}&to={to_time_str}"
+
+        headers: Dict[str, str] = {
+            "Authorization": f"apikey {api_key}",
+            "partner": self.partner_id,
+        }
+
+        attempts = 3
+        for attempt in range(1, attempts + 1):
+            ticket = await self.scheduler.async_acquire(critical)
+            if attempt > 1:
+                self.metrics.increment("retries")
+            self.metrics.increment("requests")
+            started = time.monotonic()
+            # Set once the caller is reading the body
+            streaming = False
+            try:
+                async with session.get(url, headers=headers) as response:
+                    self.metrics.observe("request_latency", time.monotonic() - started)
+                    self.metrics.increment(f"status_{response.status}")
+                    if response.status == 429 or response.status >= 500:
+                        if response.status >= 500:
+                            self.scheduler.record_failure()
+                        else:
+                            self.scheduler.record_success()
+                        retry_after = parse_retry_after(response.headers)
+                        if retry_after is not None:
+                            self.scheduler.defer(retry_after)
+                        if attempt == attempts:
+                            raise UpdateFailed(f"Localvolts API returned {response.status}")
+                        delay = retry_after if retry_after is not None else 2 ** (attempt - 1)
+                        _LOGGER.warning(
+                            "Localvolts API returned %s. Retrying in %ss (attempt %s/%s).",
+                            response.status,
+                            delay,
+                            attempt,
+                            attempts,
+                        )
+                        if retry_after is None:
+                            await self.scheduler.async_sleep(delay)
+                        continue
+
+                    if response.status >= 400:
+                        # The server answered; these are not worth retrying
+                        self.scheduler.record_success()
+                    if response.status == 401:
+                        _LOGGER.critical("Unauthorized access: Check your API key.")
+                        raise UpdateFailed("Unauthorized access: Invalid API key.")
+                    if response.status == 403:
+                        _LOGGER.critical("Forbidden: Check your Partner ID.")
+                        raise UpdateFailed("Forbidden: Invalid Partner ID.")
+
+                    response.raise_for_status()
+                    streaming = True
+                    yield response
+                # Only now has the whole response arrived
+                self.scheduler.record_success()
+                return
+            except aiohttp.ClientResponseError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                # Connection, timeout and body failures count towards
+                # opening the circuit, once per request
+                if streaming:
+                    self.metrics.increment("body_errors")
+                elif isinstance(err, asyncio.TimeoutError):
+                    self.metrics.increment("timeouts")
+                else:
+                    self.metrics.increment("connection_errors")
+                self.scheduler.record_failure()
+                raise
+            finally:
+                # Clears a half-open probe even if it was cancelled
+                self.scheduler.release(ticket)
+
+    @staticmethod
+    async def _async_decode(
+        response: aiohttp.ClientResponse,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Decode interval records from a response body as it arrives."""
+        try:
+            async for item in iter_json_array(
+                response.content.iter_chunked(STREAM_CHUNK_SIZE)
+            ):
+                yield item
+        except ValueError as err:
+            raise UpdateFailed(
+                "Unexpected API response format: expected list of intervals"
+            ) from err
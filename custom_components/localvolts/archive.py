@@ -0,0 +1,215 @@
+"""Append-only on-disk archive of Localvolts intervals, read via memory mapping."""
+
+import csv
+import datetime
+import math
+import os
+import struct
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .const import INTERVAL_LENGTH
+from .models import parse_number
+
+INTERVAL_SECONDS = int(INTERVAL_LENGTH.total_seconds())
+
+ARCHIVE_MAGIC = b"LVIA"
+ARCHIVE_VERSION = 1
+# magic, version, record size, key of the first slot
+HEADER = struct.Struct("<4sHHq")
+
+ARCHIVE_FIELDS = ("costsAll", "costsFlexUp", "earningsFlexUp", "importsAll", "exportsAll")
+# quality code, demandInterval, padding, then one float64 per field (NaN if missing)
+RECORD = struct.Struct("<BB6x" + "d" * len(ARCHIVE_FIELDS))
+RECORD_DTYPE = np.dtype(
+    [("quality", "u1"), ("demand", "u1"), ("_pad", "V6")]
+    + [(field, "<f8") for field in ARCHIVE_FIELDS]
+)
+
+# Quality codes; 0 marks a slot with no interval
+QUALITY_CODES = {"exp": 1, "act": 2}
+QUALITY_NAMES = {code: name for name, code in QUALITY_CODES.items()}
+EMPTY_RECORD = RECORD.pack(0, 0, *([math.nan] * len(ARCHIVE_FIELDS)))
+
+# Slots handed out per chunk by range scans
+SCAN_CHUNK = 4096
+
+EXPORT_COLUMNS = ("intervalEnd", "quality", "demandInterval") + ARCHIVE_FIELDS
+
+
+def _slot_key(interval_end: datetime.datetime) -> int:
+    """Return the slot number of the interval ending at ``interval_end``."""
+    return int(interval_end.timestamp()) // INTERVAL_SECONDS
+
+
+def _slot_end(key: int) -> datetime.datetime:
+    """Return the intervalEnd of a slot."""
+    return datetime.datetime.fromtimestamp(key * INTERVAL_SECONDS, tz=datetime.timezone.utc)
+
+
+class IntervalArchive:
+    """Fixed-width records, one per 5-minute slot, in a single file.
+
+    Slot ``n`` after the first holds the interval ending ``n`` intervals
+    after it, so a time range maps straight to a byte range. The file is
+    only ever appended to: an interval at or before the last one written is
+    ignored, and skipped slots are written as empty records.
+
+    ``add`` only queues a record and is safe in the event loop; ``flush``
+    and the readers do file I/O and belong in the executor. Reads memory
+    map the file, so scans touch only the pages of the range they cover.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the archive stored at ``path``."""
+        self.path = path
+        self.pending: List[Tuple[int, bytes]] = []
+        self._lock = threading.Lock()
+
+    def add(self, interval_end: datetime.datetime, item: Dict[str, Any]) -> None:
+        """Queue an interval to be written by the next flush."""
+        quality = QUALITY_CODES.get(item.get("quality", "").lower())
+        if quality is None:
+            return
+        values = []
+        for field in ARCHIVE_FIELDS:
+            value = parse_number(item.get(field))
+            values.append(math.nan if value is None else value)
+        demand = 1 if str(item.get("demandInterval")) == "1" else 0
+        self.pending.append((_slot_key(interval_end), RECORD.pack(quality, demand, *values)))
+
+    def flush(self) -> int:
+        """Append the queued intervals to the file. Return the number written."""
+        with self._lock:
+            pending, self.pending = self.pending, []
+            if not pending:
+                return 0
+            pending.sort(key=lambda entry: entry[0])
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            written = 0
+            first, count = self._extent()
+            with open(self.path, "ab") as file:
+                if first is None:
+                    first = pending[0][0]
+                    file.write(HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, RECORD.size, first))
+                next_key = first + count
+                for key, record in pending:
+                    if key < next_key:
+                        continue
+                    if key > next_key:
+                        file.write(EMPTY_RECORD * (key - next_key))
+                    file.write(record)
+                    next_key = key + 1
+                    written += 1
+            return written
+
+    def _extent(self) -> Tuple[Optional[int], int]:
+        """Return the first slot key and the number of slots in the file."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return None, 0
+        if size < HEADER.size:
+            return None, 0
+        with open(self.path, "rb") as reader:
+            magic, version, record_size, first = HEADER.unpack(reader.read(HEADER.size))
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION or record_size != RECORD.size:
+            raise ValueError(f"{self.path} is not a version {ARCHIVE_VERSION} interval archive")
+        return first, (size - HEADER.size) // RECORD.size
+
+    def _map(self) -> Tuple[Optional[int], Optional[np.memmap]]:
+        """Return the first slot key and a read-only memory map of the records."""
+        first, count = self._extent()
+        if not count:
+            return first, None
+        return first, np.memmap(
+            self.path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,)
+        )
+
+    def iter_range(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        chunk: int = SCAN_CHUNK,
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (intervalEnd seconds, records) for slots ending in (start, end].
+
+        Records are read-only views of the mapped file, ``chunk`` slots at
+        a time, and include empty slots (quality 0).
+        """
+        first, records = self._map()
+        if records is None:
+            return
+        low = max(_slot_key(start) + 1 - first, 0)
+        high = min(_slot_key(end) + 1 - first, len(records))
+        for offset in range(low, high, chunk):
+            stop = min(offset + chunk, high)
+            keys = np.arange(first + offset, first + stop, dtype=np.int64)
+            yield keys * INTERVAL_SECONDS, records[offset:stop]
+
+    def totals(self, start: datetime.datetime, end: datetime.datetime) -> Dict[str, float]:
+        """Return the sum of each field over the intervals in (start, end]."""
+        totals = dict.fromkeys(ARCHIVE_FIELDS, 0.0)
+        totals["intervals"] = 0
+        for _, records in self.iter_range(start, end):
+            present = records["quality"] > 0
+            totals["intervals"] += int(np.count_nonzero(present))
+            for field in ARCHIVE_FIELDS:
+                totals[field] += float(np.nansum(records[field][present]))
+        return totals
+
+    def iter_rows(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> Iterator[Tuple[List[Any], ...]]:
+        """Yield export columns chunk by chunk, skipping empty slots."""
+        for seconds, records in self.iter_range(start, end):
+            present = records["quality"] > 0
+            if not present.any():
+                continue
+            records = records[present]
+            yield (
+                [
+                    _slot_end(int(value) // INTERVAL_SECONDS).isoformat()
+                    for value in seconds[present]
+                ],
+                [QUALITY_NAMES[int(code)] for code in records["quality"]],
+                records["demand"].tolist(),
+                *(
+                    [None if math.isnan(value) else value for value in records[field].tolist()]
+                    for field in ARCHIVE_FIELDS
+                ),
+            )
+
+    def export_csv(self, path: str, start: datetime.datetime, end: datetime.datetime) -> int:
+        """Write the intervals in (start, end] to a CSV file. Return the row count."""
+        rows = 0
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(EXPORT_COLUMNS)
+            for columns in self.iter_rows(start, end):
+                writer.writerows(zip(*columns))
+                rows += len(columns[0])
+        return rows
+
+    def export_parquet(self, path: str, start: datetime.datetime, end: datetime.datetime) -> int:
+        """Write the intervals in (start, end] to a Parquet file, one row group per chunk.
+
+        Needs pyarrow, which is not a requirement of the integration.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        import pyarrow as pa
+        # pylint: disable-next=import-outside-toplevel
+        import pyarrow.parquet as pq
+
+        schema = pa.schema(
+            [("intervalEnd", pa.string()), ("quality", pa.string()), ("demandInterval", pa.uint8())]
+            + [(field, pa.float64()) for field in ARCHIVE_FIELDS]
+        )
+        rows = 0
+        with pq.ParquetWriter(path, schema) as writer:
+            for columns in self.iter_rows(start, end):
+                writer.write_table(pa.table(dict(zip(EXPORT_COLUMNS, columns)), schema=schema))
+                rows += len(columns[0])
+        return rows
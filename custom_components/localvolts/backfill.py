@@ -0,0 +1,108 @@
+"""Backfill of Localvolts intervals missed while Home Assistant was offline."""
+
+import asyncio
+import collections
+import datetime
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# 72 intervals per request; a day's gap is four requests issued at once
+BACKFILL_CHUNK = datetime.timedelta(hours=6)
+BACKFILL_MAX_IN_FLIGHT = 4
+# Gaps longer than this are only backfilled for their most recent part
+BACKFILL_MAX_GAP = datetime.timedelta(days=7)
+
+# Qualities of settled intervals worth ingesting, best first
+BACKFILL_QUALITIES = ("act", "exp")
+
+FetchChunk = Callable[
+    [datetime.datetime, datetime.datetime], Awaitable[List[Dict[str, Any]]]
+]
+
+
+def split_range(
+    start: datetime.datetime,
+    end: datetime.datetime,
+    chunk: datetime.timedelta = BACKFILL_CHUNK,
+) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+    """Split [start, end) into consecutive windows of at most ``chunk``."""
+    windows = []
+    while start < end:
+        windows.append((start, min(start + chunk, end)))
+        start += chunk
+    return windows
+
+
+async def async_stream_range(
+    fetch_chunk: FetchChunk,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    chunk: datetime.timedelta = BACKFILL_CHUNK,
+    max_in_flight: int = BACKFILL_MAX_IN_FLIGHT,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield the records of [start, end) chunk by chunk, in time order.
+
+    Up to ``max_in_flight`` chunk requests run ahead of the consumer, so at
+    most that many chunks are held in memory however long the range is.
+    Any failing chunk ends the stream with its error.
+    """
+    windows = split_range(start, end, chunk)
+    _LOGGER.debug("Fetching %s to %s in %s requests", start, end, len(windows))
+    pending: Deque[asyncio.Task] = collections.deque()
+    next_window = 0
+    try:
+        while next_window < len(windows) or pending:
+            while next_window < len(windows) and len(pending) < max_in_flight:
+                pending.append(
+                    asyncio.ensure_future(fetch_chunk(*windows[next_window]))
+                )
+                next_window += 1
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def async_fetch_range(
+    fetch_chunk: FetchChunk,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    chunk: datetime.timedelta = BACKFILL_CHUNK,
+    max_in_flight: int = BACKFILL_MAX_IN_FLIGHT,
+) -> List[Dict[str, Any]]:
+    """Fetch [start, end) as concurrent chunked requests, returned in order."""
+    records: List[Dict[str, Any]] = []
+    async for chunk_records in async_stream_range(
+        fetch_chunk, start, end, chunk, max_in_flight
+    ):
+        records.extend(chunk_records)
+    return records
+
+
+def merge_intervals(
+    records: List[Dict[str, Any]],
+    parse_time: Callable[[str], datetime.datetime],
+    after: datetime.datetime,
+    before: datetime.datetime,
+) -> List[Tuple[datetime.datetime, Dict[str, Any]]]:
+    """Return settled records strictly between ``after`` and ``before``.
+
+    Records are deduplicated by intervalEnd, preferring 'act' over 'exp'
+    quality, and returned as (intervalEnd, record) pairs in time order.
+    """
+    merged: Dict[datetime.datetime, Dict[str, Any]] = {}
+    for item in records:
+        quality = item.get("quality", "").lower()
+        if quality not in BACKFILL_QUALITIES or not item.get("intervalEnd"):
+            continue
+        interval_end = parse_time(item["intervalEnd"])
+        if not after < interval_end < before:
+            continue
+        existing = merged.get(interval_end)
+        if existing is None or BACKFILL_QUALITIES.index(
+            quality
+        ) <= BACKFILL_QUALITIES.index(existing.get("quality", "").lower()):
+            merged[interval_end] = item
+    return sorted(merged.items(), key=lambda pair: pair[0])
@@ -0,0 +1,167 @@
+"""Month-to-date billing totals and demand-window peak for Localvolts."""
+
+import datetime
+import logging
+import math
+from typing import Any, Dict, Optional
+
+from homeassistant.util import dt as dt_util
+
+from .accumulators import ACCUMULATED_FIELDS
+from .const import INTERVAL_LENGTH
+from .forecast import ForecastStore
+from .models import parse_number
+
+_LOGGER = logging.getLogger(__name__)
+
+# kWh in one interval -> average kW over it
+INTERVALS_PER_HOUR = datetime.timedelta(hours=1) // INTERVAL_LENGTH
+
+
+def _month_of(interval_end: datetime.datetime) -> datetime.date:
+    """Return the first day of the local month an interval starts in."""
+    return dt_util.as_local(interval_end - INTERVAL_LENGTH).date().replace(day=1)
+
+
+def _next_month(month: datetime.date) -> datetime.date:
+    """Return the first day of the month after ``month``."""
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+class MonthlyBilling:
+    """Month-to-date totals and the peak demand in demand-tariff windows.
+
+    Like IntervalAccumulator, each interval is added once, keyed by its
+    ``intervalEnd``, and the work per interval is constant. Demand is the
+    interval's import as an average kW; only intervals the API flags with
+    ``demandInterval == 1`` count towards the peak.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty billing month."""
+        self.month: Optional[datetime.date] = None
+        self.last_interval_end: Optional[datetime.datetime] = None
+        self.totals: Dict[str, float] = dict.fromkeys(ACCUMULATED_FIELDS, 0.0)
+        self.intervals = 0
+        self.peak_demand: Optional[float] = None
+        self.peak_demand_at: Optional[datetime.datetime] = None
+        self.demand_intervals = 0
+
+    @property
+    def month_start(self) -> Optional[datetime.datetime]:
+        """Return local midnight on the first day of the billing month."""
+        if self.month is None:
+            return None
+        return dt_util.start_of_local_day(self.month)
+
+    @property
+    def month_end(self) -> Optional[datetime.datetime]:
+        """Return local midnight on the first day of the next month."""
+        if self.month is None:
+            return None
+        return dt_util.start_of_local_day(_next_month(self.month))
+
+    def add(self, interval_end: datetime.datetime, item: Dict[str, Any]) -> bool:
+        """Add one interval. Return False if it was already counted."""
+        if self.last_interval_end is not None and interval_end <= self.last_interval_end:
+            return False
+
+        self._start_month(_month_of(interval_end))
+        for field in ACCUMULATED_FIELDS:
+            value = parse_number(item.get(field))
+            if value is not None:
+                self.totals[field] += value
+        self.intervals += 1
+
+        imports = parse_number(item.get("importsAll"))
+        if str(item.get("demandInterval")) == "1" and imports is not None:
+            self.demand_intervals += 1
+            demand = imports * INTERVALS_PER_HOUR
+            if self.peak_demand is None or demand > self.peak_demand:
+                self.peak_demand = demand
+                self.peak_demand_at = interval_end
+        self.last_interval_end = interval_end
+        return True
+
+    def roll_over(self, now: datetime.datetime) -> bool:
+        """Start a new month if the local month has changed. Return True if so."""
+        month = dt_util.as_local(now).date().replace(day=1)
+        if self.month is None or month <= self.month:
+            return False
+        self._start_month(month)
+        return True
+
+    def _start_month(self, month: datetime.date) -> None:
+        """Begin a new billing month."""
+        if month != self.month:
+            self.month = month
+            self.totals = dict.fromkeys(ACCUMULATED_FIELDS, 0.0)
+            self.intervals = 0
+            self.peak_demand = None
+            self.peak_demand_at = None
+            self.demand_intervals = 0
+
+    def project(
+        self, forecast: Optional[ForecastStore], now: datetime.datetime
+    ) -> Optional[float]:
+        """Return the projected month-end cost in cents.
+
+        The month so far is extended interval by interval: over the forecast
+        horizon each interval costs the month's average import and export
+        at that interval's forecast prices; beyond it, or where a price is
+        missing, the month's average cost per interval.
+        """
+        if self.month is None or not self.intervals:
+            return None
+        remaining = max(0, math.ceil((self.month_end - now) / INTERVAL_LENGTH))
+        average_cost = self.totals["costsAll"] / self.intervals
+        projected = self.totals["costsAll"] + remaining * average_cost
+        if forecast is None or not remaining:
+            return projected
+
+        average_import = self.totals["importsAll"] / self.intervals
+        average_export = self.totals["exportsAll"] / self.intervals
+        # The remaining intervals start with the one in progress
+        prices = forecast.series("costsFlexUp", now, remaining)
+        earnings = forecast.series("earningsFlexUp", now, remaining)
+        for price, earning in zip(prices, earnings):
+            if math.isnan(price):
+                continue
+            cost = average_import * price
+            if not math.isnan(earning):
+                cost -= average_export * earning
+            projected += cost - average_cost
+        return projected
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable copy of the month."""
+        return {
+            "month": self.month.isoformat() if self.month else None,
+            "last_interval_end": (
+                self.last_interval_end.isoformat() if self.last_interval_end else None
+            ),
+            "totals": dict(self.totals),
+            "intervals": self.intervals,
+            "peak_demand": self.peak_demand,
+            "peak_demand_at": (
+                self.peak_demand_at.isoformat() if self.peak_demand_at else None
+            ),
+            "demand_intervals": self.demand_intervals,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MonthlyBilling":
+        """Rebuild a month saved by as_dict."""
+        billing = cls()
+        if data.get("month"):
+            billing.month = datetime.date.fromisoformat(data["month"])
+        if data.get("last_interval_end"):
+            billing.last_interval_end = dt_util.parse_datetime(data["last_interval_end"])
+        for field in ACCUMULATED_FIELDS:
+            billing.totals[field] = float(data.get("totals", {}).get(field, 0.0))
+        billing.intervals = int(data.get("intervals", 0))
+        billing.peak_demand = data.get("peak_demand")
+        if data.get("peak_demand_at"):
+            billing.peak_demand_at = dt_util.parse_datetime(data["peak_demand_at"])
+        billing.demand_intervals = int(data.get("demand_intervals", 0))
+        return billing
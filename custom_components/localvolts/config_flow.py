@@ -6,8 +6,25 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_validation as cv
 
-from .const import DOMAIN, CONF_API_KEY, CONF_PARTNER_ID, CONF_NMI_ID
+from .const import (
+    DOMAIN,
+    CONF_API_KEY,
+    CONF_PARTNER_ID,
+    CONF_NMI_ID,
+    CONF_FORECAST_HOURS,
+    CONF_LOW_LATENCY,
+    CONF_PRICE_THRESHOLDS,
+    CONF_BATTERY_CAPACITY,
+    CONF_BATTERY_POWER,
+    CONF_BATTERY_SOC_ENTITY,
+    DEFAULT_FORECAST_HOURS,
+    DEFAULT_LOW_LATENCY,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_BATTERY_POWER,
+    MAX_FORECAST_HOURS,
+)
 from . import validate_api_key, validate_partner_id, validate_nmi_id
+from .events import parse_thresholds
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,9 +35,42 @@ def build_data_schema(existing_data):
             vol.Required(CONF_API_KEY, default=existing_data.get(CONF_API_KEY, "")): cv.string,
             vol.Required(CONF_PARTNER_ID, default=existing_data.get(CONF_PARTNER_ID, "")): cv.string,
             vol.Required(CONF_NMI_ID, default=existing_data.get(CONF_NMI_ID, "")): cv.string,
+            vol.Optional(
+                CONF_FORECAST_HOURS,
+                default=existing_data.get(CONF_FORECAST_HOURS, DEFAULT_FORECAST_HOURS),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_FORECAST_HOURS)),
+            vol.Optional(
+                CONF_LOW_LATENCY,
+                default=existing_data.get(CONF_LOW_LATENCY, DEFAULT_LOW_LATENCY),
+            ): cv.boolean,
+            vol.Optional(
+                CONF_PRICE_THRESHOLDS,
+                default=existing_data.get(CONF_PRICE_THRESHOLDS, ""),
+            ): vol.All(cv.string, _validate_thresholds),
+            vol.Optional(
+                CONF_BATTERY_CAPACITY,
+                default=existing_data.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(
+                CONF_BATTERY_POWER,
+                default=existing_data.get(CONF_BATTERY_POWER, DEFAULT_BATTERY_POWER),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+            vol.Optional(
+                CONF_BATTERY_SOC_ENTITY,
+                default=existing_data.get(CONF_BATTERY_SOC_ENTITY, ""),
+            ): vol.Any("", cv.entity_id),
         }
     )
 
+
+def _validate_thresholds(value):
+    """Check that price thresholds are a comma-separated list of numbers."""
+    try:
+        parse_thresholds(value)
+    except ValueError as err:
+        raise vol.Invalid("Price thresholds must be numbers separated by commas") from err
+    return value
+
 class LocalvoltsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for the Localvolts integration."""
 
@@ -46,6 +96,10 @@ class LocalvoltsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors[CONF_NMI_ID] = "invalid_nmi_id"
 
             if not errors:
+                # One entry per NMI; several NMIs may share a partner ID
+                await self.async_set_unique_id(user_input[CONF_NMI_ID])
+                self._abort_if_unique_id_configured()
+
                 # Use the NMI_ID as the title of the integration
                 title = f"NMI: {user_input[CONF_NMI_ID]}"
                 # Save the configuration and create the entry
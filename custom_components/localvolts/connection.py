@@ -0,0 +1,120 @@
+"""Dedicated, pre-warmed HTTP connection pool for Localvolts API requests."""
+
+import asyncio
+import logging
+from typing import Any, Optional
+
+import aiohttp
+from yarl import URL
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import get_default_context
+
+from .metrics import MetricsRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+# Connections to the API host; a partner rarely needs more than a few at once
+CONNECTION_LIMIT = 10
+# Resolve api.localvolts.com at most this often
+DNS_CACHE_TTL = 300
+# Keep idle connections a little over one interval, from boundary to boundary.
+# The server may drop them sooner, which is what the warm-up is for.
+KEEPALIVE_TIMEOUT = 330.0
+# A warm-up request must not hold up anything; give up on it quickly
+WARMUP_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+
+class LocalvoltsConnectionPool:
+    """aiohttp session of one partner, with its own tuned connector.
+
+    Home Assistant's shared session is built for many hosts and lets idle
+    connections go early, so the first request after a quiet spell pays
+    for DNS, TCP and TLS just after an interval boundary. This session
+    caches DNS, keeps connections alive across an interval and can be
+    warmed shortly before each boundary. New, reused and DNS-cached
+    connections are counted in ``metrics``.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, api_url: str, metrics: MetricsRecorder
+    ) -> None:
+        """Initialize the pool; the session is created on first use."""
+        self.hass = hass
+        self.metrics = metrics
+        # Warm-ups go to the API host's root, which costs no interval request
+        self.warmup_url = str(URL(api_url).origin())
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._unsub_close: Optional[CALLBACK_TYPE] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the pool's session, creating it if needed."""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create the session and close it when Home Assistant stops."""
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True,
+            ssl=get_default_context(),
+        )
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._counter("connections_created"))
+        trace.on_connection_reuseconn.append(self._counter("connections_reused"))
+        trace.on_dns_cache_hit.append(self._counter("dns_cache_hits"))
+        trace.on_dns_cache_miss.append(self._counter("dns_cache_misses"))
+
+        if self._unsub_close is None:
+            self._unsub_close = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_CLOSE, self._async_close_event
+            )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": SERVER_SOFTWARE},
+            trace_configs=[trace],
+        )
+
+    def _counter(self, name: str):
+        """Return a trace callback counting ``name``."""
+
+        async def count(session: Any, context: Any, params: Any) -> None:
+            self.metrics.increment(name)
+
+        return count
+
+    async def async_warm(self) -> None:
+        """Open, or keep open, a connection to the API host.
+
+        The response is irrelevant; only the connection it leaves in the
+        pool matters. Failures are counted and otherwise ignored.
+        """
+        self.metrics.increment("warmups")
+        try:
+            async with self.session.head(
+                self.warmup_url, timeout=WARMUP_TIMEOUT, allow_redirects=False
+            ) as response:
+                await response.release()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            self.metrics.increment("warmup_failures")
+            _LOGGER.debug("Localvolts connection warm-up failed: %s", err)
+
+    async def async_close(self) -> None:
+        """Close the session and its connections."""
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _async_close_event(self, event: Event) -> None:
+        """Close the session as Home Assistant shuts down."""
+        self._unsub_close = None
+        await self.async_close()
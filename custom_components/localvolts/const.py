@@ -1,7 +1,33 @@
 """Constants for the Localvolts integration."""
 
+import datetime
+
 DOMAIN = "localvolts"
 
 CONF_API_KEY = "api_key"
 CONF_PARTNER_ID = "partner_id"
 CONF_NMI_ID = "nmi_id"
+CONF_FORECAST_HOURS = "forecast_hours"
+CONF_LOW_LATENCY = "low_latency"
+CONF_PRICE_THRESHOLDS = "price_thresholds"
+CONF_BATTERY_CAPACITY = "battery_capacity"
+CONF_BATTERY_POWER = "battery_power"
+CONF_BATTERY_SOC_ENTITY = "battery_soc_entity"
+
+DEFAULT_FORECAST_HOURS = 24
+MAX_FORECAST_HOURS = 48
+DEFAULT_LOW_LATENCY = False
+# No battery unless a capacity is configured
+DEFAULT_BATTERY_CAPACITY = 0.0
+DEFAULT_BATTERY_POWER = 5.0
+DEFAULT_BATTERY_EFFICIENCY = 0.9
+
+# The API reports money in cents; entities and services report dollars
+MONETARY_CONVERSION_FACTOR = 100
+
+# Localvolts settles and prices energy in 5-minute intervals
+INTERVAL_LENGTH = datetime.timedelta(minutes=5)
+
+STORAGE_VERSION = 1
+# Seconds to batch state changes before writing them to disk
+STORAGE_SAVE_DELAY = 30
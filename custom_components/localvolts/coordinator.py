@@ -3,8 +3,7 @@
 import asyncio
 import datetime
 import logging
-from dateutil import parser, tz
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import (
@@ -12,13 +11,65 @@ from homeassistant.helpers.update_coordinator import (
     UpdateFailed,
 )
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.util import dt as dt_util
 
 import aiohttp
+import numpy as np
+
+from .accumulators import IntervalAccumulator
+from .api import LocalvoltsApiClient, format_time
+from .archive import IntervalArchive
+from .connection import LocalvoltsConnectionPool
+from .dispatch import BatterySpec, DispatchPlanner, horizon_end_key
+from .backfill import (
+    BACKFILL_MAX_GAP,
+    BACKFILL_QUALITIES,
+    async_stream_range,
+    merge_intervals,
+    split_range,
+)
+from .billing import MonthlyBilling
+from .const import (
+    DEFAULT_FORECAST_HOURS,
+    DOMAIN,
+    INTERVAL_LENGTH,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .events import PriceEventTracker
+from .forecast import INTERVAL_SECONDS, ForecastStore
+from .metrics import MetricsRecorder
+from .models import IntervalRecord
+from .timeparse import parse_timestamp
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = datetime.timedelta(seconds=10)  # Update every 10 seconds
+# Polling cadence. Localvolts publishes an interval's 'exp' record some seconds
+# after the interval starts, so sleep until just past the next boundary, poll
+# quickly until the record shows up, then back off if publication is late.
+BOUNDARY_OFFSET = datetime.timedelta(seconds=2)
+FAST_POLL_INTERVAL = datetime.timedelta(seconds=3)
+FAST_POLL_WINDOW = datetime.timedelta(seconds=90)
+SLOW_POLL_INTERVAL = datetime.timedelta(seconds=15)
+
+# Opt-in low-latency mode: poll every second after the boundary and hedge slow
+# requests, for at most LOW_LATENCY_MAX_POLLS polls (so at most twice that
+# many requests) per interval before falling back to the normal cadence.
+LOW_LATENCY_POLL_INTERVAL = datetime.timedelta(seconds=1)
+LOW_LATENCY_MAX_POLLS = 30
+# A boundary request is hedged once it has taken the p95 request latency,
+# clamped to this range
+HEDGE_MIN_DELAY = 0.3
+HEDGE_MAX_DELAY = 2.0
+
+# Forecasts are revised most often close to now, so the next hour is refreshed
+# every interval and the full horizon only every FORECAST_REFRESH_INTERVAL.
+FORECAST_NEAR_TERM = datetime.timedelta(hours=1)
+FORECAST_REFRESH_INTERVAL = datetime.timedelta(minutes=30)
+
+# History is streamed one request per day of intervals
+HISTORY_CHUNK = datetime.timedelta(days=1)
 
 class LocalvoltsDataUpdateCoordinator(DataUpdateCoordinator):
     """DataUpdateCoordinator to manage fetching data from Localvolts API."""
@@ -30,6 +81,13 @@ class LocalvoltsDataUpdateCoordinator(DataUpdateCoordinator):
         api_key: str,
         partner_id: str,
         nmi_id: str,
+        forecast_hours: int = DEFAULT_FORECAST_HOURS,
+        client: Optional[LocalvoltsApiClient] = None,
+        low_latency: bool = False,
+        price_thresholds: Sequence[float] = (),
+        connections: Optional[LocalvoltsConnectionPool] = None,
+        battery: Optional[BatterySpec] = None,
+        battery_soc_entity: Optional[str] = None,
     ) -> None:
         """Initialize the coordinator."""
         #self.api_key = api_key
@@ -42,21 +100,120 @@ class LocalvoltsDataUpdateCoordinator(DataUpdateCoordinator):
         self.api_key: str = api_key
         self.partner_id: str = partner_id
         self.nmi_id: str = nmi_id
+        self.client: LocalvoltsApiClient = client or LocalvoltsApiClient(partner_id)
+        # The partner's dedicated pool; Home Assistant's shared session if None
+        self.connections: Optional[LocalvoltsConnectionPool] = connections
         self.intervalEnd: Any = None
         self.lastUpdate: Any = None
         self.time_past_start: datetime.timedelta = datetime.timedelta(0)
-        self.data: Dict[str, Any] = {}
+        self.data: Optional[IntervalRecord] = None
+        # True when the latest refresh brought a new interval record
+        self.interval_changed: bool = False
+        # When this NMI next wants polling; the partner's fetch engine owns the timer.
+        self.next_poll: Optional[datetime.datetime] = None
+        self.accumulator = IntervalAccumulator()
+        self.billing = MonthlyBilling()
+        # Polls needed per interval and how late each interval was published
+        self.metrics = MetricsRecorder()
+        self._interval_polls = 0
+        # Start of the interval _interval_polls counts boundary polls for
+        self._polling_interval: Optional[datetime.datetime] = None
+        self.low_latency: bool = low_latency
+        self.events = PriceEventTracker(
+            price_thresholds, datetime.timedelta(hours=forecast_hours) // INTERVAL_LENGTH
+        )
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{nmi_id}")
+        # Every interval ingested, kept on disk for range scans and exports
+        self.archive: Optional[IntervalArchive] = IntervalArchive(
+            hass.config.path(STORAGE_DIR, f"{DOMAIN}.{nmi_id}.intervals")
+        )
+        self.forecast_hours: int = forecast_hours
+        # Room for the whole horizon plus an hour of slack as time moves on
+        self.forecast = ForecastStore(
+            (datetime.timedelta(hours=forecast_hours) + FORECAST_NEAR_TERM) // INTERVAL_LENGTH
+        )
+        # Battery dispatch plan, re-planned off the event loop as forecasts change
+        self.dispatch: Optional[DispatchPlanner] = DispatchPlanner(battery) if battery else None
+        self.battery_soc_entity: Optional[str] = battery_soc_entity
+        self.dispatch_plan: Optional[Dict[str, Any]] = None
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._forecast_task: Optional[asyncio.Task] = None
+        # Backfill of missed intervals, and the live intervals waiting behind it
+        self._backfill_task: Optional[asyncio.Task] = None
+        self._pending_intervals: List[Tuple[datetime.datetime, Dict[str, Any]]] = []
 
 
         super().__init__(
             hass,
             _LOGGER,
-            name="Localvolts Data",
-            update_interval=SCAN_INTERVAL,
+            name=f"Localvolts Data {nmi_id}",
         )
 
-    async def _async_update_data(self) -> Dict[str, Any]:
-        """Fetch data from the API endpoint."""
+    async def async_restore(self) -> None:
+        """Load state persisted by a previous run.
+
+        Restores the accumulators and the last interval seen, so entities
+        have a value from the moment they are added rather than after the
+        first fetch.
+        """
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        if "accumulator" in stored:
+            self.accumulator = IntervalAccumulator.from_dict(stored["accumulator"])
+            _LOGGER.debug("Restored accumulators up to %s", self.accumulator.last_interval_end)
+        if "billing" in stored:
+            self.billing = MonthlyBilling.from_dict(stored["billing"])
+        interval = stored.get("interval")
+        if interval:
+            try:
+                interval_end = self._parse_time(interval["intervalEnd"])
+                last_update = self._parse_time(interval["lastUpdate"])
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning("Ignoring unreadable stored Localvolts interval")
+                return
+            self.intervalEnd = interval_end
+            self.lastUpdate = last_update
+            self.data = IntervalRecord(interval, interval_end, last_update)
+            self.events.prime(self.data)
+            _LOGGER.debug("Restored interval ending %s", interval_end)
+
+    async def async_shutdown(self) -> None:
+        """Stop refreshing and cancel the background backfill, forecast and plan.
+
+        Called when the entry unloads, so a reload does not leave tasks
+        fetching and writing into a coordinator that is being dropped.
+        """
+        await super().async_shutdown()
+        tasks = [
+            task
+            for task in (self._backfill_task, self._forecast_task, self._dispatch_task)
+            if task is not None and not task.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _state_to_save(self) -> Dict[str, Any]:
+        """Return the state to persist across restarts."""
+        return {
+            "accumulator": self.accumulator.as_dict(),
+            "billing": self.billing.as_dict(),
+            # Raw fields of the last interval, timestamps as ISO strings
+            "interval": self.data.attributes if self.data else None,
+        }
+
+    async def _async_update_data(self) -> Optional[IntervalRecord]:
+        """Fetch data from the API endpoint and schedule the next poll."""
+        self.interval_changed = False
+        try:
+            return await self._async_poll_interval()
+        finally:
+            now = dt_util.utcnow()
+            self.next_poll = now + self._next_poll_delay(now)
+
+    async def _async_poll_interval(self) -> Optional[IntervalRecord]:
+        """Retrieve the 'exp' record for the current interval if we lack it."""
         current_utc_time: datetime.datetime = dt_util.utcnow()
         from_time: datetime.datetime = current_utc_time
         to_time: datetime.datetime = current_utc_time + datetime.timedelta(minutes=5)
@@ -66,12 +223,28 @@ class LocalvoltsDataUpdateCoordinator(DataUpdateCoordinator):
         _LOGGER.debug("from_time = %s", from_time)
         _LOGGER.debug("to_time = %s", to_time)
 
+        self.accumulator.roll_over(current_utc_time)
+        self.billing.roll_over(current_utc_time)
+
         # Determine if we need to fetch new data
         if (self.intervalEnd is None) or (current_utc_time > self.intervalEnd):
             _LOGGER.debug("New interval detected. Retrieving the latest data.")
+            polling_interval = self._interval_start(current_utc_time)
+            if polling_interval != self._polling_interval:
+                self._polling_interval = polling_interval
+                self._interval_polls = 0
+            self._interval_polls += 1
             try:
-                session = async_get_clientsession(self.hass)
-                data = await self._fetch_intervals(session, from_time, to_time)
+                session = self._session()
+                # Never answer a boundary poll from cache; it is looking for new data
+                data = await self._fetch_intervals(
+                    session,
+                    from_time,
+                    to_time,
+                    use_cache=False,
+                    critical=True,
+                    hedge_after=self._hedge_delay(),
+                )
             
             
             except aiohttp.ClientError as e:
@@ -82,22 +255,19 @@ class LocalvoltsDataUpdateCoordinator(DataUpdateCoordinator):
             new_data_found = False
             for item in data:
                 if item.get("quality", "").lower() == "exp":
-                    interval_end = parser.isoparse(item["intervalEnd"])
-                    last_update_time = parser.isoparse(item["lastUpdate"])
-
-                    # Ensure timezone awareness
-                    if interval_end.tzinfo is None:
-                        interval_end = interval_end.replace(tzinfo=tz.UTC)
-                    if last_update_time.tzinfo is None:
-                        last_update_time = last_update_time.replace(tzinfo=tz.UTC)
+                    interval_end = self._parse_time(item["intervalEnd"])
+                    last_update_time = self._parse_time(item["lastUpdate"])
 
                     # Update variables
                     self.intervalEnd = interval_end
                     self.lastUpdate = last_update_time
-                    self.data = item
+                    self.data = IntervalRecord(item, interval_end, last_update_time)
+                    self.interval_changed = True
 
-                    interval_start: datetime.datetime = interval_end - datetime.timedelta(minutes=5)
+                    interval_start: datetime.datetime = interval_end - INTERVAL_LENGTH
                     self.time_past_start = last_update_time - interval_start
+                    self._record_interval_metrics(current_utc_time, interval_start)
+                    self._ingest_interval(session, interval_end, item)
                     _LOGGER.debug(
                         "Data updated: intervalEnd=%s, lastUpdate=%s",
                         self.intervalEnd,
@@ -113,10 +283,15 @@ class LocalvoltsDataUpdateCoordinator(DataUpdateCoordinator):
                 self.time_past_start = datetime.timedelta(0)
                 _LOGGER.warning("No 'exp' quality data returned for the interval; marking update as failed.")
                 raise UpdateFailed("No 'exp' quality interval returned")
+
+            if self.forecast_hours:
+                self._schedule_forecast_refresh(session, current_utc_time)
+            else:
+                self._fire_events()
         else:
             _LOGGER.debug("Data did not change. Still in the same interval.")
             if self.intervalEnd:
-                interval_start = self.intervalEnd - datetime.timedelta(minutes=5)
+                interval_start = self.intervalEnd - INTERVAL_LENGTH
                 elapsed = dt_util.utcnow() - interval_start
                 # Clamp to zero to avoid negative durations when interval is in the future.
                 self.time_past_start = elapsed if elapsed > datetime.timedelta(0) else datetime.timedelta(0)
@@ -124,64 +299,308 @@ class LocalvoltsDataUpdateCoordinator(DataUpdateCoordinator):
         # Return self.data to comply with DataUpdateCoordinator requirements
         return self.data
 
-    async def _fetch_intervals(
+    def _record_interval_metrics(
+        self, found_at: datetime.datetime, interval_start: datetime.datetime
+    ) -> None:
+        """Record how a new interval was found, for tuning the poll cadence."""
+        self.metrics.observe("polls_per_interval", self._interval_polls)
+        self.metrics.observe("publication_lag", self.time_past_start.total_seconds())
+        self.metrics.observe(
+            "detection_lag", (found_at - interval_start).total_seconds()
+        )
+        # Time between publication and us seeing it; what low-latency mode cuts
+        self.metrics.observe(
+            "reaction_delay", max((found_at - self.lastUpdate).total_seconds(), 0.0)
+        )
+        self._interval_polls = 0
+
+    def _fire_events(self) -> None:
+        """Fire the price and demand-window events the new interval triggers."""
+        forecast = self.forecast if self.forecast_hours else None
+        for event_type, data in self.events.update(self.data, forecast):
+            _LOGGER.debug("Firing %s: %s", event_type, data)
+            self.hass.bus.async_fire(event_type, {"nmi_id": self.nmi_id, **data})
+
+    def _session(self) -> aiohttp.ClientSession:
+        """Return the session API requests go through."""
+        if self.connections is not None:
+            return self.connections.session
+        return async_get_clientsession(self.hass)
+
+    def _ingest_interval(
         self,
         session: aiohttp.ClientSession,
-        from_time: datetime.datetime,
-        to_time: datetime.datetime,
-    ) -> List[Dict[str, Any]]:
-        """Fetch interval data from the Localvolts API."""
-        from_time_str: str = self._format_time(from_time)
-        to_time_str: str = self._format_time(to_time)
+        interval_end: datetime.datetime,
+        item: Dict[str, Any],
+    ) -> None:
+        """Add a new interval to the totals, backfilling any gap before it.
+
+        The totals only take intervals in time order, so after a gap the
+        new interval waits behind a background backfill rather than holding
+        up the poll that found it.
+        """
+        if self._backfill_task is None or self._backfill_task.done():
+            last = self.accumulator.last_interval_end
+            if last is None or interval_end - last <= INTERVAL_LENGTH:
+                self._add_interval(interval_end, item)
+                return
+            self._backfill_task = self.hass.async_create_background_task(
+                self._async_backfill(session, interval_end),
+                f"localvolts backfill {self.nmi_id}",
+            )
+        self._pending_intervals.append((interval_end, item))
+
+    def _add_interval(
+        self, interval_end: datetime.datetime, item: Dict[str, Any], flush: bool = True
+    ) -> None:
+        """Add an interval to the totals and archive, and schedule a save."""
+        self.accumulator.add(interval_end, item)
+        self.billing.add(interval_end, item)
+        self._archive_interval(interval_end, item, flush=flush)
+        self._store.async_delay_save(self._state_to_save, STORAGE_SAVE_DELAY)
 
-        url: str = (
-            f"https://api.localvolts.com/v1/customer/interval?"
-            f"NMI={self.nmi_id}&from={from_time_str}&to={to_time_str}"
+    def _archive_interval(
+        self, interval_end: datetime.datetime, item: Dict[str, Any], flush: bool = False
+    ) -> None:
+        """Queue an interval for the archive, writing the queue out in the executor."""
+        if self.archive is None:
+            return
+        self.archive.add(interval_end, item)
+        if flush:
+            self.hass.async_add_executor_job(self._flush_archive)
+
+    def _flush_archive(self) -> None:
+        """Write queued intervals to the archive. Runs in the executor."""
+        try:
+            self.archive.flush()
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Failed to write the Localvolts interval archive: %s", err)
+
+    async def _async_backfill(
+        self,
+        session: aiohttp.ClientSession,
+        interval_end: datetime.datetime,
+    ) -> int:
+        """Ingest intervals missed between the last one seen and interval_end.
+
+        Runs in the background. Returns the number of intervals ingested. A
+        failed backfill is logged and abandoned after the chunks already
+        ingested; either way the intervals published meanwhile are added
+        once it finishes.
+        """
+        last = self.accumulator.last_interval_end
+        if last is None or interval_end - last <= INTERVAL_LENGTH:
+            return 0
+
+        start = max(last, interval_end - BACKFILL_MAX_GAP)
+        _LOGGER.info("Backfilling Localvolts intervals from %s to %s", start, interval_end)
+        ingested = 0
+        try:
+            # Chunks arrive in time order, so each is ingested as it lands
+            async for records in async_stream_range(
+                lambda from_time, to_time: self._fetch_intervals(session, from_time, to_time),
+                start,
+                interval_end - INTERVAL_LENGTH,
+            ):
+                for missed_end, missed in merge_intervals(
+                    records, self._parse_time, self.accumulator.last_interval_end, interval_end
+                ):
+                    ingested += self.accumulator.add(missed_end, missed)
+                    self.billing.add(missed_end, missed)
+                    self._archive_interval(missed_end, missed)
+        except (aiohttp.ClientError, asyncio.TimeoutError, UpdateFailed) as err:
+            _LOGGER.warning("Backfill of missed Localvolts intervals failed: %s", err)
+        # Not reached if cancelled: the coordinator is being shut down
+        pending, self._pending_intervals = self._pending_intervals, []
+        for index, (pending_end, pending_item) in enumerate(pending, 1):
+            # One archive write for the whole batch
+            self._add_interval(pending_end, pending_item, flush=index == len(pending))
+        _LOGGER.debug("Backfilled %s intervals", ingested)
+        self.async_update_listeners()
+        return ingested
+
+    async def async_stream_history(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> AsyncIterator[Tuple[datetime.datetime, Dict[str, Any]]]:
+        """Yield settled (intervalEnd, record) pairs in [start, end).
+
+        Records are decoded from the response body one at a time and handed
+        straight to the caller, so memory stays flat however long the range.
+        A record on a request boundary may be yielded twice; consumers
+        deduplicate by intervalEnd.
+        """
+        session = self._session()
+        for window_start, window_end in split_range(start, end, HISTORY_CHUNK):
+            async for item in self.client.async_stream_intervals(
+                session, self.api_key, self.nmi_id, window_start, window_end
+            ):
+                if item.get("quality", "").lower() in BACKFILL_QUALITIES and item.get(
+                    "intervalEnd"
+                ):
+                    yield self._parse_time(item["intervalEnd"]), item
+
+    def _schedule_forecast_refresh(
+        self, session: aiohttp.ClientSession, now: datetime.datetime
+    ) -> None:
+        """Refresh the forecast in the background once the interval is published.
+
+        The battery plan and the interval's events follow the refresh, as
+        the rank events compare the new price with the forecast horizon. If
+        the previous refresh is somehow still running, the events fire now
+        against the forecast already held.
+        """
+        if self._forecast_task is not None and not self._forecast_task.done():
+            self._fire_events()
+            return
+        self._forecast_task = self.hass.async_create_background_task(
+            self._async_forecast_cycle(session, now), f"localvolts forecast {self.nmi_id}"
         )
 
-        headers: Dict[str, str] = {
-            "Authorization": f"apikey {self.api_key}",
-            "partner": self.partner_id,
-        }
+    async def _async_forecast_cycle(
+        self, session: aiohttp.ClientSession, now: datetime.datetime
+    ) -> None:
+        """Refresh the forecast, then re-plan the battery and fire events."""
+        await self._async_refresh_forecast(session, now)
+        self._schedule_dispatch(now)
+        self._fire_events()
+        # The forecast sensors read the store the refresh just updated
+        self.async_update_listeners()
 
-        data: Any = None
-        attempts = 3
-        for attempt in range(1, attempts + 1):
-            async with session.get(url, headers=headers) as response:
-                if response.status == 401:
-                    _LOGGER.critical("Unauthorized access: Check your API key.")
-                    raise UpdateFailed("Unauthorized access: Invalid API key.")
-                if response.status == 403:
-                    _LOGGER.critical("Forbidden: Check your Partner ID.")
-                    raise UpdateFailed("Forbidden: Invalid Partner ID.")
-                if response.status == 429 or response.status >= 500:
-                    if attempt == attempts:
-                        raise UpdateFailed(f"Localvolts API returned {response.status}")
-                    delay = 2 ** (attempt - 1)
-                    _LOGGER.warning(
-                        "Localvolts API returned %s. Retrying in %ss (attempt %s/%s).",
-                        response.status,
-                        delay,
-                        attempt,
-                        attempts,
-                    )
-                    await asyncio.sleep(delay)
-                    continue
+    async def _async_refresh_forecast(
+        self,
+        session: aiohttp.ClientSession,
+        now: datetime.datetime,
+    ) -> None:
+        """Refresh the forecast store; failures only leave it stale."""
+        full = (
+            self.forecast.last_refresh is None
+            or now - self.forecast.last_refresh >= FORECAST_REFRESH_INTERVAL
+        )
+        horizon = datetime.timedelta(hours=self.forecast_hours) if full else FORECAST_NEAR_TERM
+        try:
+            data = await self._fetch_intervals(session, now, now + horizon)
+        except (aiohttp.ClientError, asyncio.TimeoutError, UpdateFailed) as err:
+            _LOGGER.warning("Failed to refresh Localvolts forecast: %s", err)
+            return
 
-                response.raise_for_status()
-                data: Any = await response.json()
-                break
+        changed = self.forecast.update(
+            (self._parse_time(item["intervalEnd"]), item)
+            for item in data
+            if item.get("intervalEnd")
+        )
+        if full:
+            self.forecast.last_refresh = now
+        _LOGGER.debug("Forecast refreshed (%s): %s intervals changed", "full" if full else "near term", changed)
 
-        if isinstance(data, list) and not data:
-            _LOGGER.warning(
-                "No data received, check that your NMI, PartnerID and API Key are correct."
-            )
-            raise UpdateFailed("No data received: Invalid NMI?")
+    def _schedule_dispatch(self, now: datetime.datetime) -> None:
+        """Start re-planning the battery unless a plan is still running."""
+        if self.dispatch is None:
+            return
+        if self._dispatch_task is not None and not self._dispatch_task.done():
+            return
+        self._dispatch_task = self.hass.async_create_background_task(
+            self._async_plan_dispatch(now), f"localvolts dispatch {self.nmi_id}"
+        )
 
-        if not isinstance(data, list):
-            raise UpdateFailed("Unexpected API response format: expected list of intervals")
+    async def _async_plan_dispatch(self, now: datetime.datetime) -> None:
+        """Plan the battery from the current interval over the forecast horizon."""
+        start_key = int(now.timestamp()) // INTERVAL_SECONDS + 1
+        intervals = datetime.timedelta(hours=self.forecast_hours) // INTERVAL_LENGTH
+        # A shared horizon end lets the planner reuse the previous plan's work
+        count = horizon_end_key(start_key, intervals) - start_key
+        imports = np.frombuffer(self.forecast.series("costsFlexUp", now, count))
+        exports = np.frombuffer(self.forecast.series("earningsFlexUp", now, count))
+        soc = self.battery_soc(start_key)
+        self.dispatch_plan = await self.hass.async_add_executor_job(
+            self.dispatch.plan, start_key, soc, imports, exports
+        )
+        _LOGGER.debug(
+            "Battery plan from SoC %.2f: %s of %s intervals recomputed",
+            soc,
+            self.dispatch_plan["recomputed"],
+            count,
+        )
+        self.async_update_listeners()
 
-        return data
+    def battery_soc(self, start_key: int) -> float:
+        """Return the battery's state of charge as a fraction at ``start_key``.
+
+        Read from the configured SoC entity (in %) when it has a number,
+        otherwise taken from where the previous plan expected it to be.
+        """
+        if self.battery_soc_entity:
+            state = self.hass.states.get(self.battery_soc_entity)
+            try:
+                return min(max(float(state.state) / 100, 0.0), 1.0)
+            except (AttributeError, ValueError):
+                _LOGGER.debug("No state of charge from %s", self.battery_soc_entity)
+        plan = self.dispatch_plan
+        if plan is not None:
+            index = start_key - plan["start_key"] - 1
+            if 0 <= index < len(plan["soc"]):
+                return float(plan["soc"][index])
+        return self.dispatch.battery.min_soc
+
+    def _next_poll_delay(self, now: datetime.datetime) -> datetime.timedelta:
+        """Return how long to sleep before the next poll.
+
+        With the current interval in hand there is nothing new to fetch until
+        the next boundary. Otherwise poll quickly for a while after the
+        boundary and then fall back to a slower cadence.
+        """
+        if self.intervalEnd is not None and now < self.intervalEnd:
+            return self.intervalEnd - now + BOUNDARY_OFFSET
+        if self._low_latency_budget(now):
+            return LOW_LATENCY_POLL_INTERVAL
+        if now - self._interval_start(now) < FAST_POLL_WINDOW:
+            return FAST_POLL_INTERVAL
+        return SLOW_POLL_INTERVAL
+
+    def _low_latency_budget(self, now: datetime.datetime) -> bool:
+        """Return True if low-latency polls remain for the interval at ``now``."""
+        if not self.low_latency:
+            return False
+        if self._polling_interval != self._interval_start(now):
+            return True
+        return self._interval_polls < LOW_LATENCY_MAX_POLLS
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Return when to hedge a boundary request, or None not to."""
+        if not self.low_latency or self._interval_polls > LOW_LATENCY_MAX_POLLS:
+            return None
+        latency = self.client.metrics.summary("request_latency")
+        delay = latency["p95"] if latency else HEDGE_MAX_DELAY
+        return min(max(delay, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+    @staticmethod
+    def _interval_start(dt_obj: datetime.datetime) -> datetime.datetime:
+        """Return the start of the 5-minute interval containing dt_obj."""
+        length = int(INTERVAL_LENGTH.total_seconds())
+        timestamp = int(dt_obj.timestamp()) // length * length
+        return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+    async def _fetch_intervals(
+        self,
+        session: aiohttp.ClientSession,
+        from_time: datetime.datetime,
+        to_time: datetime.datetime,
+        use_cache: bool = True,
+        critical: bool = False,
+        hedge_after: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch interval data through the partner's shared API client."""
+        return await self.client.async_get_intervals(
+            session,
+            self.api_key,
+            self.nmi_id,
+            from_time,
+            to_time,
+            use_cache=use_cache,
+            critical=critical,
+            hedge_after=hedge_after,
+        )
 
     @staticmethod
     def _sum_costs(intervals: List[Dict[str, Any]]) -> float:
@@ -199,11 +618,6 @@ class LocalvoltsDataUpdateCoordinator(DataUpdateCoordinator):
                 continue
         return total
 
-    @staticmethod
-    def _format_time(dt_obj: datetime.datetime) -> str:
-        """Format datetime as Localvolts API expects (UTC, Z suffix)."""
-        if dt_obj.tzinfo is None:
-            dt_obj = dt_obj.replace(tzinfo=datetime.timezone.utc)
-        else:
-            dt_obj = dt_obj.astimezone(datetime.timezone.utc)
-        return dt_obj.strftime("%Y-%m-%dT%H:%M:%SZ")
+    _parse_time = staticmethod(parse_timestamp)
+
+    _format_time = staticmethod(format_time)
@@ -0,0 +1,43 @@
+"""Diagnostics support for the Localvolts integration."""
+
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, DOMAIN
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return polling and API metrics for a config entry."""
+    coordinator = hass.data[DOMAIN]["coordinators"][config_entry.entry_id]
+    profiler = hass.data[DOMAIN].get("profiler")
+    return {
+        "entry": {
+            "data": async_redact_data(dict(config_entry.data), TO_REDACT),
+            "options": async_redact_data(dict(config_entry.options), TO_REDACT),
+        },
+        "coordinator": {
+            "interval_end": coordinator.intervalEnd,
+            "last_update": coordinator.lastUpdate,
+            "next_poll": coordinator.next_poll,
+            "low_latency": coordinator.low_latency,
+            "last_update_success": coordinator.last_update_success,
+            "metrics": coordinator.metrics.as_dict(),
+        },
+        "api": {
+            "metrics": coordinator.client.metrics.as_dict(),
+            "circuit": coordinator.client.scheduler.breaker.state,
+        },
+        # Summary of the last localvolts.profile capture, if one has finished
+        "profile": (
+            {"path": profiler.path, "functions": profiler.summary}
+            if profiler is not None and profiler.summary is not None
+            else None
+        ),
+    }
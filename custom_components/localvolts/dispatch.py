@@ -0,0 +1,252 @@
+"""Battery charge/discharge planning over the forecast price series."""
+
+import datetime
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .const import DEFAULT_BATTERY_EFFICIENCY, INTERVAL_LENGTH
+
+_LOGGER = logging.getLogger(__name__)
+
+INTERVALS_PER_HOUR = datetime.timedelta(hours=1) // INTERVAL_LENGTH
+INTERVAL_SECONDS = int(INTERVAL_LENGTH.total_seconds())
+
+# Stored-energy levels the planner chooses between, from empty to full
+SOC_LEVELS = 201
+
+
+class BatterySpec:
+    """Usable capacity (kWh), power limit (kW) and round-trip efficiency."""
+
+    def __init__(
+        self,
+        capacity: float,
+        power: float,
+        efficiency: float = DEFAULT_BATTERY_EFFICIENCY,
+        min_soc: float = 0.0,
+        max_soc: float = 1.0,
+    ) -> None:
+        """Initialize the battery limits; SoC bounds are fractions of capacity."""
+        if capacity <= 0 or power <= 0:
+            raise ValueError("Battery capacity and power must be positive")
+        if not 0 < efficiency <= 1:
+            raise ValueError("Battery efficiency must be in (0, 1]")
+        if not 0 <= min_soc < max_soc <= 1:
+            raise ValueError("Battery SoC limits must satisfy 0 <= min < max <= 1")
+        self.capacity = capacity
+        self.power = power
+        self.efficiency = efficiency
+        self.min_soc = min_soc
+        self.max_soc = max_soc
+
+    def _key(self) -> tuple:
+        return (self.capacity, self.power, self.efficiency, self.min_soc, self.max_soc)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, BatterySpec) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+
+class DispatchPlanner:
+    """Plan battery dispatch for the best import/export price spread.
+
+    Dynamic programming over a grid of ``SOC_LEVELS`` stored-energy levels,
+    backwards in time: for each interval the planner holds the best value
+    still to be had from every level at its start, and the move that gets
+    it. Charging buys energy at the import price and discharging sells it
+    at the export price, with the efficiency loss split evenly between the
+    two. Energy left at the end of the horizon is valued at the average
+    export price of its last hour, so the plan does not dump the battery
+    just because the forecast ends.
+
+    The table is kept by absolute interval. An interval's value only
+    depends on the prices from it to the horizon's end, so a re-plan
+    towards the same end reuses every interval after the last changed
+    price: when the start moves forward, when only near-term prices
+    changed, or when the state of charge differs. ``plan`` does all its
+    work in NumPy and is meant for the executor; one planner must not run
+    two plans at once.
+    """
+
+    def __init__(self, battery: BatterySpec) -> None:
+        """Initialize a planner for one battery."""
+        self.battery = battery
+        low = battery.min_soc * battery.capacity
+        high = battery.max_soc * battery.capacity
+        self.levels = np.linspace(low, high, SOC_LEVELS)
+        self.step = (high - low) / (SOC_LEVELS - 1)
+        # Grid energy per level moved: bought to charge, sold when discharging
+        loss = math.sqrt(battery.efficiency)
+        self._charge_energy = self.step / loss
+        self._discharge_energy = self.step * loss
+        # Furthest the battery can move, in levels, in one interval; the
+        # power limit applies on the grid side
+        limit = battery.power / INTERVALS_PER_HOUR
+        self.max_charge = min(int(limit / self._charge_energy + 1e-9), SOC_LEVELS - 1)
+        self.max_discharge = min(int(limit / self._discharge_energy + 1e-9), SOC_LEVELS - 1)
+
+        # Value-to-go at the start of each interval from _start_key up to
+        # _end_key (the last row is the residual), and the prices behind it
+        self._start_key = 0
+        self._end_key: Optional[int] = None
+        self._residual: Optional[float] = None
+        self._imports = np.empty(0)
+        self._exports = np.empty(0)
+        self._values = np.empty((1, SOC_LEVELS))
+        self._moves = np.empty((0, SOC_LEVELS), dtype=np.int16)
+
+    def level_of(self, soc: float) -> int:
+        """Return the grid level nearest a state of charge given as a fraction."""
+        energy = soc * self.battery.capacity
+        index = round((energy - self.levels[0]) / self.step)
+        return int(min(max(index, 0), SOC_LEVELS - 1))
+
+    def plan(
+        self,
+        start_key: int,
+        soc: float,
+        import_prices: np.ndarray,
+        export_prices: np.ndarray,
+    ) -> Dict[str, Any]:
+        """Return the best plan from interval ``start_key`` at ``soc``.
+
+        Prices are per kWh, one per interval, NaN where unknown; the
+        battery idles through intervals without both prices. Returns the
+        battery power per interval in kW (positive charging), the SoC
+        fraction at the end of each interval, the plan's value in price
+        units, and how many intervals had to be recomputed.
+        """
+        count = min(len(import_prices), len(export_prices))
+        # Copies, as the table is checked against them next time
+        import_prices = np.array(import_prices[:count], dtype=np.float64)
+        export_prices = np.array(export_prices[:count], dtype=np.float64)
+        end_key = start_key + count
+
+        # What is left in the battery is worth the last hour's export price
+        priced = export_prices[~np.isnan(export_prices)][-INTERVALS_PER_HOUR:]
+        residual = float(priced.mean()) * self._discharge_energy / self.step if len(priced) else 0.0
+
+        recompute_until = self._reusable_from(
+            start_key, end_key, residual, import_prices, export_prices
+        )
+        values = np.empty((count + 1, SOC_LEVELS))
+        moves = np.zeros((count, SOC_LEVELS), dtype=np.int16)
+        values[count] = (self.levels - self.levels[0]) * residual
+        if recompute_until < count:
+            offset = start_key - self._start_key
+            values[recompute_until:count] = self._values[offset + recompute_until : offset + count]
+            moves[recompute_until:] = self._moves[offset + recompute_until :]
+        self._values, self._moves = values, moves
+        for t in range(recompute_until - 1, -1, -1):
+            self._step(t, import_prices[t], export_prices[t])
+        self._start_key = start_key
+        self._end_key = end_key
+        self._residual = residual
+        self._imports = import_prices
+        self._exports = export_prices
+
+        path = np.empty(count + 1, dtype=np.int64)
+        level = path[0] = self.level_of(soc)
+        for t in range(count):
+            level += int(moves[t, level])
+            path[t + 1] = level
+
+        steps = np.diff(path)
+        grid = np.where(steps > 0, steps * self._charge_energy, steps * self._discharge_energy)
+        return {
+            "start_key": start_key,
+            "power": grid * INTERVALS_PER_HOUR,
+            "soc": self.levels[path[1:]] / self.battery.capacity,
+            "value": float(values[0, path[0]]),
+            "recomputed": recompute_until,
+        }
+
+    def _reusable_from(
+        self,
+        start_key: int,
+        end_key: int,
+        residual: float,
+        import_prices: np.ndarray,
+        export_prices: np.ndarray,
+    ) -> int:
+        """Return the index of the first interval whose values can be kept.
+
+        Every interval from there to the end has the same prices, horizon
+        end and residual as in the table; ``end_key - start_key`` if none.
+        """
+        count = end_key - start_key
+        if end_key != self._end_key or residual != self._residual:
+            return count
+        # Intervals before the table's start were never planned
+        skip = max(self._start_key - start_key, 0)
+        offset = start_key + skip - self._start_key
+        changed = max(
+            _last_difference(self._imports[offset:], import_prices[skip:]),
+            _last_difference(self._exports[offset:], export_prices[skip:]),
+        )
+        return skip + changed
+
+    def _step(self, t: int, import_price: float, export_price: float) -> None:
+        """Fill row ``t`` from row ``t + 1`` for one interval's prices."""
+        following = self._values[t + 1]
+        best = following.copy()
+        move = np.zeros(SOC_LEVELS, dtype=np.int16)
+        if not (math.isnan(import_price) or math.isnan(export_price)):
+            for delta in range(1, self.max_charge + 1):
+                # Charge: level j moves to j + delta
+                candidate = np.full(SOC_LEVELS, -np.inf)
+                candidate[:-delta] = following[delta:] - delta * self._charge_energy * import_price
+                better = candidate > best
+                best[better] = candidate[better]
+                move[better] = delta
+            for delta in range(1, self.max_discharge + 1):
+                # Discharge: level j moves to j - delta
+                candidate = np.full(SOC_LEVELS, -np.inf)
+                candidate[delta:] = (
+                    following[:-delta] + delta * self._discharge_energy * export_price
+                )
+                better = candidate > best
+                best[better] = candidate[better]
+                move[better] = -delta
+        self._values[t] = best
+        self._moves[t] = move
+
+
+def horizon_end_key(start_key: int, count: int) -> int:
+    """Return the key ending a horizon of at least ``count`` intervals.
+
+    Rounded up to a whole hour, so plans made through an hour share their
+    horizon end and the planner can reuse their work.
+    """
+    return -(-(start_key + count) // INTERVALS_PER_HOUR) * INTERVALS_PER_HOUR
+
+
+def _last_difference(old: np.ndarray, new: np.ndarray) -> int:
+    """Return one past the last index where two equal-length price series
+    differ (NaN equals NaN), or 0 if they are the same."""
+    same = (old == new) | (np.isnan(old) & np.isnan(new))
+    differ = np.flatnonzero(~same)
+    return int(differ[-1]) + 1 if len(differ) else 0
+
+
+def dispatch_schedule(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return a plan as one {start, power, soc} entry per interval.
+
+    Power is in kW (positive charging) and SoC in % at the interval's end.
+    """
+    first = datetime.datetime.fromtimestamp(
+        plan["start_key"] * INTERVAL_SECONDS, tz=datetime.timezone.utc
+    ) - INTERVAL_LENGTH
+    return [
+        {
+            "start": (first + INTERVAL_LENGTH * i).isoformat(),
+            "power": round(power, 2),
+            "soc": round(soc * 100, 1),
+        }
+        for i, (power, soc) in enumerate(zip(plan["power"].tolist(), plan["soc"].tolist()))
+    ]
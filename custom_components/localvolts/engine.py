@@ -0,0 +1,156 @@
+"""Shared fetch engine driving every NMI of one Localvolts partner."""
+
+import asyncio
+import datetime
+import logging
+from typing import Dict, Optional
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .api import LocalvoltsApiClient, interval_end_after
+from .connection import LocalvoltsConnectionPool
+from .coordinator import LocalvoltsDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Coordinators due within this window of the earliest one join the same tick,
+# so NMIs sharing a boundary are fetched together rather than a few ms apart.
+TICK_COALESCE_WINDOW = datetime.timedelta(seconds=1)
+# Warm the connection pool this long before each interval boundary
+WARMUP_LEAD = datetime.timedelta(seconds=5)
+
+
+class LocalvoltsFetchEngine:
+    """Refresh all NMI coordinators of a partner from a single timer.
+
+    Each coordinator still decides when it next needs data (``next_poll``).
+    The engine wakes at the earliest of those times and starts a refresh of
+    every coordinator that is due, each as its own task, over the partner's
+    own connection pool, which it warms shortly before each interval
+    boundary. The engine's API client is shared too, so the NMIs share its
+    response cache and in-flight requests.
+    """
+
+    def __init__(self, hass: HomeAssistant, partner_id: str) -> None:
+        """Initialize the engine."""
+        self.hass = hass
+        self.partner_id = partner_id
+        self.client = LocalvoltsApiClient(partner_id)
+        self.connections = LocalvoltsConnectionPool(
+            hass, self.client.api_url, self.client.metrics
+        )
+        self.coordinators: Dict[str, LocalvoltsDataUpdateCoordinator] = {}
+        # Refreshes still running, by coordinator key
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._unsub_tick: Optional[CALLBACK_TYPE] = None
+        self._unsub_warmup: Optional[CALLBACK_TYPE] = None
+
+    @callback
+    def async_add_coordinator(
+        self, key: str, coordinator: LocalvoltsDataUpdateCoordinator
+    ) -> None:
+        """Start driving a coordinator."""
+        self.coordinators[key] = coordinator
+        self._schedule_tick()
+        if self._unsub_warmup is None:
+            self._schedule_warmup()
+
+    @callback
+    def async_remove_coordinator(self, key: str) -> bool:
+        """Stop driving a coordinator. Return True once the engine is idle."""
+        self.coordinators.pop(key, None)
+        task = self._refreshing.pop(key, None)
+        if task is not None:
+            task.cancel()
+        self._schedule_tick()
+        if not self.coordinators and self._unsub_warmup is not None:
+            self._unsub_warmup()
+            self._unsub_warmup = None
+        return not self.coordinators
+
+    async def async_shutdown(self) -> None:
+        """Close the connection pool of an idle engine."""
+        await self.connections.async_close()
+
+    @callback
+    def _async_tick(self, now: datetime.datetime) -> None:
+        """Start refreshing every coordinator that is due, then re-arm the timer.
+
+        A slow NMI holds up neither the others nor the timer, and one whose
+        previous refresh is still running is left to finish it.
+        """
+        self._unsub_tick = None
+        cutoff = dt_util.utcnow() + TICK_COALESCE_WINDOW
+        due = [
+            (key, coordinator)
+            for key, coordinator in self.coordinators.items()
+            if key not in self._refreshing
+            and (coordinator.next_poll is None or coordinator.next_poll <= cutoff)
+        ]
+        _LOGGER.debug(
+            "Partner %s tick: refreshing %s of %s NMIs",
+            self.partner_id,
+            len(due),
+            len(self.coordinators),
+        )
+        for key, coordinator in due:
+            self._refreshing[key] = self.hass.async_create_background_task(
+                self._async_refresh(key, coordinator), f"localvolts refresh {key}"
+            )
+        self._schedule_tick()
+
+    async def _async_refresh(
+        self, key: str, coordinator: LocalvoltsDataUpdateCoordinator
+    ) -> None:
+        """Refresh one coordinator, then re-arm the timer for its next poll."""
+        try:
+            await coordinator.async_refresh()
+        finally:
+            if self._refreshing.get(key) is asyncio.current_task():
+                del self._refreshing[key]
+                self._schedule_tick()
+
+    @callback
+    def _schedule_tick(self) -> None:
+        """Arm the timer for the earliest idle coordinator that wants polling.
+
+        Coordinators still refreshing re-arm the timer when they finish.
+        """
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+        idle = [
+            coordinator
+            for key, coordinator in self.coordinators.items()
+            if key not in self._refreshing
+        ]
+        if not idle:
+            return
+
+        now = dt_util.utcnow()
+        next_tick = min(coordinator.next_poll or now for coordinator in idle)
+        self._unsub_tick = async_track_point_in_utc_time(
+            self.hass, self._async_tick, max(next_tick, now)
+        )
+
+    async def _async_warmup(self, now: datetime.datetime) -> None:
+        """Warm the connection pool ahead of a boundary, then re-arm."""
+        self._unsub_warmup = None
+        try:
+            await self.connections.async_warm()
+        finally:
+            if self.coordinators:
+                self._schedule_warmup()
+
+    @callback
+    def _schedule_warmup(self) -> None:
+        """Arm the warm-up for just before the next interval boundary."""
+        now = dt_util.utcnow()
+        warm_at = interval_end_after(now) - WARMUP_LEAD
+        if warm_at <= now:
+            warm_at = interval_end_after(now + WARMUP_LEAD) - WARMUP_LEAD
+        self._unsub_warmup = async_track_point_in_utc_time(
+            self.hass, self._async_warmup, warm_at
+        )
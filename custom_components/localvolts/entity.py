@@ -0,0 +1,60 @@
+"""Base entity for Localvolts sensors."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import LocalvoltsDataUpdateCoordinator
+
+# Marks attributes that have not been built yet
+_UNSET = object()
+
+
+class LocalvoltsEntity(CoordinatorEntity[LocalvoltsDataUpdateCoordinator]):
+    """Coordinator entity that only writes state when it has changed.
+
+    Attributes are built by ``_build_attributes`` once per interval record
+    and reused until the coordinator publishes a new one. Entities whose
+    state comes only from the interval record set ``_interval_only`` so a
+    refresh that brought no new interval is skipped without evaluating any
+    properties.
+    """
+
+    _attr_should_poll = False
+    _interval_only = False
+
+    _attributes_record: Any = _UNSET
+    _attributes: dict[str, Any] | None = None
+    _last_state: tuple | None = None
+
+    def _build_attributes(self) -> dict[str, Any] | None:
+        """Return the attributes for the current interval record."""
+        return None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return attributes, rebuilt only when the interval record changes."""
+        record = self.coordinator.data
+        if record is not self._attributes_record:
+            self._attributes = self._build_attributes()
+            self._attributes_record = record
+        return self._attributes
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if availability, value or attributes changed."""
+        if (
+            self._interval_only
+            and not self.coordinator.interval_changed
+            and self._last_state is not None
+            and self._last_state[0] == self.available
+        ):
+            return
+        state = (self.available, self.native_value, self.extra_state_attributes)
+        if state == self._last_state:
+            return
+        self._last_state = state
+        self.async_write_ha_state()
@@ -0,0 +1,159 @@
+"""Price and demand-window events for Localvolts intervals."""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .forecast import ForecastStore
+from .models import IntervalRecord, parse_number
+
+EVENT_PRICE_THRESHOLD = "localvolts_price_threshold"
+EVENT_EXPORT_PRICE_NEGATIVE = "localvolts_export_price_negative"
+EVENT_DEMAND_WINDOW = "localvolts_demand_window"
+EVENT_PRICE_RANK = "localvolts_price_rank"
+
+IMPORT = "import"
+EXPORT = "export"
+
+# Record attribute and forecast field of each price
+PRICES = {
+    IMPORT: ("costs_flex_up", "costsFlexUp"),
+    EXPORT: ("earnings_flex_up", "earningsFlexUp"),
+}
+
+Event = Tuple[str, Dict[str, Any]]
+
+# The rank event fires when the import price moves between these buckets
+# of the horizon (quartiles), not on every change of its exact place
+RANK_BUCKETS = 4
+
+
+def parse_thresholds(value: Any) -> List[float]:
+    """Return sorted $/kWh thresholds from a comma-separated option string."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    thresholds = set()
+    for part in value:
+        part = str(part).strip()
+        if part:
+            thresholds.add(float(part))
+    return sorted(thresholds)
+
+
+class PriceEventTracker:
+    """Work out which events a new interval triggers.
+
+    Holds only the previous interval's prices, demand flag and import price
+    bucket, so each interval costs one comparison per threshold plus one
+    pass over the next ``horizon`` forecast intervals for the rank. Nothing
+    is emitted for the first interval seen (or one restored at startup); it
+    only sets the baseline.
+    """
+
+    def __init__(self, thresholds: Sequence[float] = (), horizon: int = 0) -> None:
+        """Initialize with price thresholds in $/kWh and the rank window in intervals."""
+        self.thresholds = sorted(thresholds)
+        self.horizon = horizon
+        self._prices: Dict[str, Optional[float]] = {}
+        self._demand: Optional[bool] = None
+        self._bucket: Optional[int] = None
+
+    def prime(self, record: IntervalRecord) -> None:
+        """Take a record as the baseline without emitting events."""
+        for price_type, (attribute, _) in PRICES.items():
+            self._prices[price_type] = getattr(record, attribute)
+        self._demand = _demand_active(record)
+
+    def update(
+        self, record: IntervalRecord, forecast: Optional[ForecastStore] = None
+    ) -> List[Event]:
+        """Return the events caused by ``record`` replacing the previous one."""
+        events: List[Event] = []
+        interval_end = record.interval_end_iso
+        for price_type, (attribute, _) in PRICES.items():
+            price = getattr(record, attribute)
+            previous = self._prices.get(price_type)
+            self._prices[price_type] = price
+            if price is None or previous is None:
+                continue
+            for threshold in self.thresholds:
+                if previous < threshold <= price:
+                    direction = "above"
+                elif price < threshold <= previous:
+                    direction = "below"
+                else:
+                    continue
+                events.append(
+                    (
+                        EVENT_PRICE_THRESHOLD,
+                        {
+                            "price_type": price_type,
+                            "threshold": threshold,
+                            "direction": direction,
+                            "price": price,
+                            "interval_end": interval_end,
+                        },
+                    )
+                )
+            if price_type == EXPORT and (price < 0) != (previous < 0):
+                events.append(
+                    (
+                        EVENT_EXPORT_PRICE_NEGATIVE,
+                        {"negative": price < 0, "price": price, "interval_end": interval_end},
+                    )
+                )
+
+        demand = _demand_active(record)
+        if self._demand is not None and demand != self._demand:
+            events.append(
+                (EVENT_DEMAND_WINDOW, {"active": demand, "interval_end": interval_end})
+            )
+        self._demand = demand
+
+        if forecast is not None:
+            events.extend(self._rank_events(record, forecast))
+        return events
+
+    def _rank_events(self, record: IntervalRecord, forecast: ForecastStore) -> List[Event]:
+        """Return a rank event if the import price moved to another bucket of the horizon.
+
+        The window is always the next ``horizon`` intervals, however many of
+        them the forecast has filled, and prices are compared as the raw
+        cents the API sends for both the interval and the forecast.
+        """
+        price = parse_number(record.get("costsFlexUp"))
+        if price is None or not self.horizon:
+            return []
+        upcoming = [
+            value
+            for value in forecast.series("costsFlexUp", record.interval_end, self.horizon)
+            if not math.isnan(value)
+        ]
+        if not upcoming:
+            return []
+        # 1 is cheaper than everything ahead; len(upcoming) + 1 is the dearest
+        rank = 1 + sum(1 for value in upcoming if value < price)
+        intervals = len(upcoming) + 1
+        bucket = 1 + (rank - 1) * RANK_BUCKETS // intervals
+        previous, self._bucket = self._bucket, bucket
+        if previous is None or bucket == previous:
+            return []
+        return [
+            (
+                EVENT_PRICE_RANK,
+                {
+                    "quartile": bucket,
+                    "previous_quartile": previous,
+                    "rank": rank,
+                    "intervals": intervals,
+                    "price": record.costs_flex_up,
+                    "interval_end": record.interval_end_iso,
+                },
+            )
+        ]
+
+
+def _demand_active(record: IntervalRecord) -> bool:
+    """Return True if the record is inside a demand-tariff window."""
+    return str(record.demand_interval) == "1"
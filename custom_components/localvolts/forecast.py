@@ -0,0 +1,128 @@
+"""Forecast horizon store for Localvolts interval prices."""
+
+import datetime
+import logging
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .const import INTERVAL_LENGTH
+
+_LOGGER = logging.getLogger(__name__)
+
+FORECAST_FIELDS = ("costsFlexUp", "earningsFlexUp")
+
+INTERVAL_SECONDS = int(INTERVAL_LENGTH.total_seconds())
+
+# Slot key marking an empty slot
+_EMPTY = -1
+
+
+class ForecastStore:
+    """Forecast values held in flat arrays, one slot per 5-minute interval.
+
+    Slots form a ring indexed by ``intervalEnd // 300 % size``, so looking up
+    an interval is a single array read and the store never needs shifting as
+    time moves on. Each slot remembers which interval it holds so stale slots
+    from an earlier lap of the ring read back as missing.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty store holding ``size`` intervals."""
+        self.size = size
+        self._keys = array("q", [_EMPTY]) * size
+        self._values: Dict[str, array] = {
+            field: array("d", [math.nan]) * size for field in FORECAST_FIELDS
+        }
+        self.last_refresh: Optional[datetime.datetime] = None
+
+    @staticmethod
+    def _interval_key(interval_end: datetime.datetime) -> int:
+        """Return the interval number (intervalEnd epoch / 300) for a datetime."""
+        return int(interval_end.timestamp()) // INTERVAL_SECONDS
+
+    @staticmethod
+    def _key_containing(when: datetime.datetime) -> int:
+        """Return the interval number of the interval containing ``when``."""
+        return int(when.timestamp()) // INTERVAL_SECONDS + 1
+
+    def update(
+        self, records: Iterable[Tuple[datetime.datetime, Dict[str, Any]]]
+    ) -> int:
+        """Write (intervalEnd, record) pairs into the store. Return slots changed."""
+        changed = 0
+        for interval_end, item in records:
+            key = self._interval_key(interval_end)
+            slot = key % self.size
+            slot_changed = self._keys[slot] != key
+            self._keys[slot] = key
+            for field, values in self._values.items():
+                value = item.get(field)
+                try:
+                    value = math.nan if value is None else float(value)
+                except (TypeError, ValueError):
+                    value = math.nan
+                if slot_changed or not _same(values[slot], value):
+                    values[slot] = value
+                    slot_changed = True
+            changed += slot_changed
+        return changed
+
+    def value_at(self, field: str, when: datetime.datetime) -> Optional[float]:
+        """Return the forecast value for the interval containing ``when``."""
+        return self._read(field, self._key_containing(when))
+
+    def next_intervals(
+        self, field: str, start: datetime.datetime, count: int
+    ) -> List[Tuple[datetime.datetime, Optional[float]]]:
+        """Return (intervalEnd, value) for ``count`` intervals from ``start``."""
+        first = self._key_containing(start)
+        return [
+            (
+                datetime.datetime.fromtimestamp(
+                    key * INTERVAL_SECONDS, tz=datetime.timezone.utc
+                ),
+                self._read(field, key),
+            )
+            for key in range(first, first + min(count, self.size))
+        ]
+
+    def series(self, field: str, start: datetime.datetime, count: int) -> array:
+        """Return ``count`` values from ``start`` as an array, NaN where missing."""
+        first = self._key_containing(start)
+        values = self._values[field]
+        keys = self._keys
+        size = self.size
+        result = array("d")
+        for key in range(first, first + min(count, size)):
+            slot = key % size
+            result.append(values[slot] if keys[slot] == key else math.nan)
+        return result
+
+    def horizon_end(self, now: datetime.datetime) -> Optional[datetime.datetime]:
+        """Return the last consecutive intervalEnd held from ``now`` onward."""
+        key = self._key_containing(now)
+        last = None
+        for _ in range(self.size):
+            if self._keys[key % self.size] != key:
+                break
+            last = key
+            key += 1
+        if last is None:
+            return None
+        return datetime.datetime.fromtimestamp(
+            last * INTERVAL_SECONDS, tz=datetime.timezone.utc
+        )
+
+    def _read(self, field: str, key: int) -> Optional[float]:
+        """Return the value stored for an interval number, or None."""
+        slot = key % self.size
+        if self._keys[slot] != key:
+            return None
+        value = self._values[field][slot]
+        return None if math.isnan(value) else value
+
+
+def _same(old: float, new: float) -> bool:
+    """Compare two stored values, treating NaN as equal to NaN."""
+    return old == new or (math.isnan(old) and math.isnan(new))
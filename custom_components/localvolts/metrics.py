@@ -0,0 +1,57 @@
+"""Bounded performance metrics for the Localvolts integration."""
+
+import collections
+from typing import Any, Counter, Deque, Dict, Iterable, Optional
+
+# Samples kept per metric; a day of 5-minute intervals
+METRICS_WINDOW = 288
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentiles(values: Iterable[float]) -> Optional[Dict[str, float]]:
+    """Return count, max and nearest-rank p50/p95/p99 of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    summary: Dict[str, float] = {"count": len(ordered), "max": ordered[-1]}
+    for percentile in PERCENTILES:
+        rank = max(1, -(-percentile * len(ordered) // 100))
+        summary[f"p{percentile}"] = ordered[rank - 1]
+    return summary
+
+
+class MetricsRecorder:
+    """Ring buffers of recent samples plus running counters.
+
+    Each sample series keeps only its last ``size`` values, so memory stays
+    fixed however long Home Assistant runs. Counters count since startup.
+    """
+
+    def __init__(self, size: int = METRICS_WINDOW) -> None:
+        """Initialize empty metrics."""
+        self.size = size
+        self.samples: Dict[str, Deque[float]] = {}
+        self.counters: Counter[str] = collections.Counter()
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample for a series."""
+        series = self.samples.get(name)
+        if series is None:
+            series = self.samples[name] = collections.deque(maxlen=self.size)
+        series.append(value)
+
+    def increment(self, name: str, count: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[name] += count
+
+    def summary(self, name: str) -> Optional[Dict[str, float]]:
+        """Return the percentile summary of a series, or None if it is empty."""
+        return percentiles(self.samples.get(name, ()))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return every summary and counter, e.g. for diagnostics."""
+        return {
+            "summaries": {name: self.summary(name) for name in sorted(self.samples)},
+            "counters": dict(sorted(self.counters.items())),
+        }
@@ -0,0 +1,87 @@
+"""Typed records for Localvolts interval data."""
+
+import datetime
+from typing import Any, Dict, Optional
+
+from .const import MONETARY_CONVERSION_FACTOR
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Return value as a float, or None if it is missing or not numeric."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _dollars(value: Any, digits: int) -> Optional[float]:
+    """Convert a cents value from the API to rounded dollars."""
+    value = parse_number(value)
+    if value is None:
+        return None
+    return round(value / MONETARY_CONVERSION_FACTOR, digits)
+
+
+class IntervalRecord:
+    """One Localvolts interval, converted once when it arrives.
+
+    Numeric fields are already in the units the sensors report (dollars,
+    $/kWh, kWh) so reading state does no lookups or conversions. The raw
+    API fields are kept once, in ``attributes``, with the timestamps as ISO
+    strings, ready to be used as entity attributes. Both attribute
+    dictionaries are shared by every entity and must not be mutated.
+    """
+
+    __slots__ = (
+        "interval_end",
+        "last_update",
+        "quality",
+        "costs_flex_up",
+        "earnings_flex_up",
+        "costs_all",
+        "imports_all",
+        "exports_all",
+        "demand_interval",
+        "interval_end_iso",
+        "last_update_iso",
+        "timestamp_attributes",
+        "attributes",
+    )
+
+    def __init__(
+        self,
+        item: Dict[str, Any],
+        interval_end: datetime.datetime,
+        last_update: datetime.datetime,
+    ) -> None:
+        """Build a record from an API item and its parsed timestamps."""
+        self.interval_end = interval_end
+        self.last_update = last_update
+        self.quality: str = item.get("quality", "").lower()
+        self.costs_flex_up = _dollars(item.get("costsFlexUp"), 3)
+        self.earnings_flex_up = _dollars(item.get("earningsFlexUp"), 3)
+        self.costs_all = _dollars(item.get("costsAll"), 2)
+        self.imports_all = parse_number(item.get("importsAll"))
+        self.exports_all = parse_number(item.get("exportsAll"))
+        self.demand_interval = item.get("demandInterval")
+        self.interval_end_iso = interval_end.isoformat()
+        self.last_update_iso = last_update.isoformat()
+        self.timestamp_attributes: Dict[str, Any] = {
+            "intervalEnd": self.interval_end_iso,
+            "lastUpdate": self.last_update_iso,
+        }
+        self.attributes: Dict[str, Any] = {**item, **self.timestamp_attributes}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a raw API field, like dict.get."""
+        return self.attributes.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a raw API field."""
+        return self.attributes[key]
+
+    def __repr__(self) -> str:
+        """Return a short description for logs."""
+        return f"IntervalRecord({self.interval_end_iso}, {self.quality})"
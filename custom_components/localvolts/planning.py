@@ -0,0 +1,151 @@
+"""Price-series planning helpers working over the forecast store."""
+
+import datetime
+import logging
+from array import array
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .const import INTERVAL_LENGTH
+from .forecast import ForecastStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# kW held for one interval -> kWh
+INTERVALS_PER_HOUR = datetime.timedelta(hours=1) // INTERVAL_LENGTH
+
+
+def as_series(values: array) -> np.ndarray:
+    """View a forecast store series as a float64 NumPy array without copying."""
+    return np.frombuffer(values, dtype=np.float64)
+
+
+def cheapest_contiguous(prices: np.ndarray, count: int) -> Optional[int]:
+    """Return the first index of the cheapest run of ``count`` intervals.
+
+    Window sums come from a cumulative sum, so every window costs one
+    subtraction. Windows touching a missing (NaN) price are skipped.
+    Returns None when no complete window fits.
+    """
+    if count <= 0 or count > len(prices):
+        return None
+    missing = np.isnan(prices)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, prices))))
+    gaps = np.concatenate(([0], np.cumsum(missing)))
+    window_sums = sums[count:] - sums[:-count]
+    window_sums[(gaps[count:] - gaps[:-count]) > 0] = np.inf
+    best = int(np.argmin(window_sums))
+    if not np.isfinite(window_sums[best]):
+        return None
+    return best
+
+
+def cheapest_split(prices: np.ndarray, count: int) -> Optional[np.ndarray]:
+    """Return the sorted indices of the ``count`` cheapest intervals."""
+    available = np.flatnonzero(~np.isnan(prices))
+    if count <= 0 or count > len(available):
+        return None
+    chosen = available[np.argpartition(prices[available], count - 1)[:count]]
+    chosen.sort()
+    return chosen
+
+
+def find_cheapest_window(
+    store: ForecastStore,
+    field: str,
+    start: datetime.datetime,
+    deadline: datetime.datetime,
+    count: int,
+    contiguous: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """Find when to run a load for ``count`` intervals before ``deadline``.
+
+    The search covers the first interval starting at or after ``start``
+    up to the last interval ending by ``deadline``, so the run never
+    starts in the past. Prices are in the store's units (cents/kWh).
+    Returns None when the forecast cannot fit the run.
+    """
+    length = int(INTERVAL_LENGTH.total_seconds())
+    first_start = start + datetime.timedelta(seconds=-int(start.timestamp()) % length)
+    horizon = (deadline - first_start) // INTERVAL_LENGTH
+    if horizon <= 0:
+        return None
+    prices = as_series(store.series(field, first_start, horizon))
+
+    if contiguous:
+        index = cheapest_contiguous(prices, count)
+        if index is None:
+            return None
+        chosen = np.arange(index, index + count)
+    else:
+        chosen = cheapest_split(prices, count)
+        if chosen is None:
+            return None
+
+    intervals: List[Dict[str, Any]] = [
+        {
+            "start": first_start + INTERVAL_LENGTH * int(i),
+            "end": first_start + INTERVAL_LENGTH * (int(i) + 1),
+            "price": float(prices[i]),
+        }
+        for i in chosen
+    ]
+    return {
+        "start": intervals[0]["start"],
+        "end": intervals[-1]["end"],
+        "average_price": float(prices[chosen].mean()),
+        "intervals": intervals,
+    }
+
+
+def simulate_profiles(
+    power: np.ndarray,
+    import_prices: np.ndarray,
+    export_prices: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Price one or more power profiles against interval price series.
+
+    ``power`` is kW per interval, one profile per row; positive values
+    import and negative values export. Prices are per kWh. Everything is
+    computed for all profiles at once, so each extra profile costs a few
+    array operations rather than a Python loop. Intervals with a missing
+    price add nothing to the totals and are counted in ``missing``.
+    """
+    power = np.atleast_2d(np.asarray(power, dtype=np.float64))
+    count = min(power.shape[1], len(import_prices), len(export_prices))
+    energy = power[:, :count] / INTERVALS_PER_HOUR
+    imports = np.clip(energy, 0.0, None)
+    exports = np.clip(-energy, 0.0, None)
+    # Only intervals that actually import (or export) need a price
+    cost = np.where(imports > 0, imports * import_prices[:count], 0.0)
+    earnings = np.where(exports > 0, exports * export_prices[:count], 0.0)
+    missing = (np.isnan(cost) | np.isnan(earnings)).any(axis=0)
+    return {
+        "cost": cost,
+        "earnings": earnings,
+        "total_cost": np.nansum(cost, axis=1),
+        "total_earnings": np.nansum(earnings, axis=1),
+        "missing": missing,
+    }
+
+
+def resample_power(
+    times: np.ndarray, values: np.ndarray, count: int
+) -> np.ndarray:
+    """Return the mean of a step function over ``count`` 5-minute slots.
+
+    ``times`` are seconds from the start of the first slot, ascending, and
+    each value holds until the next time. The value at the first time also
+    covers anything before it. Means are time-weighted, from the integral
+    of the step function at each slot boundary.
+    """
+    length = INTERVAL_LENGTH.total_seconds()
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    boundaries = np.arange(count + 1) * length
+    # Integral of the step function up to each change time
+    area = np.concatenate(([0.0], np.cumsum(values[:-1] * np.diff(times))))
+    index = np.clip(np.searchsorted(times, boundaries, side="right") - 1, 0, None)
+    integral = area[index] + values[index] * (boundaries - times[index])
+    return np.diff(integral) / length
@@ -0,0 +1,166 @@
+"""On-demand cProfile capture of coordinator refresh cycles."""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+from typing import Any, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .coordinator import LocalvoltsDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Functions listed in the full pstats section of the report
+REPORT_LIMIT = 60
+# Integration functions kept in the summary shown in diagnostics
+SUMMARY_LIMIT = 30
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CycleProfiler:
+    """Profile the next ``cycles`` refreshes of some coordinators.
+
+    Each coordinator gets an instance-level ``async_refresh`` that runs the
+    real one with cProfile enabled, which covers the fetch, timestamp
+    parsing and the entity updates and property reads the refresh
+    triggers. Once a coordinator has run its cycles the wrapper is deleted
+    again, so outside a capture nothing is added to the refresh path.
+
+    cProfile sees everything the event loop runs while a cycle is in
+    flight, so other work interleaved with the awaits shows up too; the
+    summary keeps only this integration's functions.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinators: List[LocalvoltsDataUpdateCoordinator],
+        cycles: int,
+        path: str,
+    ) -> None:
+        """Initialize a capture; ``attach`` starts it."""
+        self.hass = hass
+        self.cycles = cycles
+        self.path = path
+        self.profile = cProfile.Profile()
+        self.summary: Optional[List[Dict[str, Any]]] = None
+        self._remaining = {id(coordinator): cycles for coordinator in coordinators}
+        self._coordinators = coordinators
+        self._running = 0
+
+    @property
+    def finished(self) -> bool:
+        """Return True once the report has been handed off."""
+        return not self._remaining
+
+    @callback
+    def attach(self) -> None:
+        """Start profiling the coordinators' next refreshes."""
+        for coordinator in self._coordinators:
+            coordinator.async_refresh = self._wrap(coordinator, coordinator.async_refresh)
+
+    def _wrap(self, coordinator: LocalvoltsDataUpdateCoordinator, refresh):
+        """Return ``refresh`` run under the profiler."""
+
+        async def profiled_refresh() -> None:
+            if self._running == 0:
+                self.profile.enable()
+            self._running += 1
+            try:
+                await refresh()
+            finally:
+                self._running -= 1
+                if self._running == 0:
+                    self.profile.disable()
+                self._cycle_done(coordinator)
+
+        return profiled_refresh
+
+    @callback
+    def _cycle_done(self, coordinator: LocalvoltsDataUpdateCoordinator) -> None:
+        """Count a cycle and finish the coordinator's capture when it is the last."""
+        key = id(coordinator)
+        if key not in self._remaining:
+            return
+        self._remaining[key] -= 1
+        if self._remaining[key] <= 0:
+            self._detach(coordinator)
+            if not self._remaining:
+                self._finish()
+
+    @callback
+    def stop(self) -> None:
+        """End the capture early and report what has been collected."""
+        for coordinator in self._coordinators:
+            if id(coordinator) in self._remaining:
+                self._detach(coordinator)
+        if self._running:
+            self.profile.disable()
+            self._running = 0
+        self._finish()
+
+    def _detach(self, coordinator: LocalvoltsDataUpdateCoordinator) -> None:
+        """Restore the coordinator's own ``async_refresh``."""
+        self._remaining.pop(id(coordinator), None)
+        coordinator.__dict__.pop("async_refresh", None)
+
+    def _finish(self) -> None:
+        """Summarise the capture and write the report in the executor."""
+        self._remaining.clear()
+        try:
+            stats = pstats.Stats(self.profile)
+        except TypeError:
+            # Nothing was recorded
+            _LOGGER.info("Localvolts profile captured no refreshes")
+            self.summary = []
+            return
+        self.summary = summarise(stats)
+        self.hass.async_add_executor_job(self._write_report, stats)
+
+    def _write_report(self, stats: pstats.Stats) -> None:
+        """Write the report file. Runs in the executor."""
+        try:
+            with open(self.path, "w", encoding="utf-8") as file:
+                file.write(format_report(stats, self.summary, self.cycles))
+        except OSError as err:
+            _LOGGER.warning("Failed to write the Localvolts profile: %s", err)
+            return
+        _LOGGER.info("Localvolts profile written to %s", self.path)
+
+
+def summarise(stats: pstats.Stats) -> List[Dict[str, Any]]:
+    """Return this integration's functions by cumulative time, with call counts."""
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        if not os.path.abspath(filename).startswith(PACKAGE_DIR):
+            continue
+        rows.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:SUMMARY_LIMIT]
+
+
+def format_report(stats: pstats.Stats, summary: List[Dict[str, Any]], cycles: int) -> str:
+    """Return the text report: the integration summary, then full pstats output."""
+    out = io.StringIO()
+    out.write(f"Localvolts profile of {cycles} refresh cycle(s) per NMI\n\n")
+    out.write(f"{'cumulative ms':>14} {'own ms':>10} {'calls':>8}  function\n")
+    for row in summary:
+        out.write(
+            f"{row['cumulative_ms']:>14.3f} {row['total_ms']:>10.3f} "
+            f"{row['calls']:>8}  {row['function']}\n"
+        )
+    out.write("\nAll functions, by cumulative time\n\n")
+    stats.stream = out
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LIMIT)
+    return out.getvalue()
@@ -0,0 +1,250 @@
+"""Request scheduling for the Localvolts API: rate limit, back-off and circuit breaker."""
+
+import asyncio
+import datetime
+import email.utils
+import logging
+import random
+import itertools
+import time
+from typing import Awaitable, Callable, Mapping, Optional
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+_LOGGER = logging.getLogger(__name__)
+
+# Localvolts does not publish its quota; these stay well inside what a
+# handful of NMIs polling each boundary needs.
+REQUEST_RATE = 1.0  # tokens per second
+REQUEST_BURST = 10
+# Tokens background requests leave for boundary polls
+CRITICAL_RESERVE = 3
+
+# Longest a request waits for a server back-off before failing instead
+REQUEST_MAX_WAIT = 30.0
+# Retry-After values above this are treated as this
+MAX_RETRY_AFTER = 300.0
+
+# Consecutive server failures that open the circuit
+BREAKER_THRESHOLD = 5
+BREAKER_OPEN_TIME = 30.0
+BREAKER_MAX_OPEN_TIME = 600.0
+BREAKER_JITTER = 0.2
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def parse_retry_after(
+    headers: Mapping[str, str], now: Optional[datetime.datetime] = None
+) -> Optional[float]:
+    """Return the seconds a Retry-After header asks for, or None."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=datetime.timezone.utc)
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        seconds = (when - now).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` up to ``capacity``."""
+
+    def __init__(
+        self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Start with a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    @property
+    def tokens(self) -> float:
+        """Return the tokens currently available."""
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return self._tokens
+
+    def take(self, reserve: float = 0.0) -> float:
+        """Take a token, leaving ``reserve`` behind.
+
+        Returns 0 on success, or the seconds until a token can be taken.
+        """
+        available = self.tokens - reserve
+        if available >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - available) / self.rate
+
+
+class CircuitBreaker:
+    """Stop calling a failing API, probing it again after a jittered pause.
+
+    After ``threshold`` consecutive failures the circuit opens and requests
+    fail immediately. Once the open time has passed a single probe request
+    is let through: success closes the circuit, failure opens it again for
+    twice as long, up to ``max_open_time``.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        open_time: float = BREAKER_OPEN_TIME,
+        max_open_time: float = BREAKER_MAX_OPEN_TIME,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.threshold = threshold
+        self.open_time = open_time
+        self.max_open_time = max_open_time
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._open_for = open_time
+        self._open_until = 0.0
+        self._tickets = itertools.count(1)
+        # Ticket of the request probing a half-open circuit, if one is out
+        self._probe: Optional[int] = None
+
+    def allow(self) -> Optional[int]:
+        """Return a ticket if a request may be sent now, or None.
+
+        Tickets are positive, so they read as True. The request must hand
+        its ticket to release() when it finishes.
+        """
+        if self.state == CLOSED:
+            return next(self._tickets)
+        if self.state == OPEN and self._clock() >= self._open_until:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and self._probe is None:
+            self._probe = next(self._tickets)
+            return self._probe
+        return None
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        if self.state != CLOSED:
+            _LOGGER.info("Localvolts API recovered; resuming requests")
+        self.state = CLOSED
+        self.failures = 0
+        self._open_for = self.open_time
+        self._probe = None
+
+    def release(self, ticket: int) -> None:
+        """Mark the request holding ``ticket`` as finished.
+
+        A probe that ended without an outcome (cancelled, or failed in an
+        unexpected way) lets the next request probe instead of keeping the
+        circuit half-open forever. Other requests, even ones that finish
+        while a probe is out, change nothing.
+        """
+        if ticket == self._probe:
+            self._probe = None
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit once there are too many."""
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self._open_for = min(self._open_for * 2, self.max_open_time)
+        elif self.failures < self.threshold:
+            return
+        self.state = OPEN
+        self._probe = None
+        pause = self._open_for * random.uniform(1 - BREAKER_JITTER, 1 + BREAKER_JITTER)
+        self._open_until = self._clock() + pause
+        _LOGGER.warning(
+            "Localvolts API failed %s times in a row; pausing requests for %.0fs",
+            self.failures,
+            pause,
+        )
+
+
+class RequestScheduler:
+    """Admit requests to the API for every NMI of a partner.
+
+    Requests take a token from a shared bucket; background requests
+    (backfill, forecasts, history) leave a reserve so the boundary poll is
+    never queued behind them. Server back-off hints pause everyone, and a
+    circuit breaker stops requests while the API keeps failing.
+    """
+
+    def __init__(
+        self,
+        rate: float = REQUEST_RATE,
+        burst: float = REQUEST_BURST,
+        reserve: float = CRITICAL_RESERVE,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.breaker = CircuitBreaker(clock=clock)
+        self.reserve = reserve
+        self._clock = clock
+        self._sleep = sleep
+        self._resume_at = 0.0
+
+    async def async_acquire(self, critical: bool = False) -> int:
+        """Wait until a request may be sent and return its breaker ticket.
+
+        Raises UpdateFailed if the circuit is open or the server asked us
+        to back off for longer than REQUEST_MAX_WAIT. The breaker is asked
+        first so requests it refuses never spend a token. Callers that are
+        admitted must pass the ticket to release() once the request has
+        finished.
+        """
+        ticket = self.breaker.allow()
+        if ticket is None:
+            raise UpdateFailed("Localvolts API is unavailable; requests are paused")
+
+        try:
+            while True:
+                backoff = self._resume_at - self._clock()
+                if backoff > REQUEST_MAX_WAIT:
+                    raise UpdateFailed(
+                        f"Localvolts API asked to back off for another {backoff:.0f}s"
+                    )
+                if backoff > 0:
+                    await self._sleep(backoff)
+                    continue
+                wait = self.bucket.take(0 if critical else self.reserve)
+                if not wait:
+                    return ticket
+                _LOGGER.debug("Request rate limited; waiting %.2fs", wait)
+                await self._sleep(wait)
+        except BaseException:
+            self.breaker.release(ticket)
+            raise
+
+    async def async_sleep(self, seconds: float) -> None:
+        """Wait out a retry back-off on the scheduler's clock."""
+        await self._sleep(seconds)
+
+    def defer(self, seconds: float) -> None:
+        """Hold every request for ``seconds`` at the server's request."""
+        self._resume_at = max(self._resume_at, self._clock() + seconds)
+
+    def record_success(self) -> None:
+        """Record a request the server answered."""
+        self.breaker.record_success()
+
+    def record_failure(self) -> None:
+        """Record a server error, timeout or connection failure."""
+        self.breaker.record_failure()
+
+    def release(self, ticket: int) -> None:
+        """Mark an admitted request as finished, however it ended."""
+        self.breaker.release(ticket)
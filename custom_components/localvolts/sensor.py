@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import datetime
 import logging
 from typing import Any
 
@@ -11,20 +12,58 @@ from homeassistant.components.sensor import (
     SensorEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
-from .coordinator import LocalvoltsDataUpdateCoordinator
+from .const import DOMAIN, INTERVAL_LENGTH, MONETARY_CONVERSION_FACTOR
+from .coordinator import LocalvoltsDataUpdateCoordinator
+from .dispatch import dispatch_schedule
+from .entity import LocalvoltsEntity
+from .forecast import INTERVAL_SECONDS
+from .models import IntervalRecord
 
-MONETARY_CONVERSION_FACTOR = 100
-
 COSTS_FLEX_UP = "costsFlexUp"
 EARNINGS_FLEX_UP = "earningsFlexUp"
 ACTUAL_COST = "costsAll"
 ENERGY_USED = "importsAll"
+ENERGY_EXPORTED = "exportsAll"
+
+# IntervalRecord attribute holding each API field, already converted
+RECORD_FIELDS = {
+    COSTS_FLEX_UP: "costs_flex_up",
+    EARNINGS_FLEX_UP: "earnings_flex_up",
+    ACTUAL_COST: "costs_all",
+    ENERGY_USED: "imports_all",
+    ENERGY_EXPORTED: "exports_all",
+}
+
+TODAY = "today"
+MONTH = "month"
+LIFETIME = "lifetime"
+
+# Names and unique-id suffixes for the accumulated total sensors
+TOTAL_SENSOR_NAMES = {
+    (ACTUAL_COST, TODAY): ("Actual cost (today)", "actual_cost_today"),
+    (ENERGY_USED, TODAY): ("Energy used (today)", "energy_used_today"),
+    (ENERGY_EXPORTED, TODAY): ("Energy exported (today)", "energy_exported_today"),
+    (ACTUAL_COST, MONTH): ("Actual cost (this month)", "actual_cost_month"),
+    (ENERGY_USED, MONTH): ("Energy used (this month)", "energy_used_month"),
+    (ENERGY_EXPORTED, MONTH): ("Energy exported (this month)", "energy_exported_month"),
+    (ACTUAL_COST, LIFETIME): ("Actual cost (total)", "actual_cost_total"),
+    (ENERGY_USED, LIFETIME): ("Energy used (total)", "energy_used_total"),
+    (ENERGY_EXPORTED, LIFETIME): ("Energy exported (total)", "energy_exported_total"),
+}
+
+# Diagnostic metric sensors: series -> (name, unit, scale, from the API client)
+METRIC_SENSORS = {
+    "request_latency": ("API latency", "ms", 1000, True),
+    "publication_lag": ("Publication lag", "s", 1, False),
+    "detection_lag": ("Detection lag", "s", 1, False),
+    "reaction_delay": ("Reaction delay", "s", 1, False),
+    "polls_per_interval": ("Polls per interval", None, 1, False),
+}
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,7 +74,7 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Localvolts sensors from a config entry."""
-    coordinator = hass.data[DOMAIN]['coordinator']
+    coordinator = hass.data[DOMAIN]["coordinators"][config_entry.entry_id]
 
     async_add_entities(
         [
@@ -45,38 +84,65 @@ async def async_setup_entry(
             LocalvoltsEnergyUsedSensor(coordinator),
             LocalvoltsDataLagSensor(coordinator),
             LocalvoltsIntervalEndSensor(coordinator),
+            LocalvoltsTotalSensor(coordinator, ACTUAL_COST, TODAY),
+            LocalvoltsTotalSensor(coordinator, ENERGY_USED, TODAY),
+            LocalvoltsTotalSensor(coordinator, ENERGY_EXPORTED, TODAY),
+            LocalvoltsTotalSensor(coordinator, ACTUAL_COST, LIFETIME),
+            LocalvoltsTotalSensor(coordinator, ENERGY_USED, LIFETIME),
+            LocalvoltsTotalSensor(coordinator, ENERGY_EXPORTED, LIFETIME),
+            LocalvoltsTotalSensor(coordinator, ACTUAL_COST, MONTH),
+            LocalvoltsTotalSensor(coordinator, ENERGY_USED, MONTH),
+            LocalvoltsTotalSensor(coordinator, ENERGY_EXPORTED, MONTH),
+            LocalvoltsPeakDemandSensor(coordinator),
+            LocalvoltsProjectedBillSensor(coordinator),
         ]
     )
+    if coordinator.forecast_hours:
+        async_add_entities(
+            [
+                LocalvoltsNextPriceSensor(coordinator, COSTS_FLEX_UP),
+                LocalvoltsNextPriceSensor(coordinator, EARNINGS_FLEX_UP),
+                LocalvoltsCheapestImportSensor(coordinator),
+            ]
+        )
+    if coordinator.dispatch is not None:
+        async_add_entities([LocalvoltsBatteryScheduleSensor(coordinator)])
+    async_add_entities(
+        [LocalvoltsMetricSensor(coordinator, series) for series in METRIC_SENSORS]
+        + [LocalvoltsApiRequestsSensor(coordinator)]
+    )
 
 
-class LocalvoltsSensor(CoordinatorEntity, SensorEntity):
+def _interval_attributes(record: IntervalRecord | None) -> dict[str, Any]:
+    """Return the intervalEnd/lastUpdate attributes shared by most sensors."""
+    if not record:
+        return {"intervalEnd": None, "lastUpdate": None}
+    return record.timestamp_attributes
+
+
+class LocalvoltsSensor(LocalvoltsEntity, SensorEntity):
     """Representation of a generic Localvolts sensor."""
 
-    def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator, data_key: str) -> None:
-        super().__init__(coordinator)
-        self.data_key = data_key
-        self._attr_should_poll = False
-        self._last_value = None
-
-    @property
-    def native_value(self):
-        """Return the state of the sensor (scaled monetary value)."""
-        item = self.coordinator.data
-        if item:
-            value = item.get(self.data_key)
-            if value is not None:
-                self._last_value = round(value / MONETARY_CONVERSION_FACTOR, 3)
-        return self._last_value
+    _interval_only = True
+
+    def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator, data_key: str) -> None:
+        super().__init__(coordinator)
+        self.data_key = data_key
+        self._last_value = None
 
-    @property
-    def extra_state_attributes(self):
-        """Return basic interval attributes (intervalEnd and lastUpdate)."""
-        interval_end = self.coordinator.intervalEnd
-        last_update = self.coordinator.lastUpdate
-        return {
-            "intervalEnd": interval_end.isoformat() if interval_end else None,
-            "lastUpdate": last_update.isoformat() if last_update else None,
-        }
+    @property
+    def native_value(self):
+        """Return the state of the sensor (pre-converted by the interval record)."""
+        record = self.coordinator.data
+        if record:
+            value = getattr(record, RECORD_FIELDS[self.data_key])
+            if value is not None:
+                self._last_value = value
+        return self._last_value
+
+    def _build_attributes(self):
+        """Return basic interval attributes (intervalEnd and lastUpdate)."""
+        return _interval_attributes(self.coordinator.data)
 
 
 class LocalvoltsCostsFlexUpSensor(LocalvoltsSensor):
@@ -90,11 +156,11 @@ class LocalvoltsCostsFlexUpSensor(LocalvoltsSensor):
         self._attr_name = "Import price"
         self._attr_unique_id = f"{coordinator.nmi_id}_{COSTS_FLEX_UP}"
 
-    @property
-    def extra_state_attributes(self):
-        """Extend base attributes with demandInterval if available."""
-        attributes = super().extra_state_attributes
-        demand_interval = self.coordinator.data.get("demandInterval")
+    def _build_attributes(self):
+        """Extend base attributes with demandInterval if available."""
+        attributes = dict(super()._build_attributes())
+        record = self.coordinator.data
+        demand_interval = record.demand_interval if record else None
         if demand_interval is not None:
             attributes["demandInterval"] = demand_interval
         return attributes
@@ -122,49 +188,33 @@ class LocalvoltsActualCostSensor(LocalvoltsSensor):
         super().__init__(coordinator, ACTUAL_COST)
         self._attr_name = "Actual cost (this interval)"
         self._attr_unique_id = f"{coordinator.nmi_id}_actual_cost"
-
-    @property
-    def native_value(self):
-        """Return the total cost in dollars (cents from API / 100)."""
-        item = self.coordinator.data
-        if item:
-            value = item.get(self.data_key)
-            if value is not None:
-                self._last_value = round(value / MONETARY_CONVERSION_FACTOR, 2)
-        return self._last_value
 
 
-class LocalvoltsEnergyUsedSensor(CoordinatorEntity, SensorEntity):
+class LocalvoltsEnergyUsedSensor(LocalvoltsEntity, SensorEntity):
     """Sensor for the energy consumed during the latest 5-minute interval."""
 
     _attr_native_unit_of_measurement = "kWh"
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _interval_only = True
 
     def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator) -> None:
         super().__init__(coordinator)
         self._attr_name = "Energy used (this interval)"
         self._attr_unique_id = f"{coordinator.nmi_id}_energy_used"
-        self._attr_should_poll = False
 
     @property
     def native_value(self):
         """Return the interval energy usage in kWh."""
-        item = self.coordinator.data
-        return item.get(ENERGY_USED) if item else None
+        record = self.coordinator.data
+        return record.imports_all if record else None
 
-    @property
-    def extra_state_attributes(self):
+    def _build_attributes(self):
         """Return interval timestamps for reference."""
-        interval_end = self.coordinator.intervalEnd
-        last_update = self.coordinator.lastUpdate
-        return {
-            "intervalEnd": interval_end.isoformat() if interval_end else None,
-            "lastUpdate": last_update.isoformat() if last_update else None,
-        }
+        return _interval_attributes(self.coordinator.data)
 
 
-class LocalvoltsDataLagSensor(CoordinatorEntity, SensorEntity):
+class LocalvoltsDataLagSensor(LocalvoltsEntity, SensorEntity):
     """Sensor for monitoring the data lag time in seconds."""
 
     _attr_native_unit_of_measurement = "s"
@@ -174,7 +224,6 @@ class LocalvoltsDataLagSensor(CoordinatorEntity, SensorEntity):
         super().__init__(coordinator)
         self._attr_name = "Data Lag"
         self._attr_unique_id = f"{coordinator.nmi_id}_data_lag"
-        self._attr_should_poll = False
 
     @property
     def native_value(self):
@@ -182,54 +231,333 @@ class LocalvoltsDataLagSensor(CoordinatorEntity, SensorEntity):
         time_past_start = self.coordinator.time_past_start
         return time_past_start.total_seconds() if time_past_start else None
 
-    @property
-    def extra_state_attributes(self):
-        """Return basic interval attributes for data lag."""
-        interval_end = self.coordinator.intervalEnd
-        last_update = self.coordinator.lastUpdate
-        return {
-            "intervalEnd": interval_end.isoformat() if interval_end else None,
-            "lastUpdate": last_update.isoformat() if last_update else None,
-        }
+    def _build_attributes(self):
+        """Return basic interval attributes for data lag."""
+        return _interval_attributes(self.coordinator.data)
 
 
-class LocalvoltsIntervalEndSensor(CoordinatorEntity, SensorEntity):
+class LocalvoltsIntervalEndSensor(LocalvoltsEntity, SensorEntity):
     """Sensor for monitoring the end time of the latest interval."""
 
     _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _interval_only = True
 
     def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator) -> None:
         super().__init__(coordinator)
         self._attr_name = "Interval End"
         self._attr_unique_id = f"{coordinator.nmi_id}_interval_end"
-        self._attr_should_poll = False
 
     @property
     def native_value(self):
         """Return the interval end as a datetime object."""
         return self.coordinator.intervalEnd
 
-    @property
-    def extra_state_attributes(self):
-        """
-        Return all available interval fields as attributes.
-
-        This method copies every key/value pair from the coordinator's data dictionary,
-        converting any datetime objects to ISO strings for readability.  It then adds
-        the `lastUpdate` and `intervalEnd` timestamps (converted to ISO strings) so
-        that these are always present.
-        """
-        attrs: dict[str, Any] = {}
-        data = getattr(self.coordinator, "data", {}) or {}
-        # Copy all fields from the data record
-        for key, value in data.items():
-            if hasattr(value, "isoformat"):
-                attrs[key] = value.isoformat()
-            else:
-                attrs[key] = value
-        # Ensure lastUpdate and intervalEnd are included as ISO strings
-        if getattr(self.coordinator, "lastUpdate", None):
-            attrs["lastUpdate"] = self.coordinator.lastUpdate.isoformat()
-        if getattr(self.coordinator, "intervalEnd", None):
-            attrs["intervalEnd"] = self.coordinator.intervalEnd.isoformat()
-        return attrs
+    def _build_attributes(self):
+        """
+        Return all available interval fields as attributes.
+
+        The interval record builds this dictionary once when the interval
+        arrives, with `lastUpdate` and `intervalEnd` as ISO strings, so it is
+        returned as is rather than copied on every state write.
+        """
+        record = self.coordinator.data
+        return record.attributes if record else {}
+
+
+class LocalvoltsTotalSensor(LocalvoltsEntity, SensorEntity):
+    """Sensor for a running total of costsAll, importsAll or exportsAll.
+
+    Totals are accumulated by the coordinator as each new interval arrives,
+    so the Energy dashboard can use them directly. Home Assistant only allows
+    the ``total`` state class for monetary sensors, so the cost totals use it
+    (with ``last_reset`` at local midnight for the daily one and at the start
+    of the month for the monthly one) while the energy totals are
+    ``total_increasing``. Monthly totals come from the billing month.
+    """
+
+    def __init__(
+        self, coordinator: LocalvoltsDataUpdateCoordinator, data_key: str, period: str
+    ) -> None:
+        super().__init__(coordinator)
+        self.data_key = data_key
+        self.period = period
+        name, suffix = TOTAL_SENSOR_NAMES[(data_key, period)]
+        self._attr_name = name
+        self._attr_unique_id = f"{coordinator.nmi_id}_{suffix}"
+        if data_key == ACTUAL_COST:
+            self._attr_native_unit_of_measurement = "$"
+            self._attr_device_class = SensorDeviceClass.MONETARY
+            self._attr_state_class = SensorStateClass.TOTAL
+        else:
+            self._attr_native_unit_of_measurement = "kWh"
+            self._attr_device_class = SensorDeviceClass.ENERGY
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self):
+        """Return the accumulated total (cost in dollars, energy in kWh)."""
+        if self.period == MONTH:
+            totals = self.coordinator.billing.totals
+        else:
+            totals = getattr(self.coordinator.accumulator, self.period)
+        value = totals[self.data_key]
+        if self.data_key == ACTUAL_COST:
+            return round(value / MONETARY_CONVERSION_FACTOR, 2)
+        return round(value, 3)
+
+    @property
+    def last_reset(self):
+        """Return the start of the period for the daily and monthly cost totals."""
+        if self.data_key != ACTUAL_COST:
+            return None
+        if self.period == TODAY:
+            return self.coordinator.accumulator.day_start
+        if self.period == MONTH:
+            return self.coordinator.billing.month_start
+        return None
+
+
+class LocalvoltsPeakDemandSensor(LocalvoltsEntity, SensorEntity):
+    """Sensor for the month's peak demand during demand-tariff intervals."""
+
+    _attr_native_unit_of_measurement = "kW"
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator) -> None:
+        super().__init__(coordinator)
+        self._attr_name = "Peak demand (this month)"
+        self._attr_unique_id = f"{coordinator.nmi_id}_peak_demand_month"
+
+    @property
+    def native_value(self):
+        """Return the highest average kW of any demand interval this month."""
+        peak = self.coordinator.billing.peak_demand
+        return round(peak, 3) if peak is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return when the peak occurred and how many demand intervals there were."""
+        billing = self.coordinator.billing
+        return {
+            "intervalEnd": billing.peak_demand_at.isoformat() if billing.peak_demand_at else None,
+            "demandIntervals": billing.demand_intervals,
+        }
+
+
+class LocalvoltsProjectedBillSensor(LocalvoltsEntity, SensorEntity):
+    """Sensor for the projected energy cost of the whole month.
+
+    Extends the month-to-date cost with the month's average usage at the
+    forecast prices where they are known, and the month's average cost per
+    interval beyond them. Demand charges are not included.
+    """
+
+    _attr_native_unit_of_measurement = "$"
+    _attr_device_class = SensorDeviceClass.MONETARY
+
+    def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator) -> None:
+        super().__init__(coordinator)
+        self._attr_name = "Projected cost (this month)"
+        self._attr_unique_id = f"{coordinator.nmi_id}_projected_cost_month"
+
+    @property
+    def native_value(self):
+        """Return the projected month-end cost in dollars."""
+        forecast = self.coordinator.forecast if self.coordinator.forecast_hours else None
+        projected = self.coordinator.billing.project(forecast, dt_util.utcnow())
+        if projected is None:
+            return None
+        return round(projected / MONETARY_CONVERSION_FACTOR, 2)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the billing month the projection covers."""
+        billing = self.coordinator.billing
+        return {
+            "monthStart": billing.month_start.isoformat() if billing.month_start else None,
+            "monthEnd": billing.month_end.isoformat() if billing.month_end else None,
+        }
+
+
+class LocalvoltsNextPriceSensor(LocalvoltsEntity, SensorEntity):
+    """Sensor for the forecast price of the interval after the current one."""
+
+    _attr_native_unit_of_measurement = "$/kWh"
+    _attr_device_class = SensorDeviceClass.MONETARY
+
+    def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator, data_key: str) -> None:
+        super().__init__(coordinator)
+        self.data_key = data_key
+        label = "Import" if data_key == COSTS_FLEX_UP else "Export"
+        self._attr_name = f"{label} price (next interval)"
+        self._attr_unique_id = f"{coordinator.nmi_id}_{data_key}_next"
+
+    def _current_interval_end(self):
+        """Return the end of the current interval, which starts the next one."""
+        return self.coordinator.intervalEnd or dt_util.utcnow()
+
+    @property
+    def native_value(self):
+        """Return the forecast price in $/kWh."""
+        value = self.coordinator.forecast.value_at(
+            self.data_key, self._current_interval_end()
+        )
+        if value is None:
+            return None
+        return round(value / MONETARY_CONVERSION_FACTOR, 3)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the end of the forecast interval."""
+        next_end = self._current_interval_end() + INTERVAL_LENGTH
+        return {"intervalEnd": next_end.isoformat()}
+
+
+class LocalvoltsCheapestImportSensor(LocalvoltsEntity, SensorEntity):
+    """Sensor for the lowest forecast import price within the horizon."""
+
+    _attr_native_unit_of_measurement = "$/kWh"
+    _attr_device_class = SensorDeviceClass.MONETARY
+
+    def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator) -> None:
+        super().__init__(coordinator)
+        self._attr_name = "Import price (forecast minimum)"
+        self._attr_unique_id = f"{coordinator.nmi_id}_{COSTS_FLEX_UP}_forecast_min"
+
+    def _cheapest(self):
+        """Return (intervalEnd, price) of the cheapest forecast interval."""
+        coordinator = self.coordinator
+        horizon = datetime.timedelta(hours=coordinator.forecast_hours) // INTERVAL_LENGTH
+        intervals = coordinator.forecast.next_intervals(
+            COSTS_FLEX_UP, dt_util.utcnow(), horizon
+        )
+        priced = [(value, end) for end, value in intervals if value is not None]
+        if not priced:
+            return None, None
+        value, end = min(priced)
+        return end, value
+
+    @property
+    def native_value(self):
+        """Return the lowest forecast import price in $/kWh."""
+        _, value = self._cheapest()
+        if value is None:
+            return None
+        return round(value / MONETARY_CONVERSION_FACTOR, 3)
+
+    @property
+    def extra_state_attributes(self):
+        """Return when the cheapest interval ends."""
+        end, _ = self._cheapest()
+        return {"intervalEnd": end.isoformat() if end else None}
+
+
+class LocalvoltsBatteryScheduleSensor(LocalvoltsEntity, SensorEntity):
+    """Sensor for the planned battery power in the current interval.
+
+    Positive values charge and negative values discharge. The rest of the
+    plan is in the ``schedule`` attribute, which is kept out of the
+    recorder.
+    """
+
+    _attr_native_unit_of_measurement = "kW"
+    _attr_device_class = SensorDeviceClass.POWER
+    _unrecorded_attributes = frozenset({"schedule"})
+
+    def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator) -> None:
+        super().__init__(coordinator)
+        self._attr_name = "Battery schedule"
+        self._attr_unique_id = f"{coordinator.nmi_id}_battery_schedule"
+
+    def _offset(self) -> int | None:
+        """Return the index of the current interval in the plan."""
+        plan = self.coordinator.dispatch_plan
+        if plan is None:
+            return None
+        index = int(dt_util.utcnow().timestamp()) // INTERVAL_SECONDS + 1 - plan["start_key"]
+        return index if 0 <= index < len(plan["power"]) else None
+
+    @property
+    def native_value(self):
+        """Return the planned battery power in kW."""
+        index = self._offset()
+        if index is None:
+            return None
+        return round(float(self.coordinator.dispatch_plan["power"][index]), 2)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the plan from the current interval on."""
+        index = self._offset()
+        if index is None:
+            return {"schedule": [], "value": None}
+        plan = self.coordinator.dispatch_plan
+        return {
+            "schedule": dispatch_schedule(plan)[index:],
+            "value": round(plan["value"] / MONETARY_CONVERSION_FACTOR, 2),
+        }
+
+
+class LocalvoltsMetricSensor(LocalvoltsEntity, SensorEntity):
+    """Diagnostic sensor reporting the p95 of a recent metric series.
+
+    The p50/p99, maximum and sample count are attributes. Disabled by
+    default; enable it to tune polling against real data.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator, series: str) -> None:
+        super().__init__(coordinator)
+        self.series = series
+        name, unit, self._scale, from_client = METRIC_SENSORS[series]
+        self._metrics = coordinator.client.metrics if from_client else coordinator.metrics
+        self._attr_name = f"{name} (p95)"
+        self._attr_unique_id = f"{coordinator.nmi_id}_{series}_p95"
+        self._attr_native_unit_of_measurement = unit
+
+    @property
+    def native_value(self):
+        """Return the 95th percentile of the recent samples."""
+        summary = self._metrics.summary(self.series)
+        return round(summary["p95"] * self._scale, 3) if summary else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the rest of the summary."""
+        summary = self._metrics.summary(self.series)
+        if not summary:
+            return {}
+        return {
+            key: value if key == "count" else round(value * self._scale, 3)
+            for key, value in summary.items()
+        }
+
+
+class LocalvoltsApiRequestsSensor(LocalvoltsEntity, SensorEntity):
+    """Diagnostic sensor counting API requests, with status and retry counts."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator: LocalvoltsDataUpdateCoordinator) -> None:
+        super().__init__(coordinator)
+        self._attr_name = "API requests"
+        self._attr_unique_id = f"{coordinator.nmi_id}_api_requests"
+
+    @property
+    def native_value(self):
+        """Return the requests made since startup by this partner's client."""
+        return self.coordinator.client.metrics.counters["requests"]
+
+    @property
+    def extra_state_attributes(self):
+        """Return the per-status, retry and error counters."""
+        return {
+            **dict(self.coordinator.client.metrics.counters),
+            "circuit": self.coordinator.client.scheduler.breaker.state,
+        }
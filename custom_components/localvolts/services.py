@@ -0,0 +1,547 @@
+"""Services for the Localvolts integration."""
+
+import datetime
+import importlib.util
+import logging
+import math
+import os
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import numpy as np
+import voluptuous as vol
+
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_UNIT_OF_MEASUREMENT, UnitOfPower
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    CONF_NMI_ID,
+    DEFAULT_BATTERY_EFFICIENCY,
+    INTERVAL_LENGTH,
+    MONETARY_CONVERSION_FACTOR,
+)
+from .coordinator import LocalvoltsDataUpdateCoordinator
+from .dispatch import BatterySpec, DispatchPlanner, dispatch_schedule
+from .forecast import INTERVAL_SECONDS
+from .planning import (
+    as_series,
+    find_cheapest_window,
+    resample_power,
+    simulate_profiles,
+)
+from .profiling import CycleProfiler
+from .statistics import async_import_statistics
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_FIND_CHEAPEST_WINDOW = "find_cheapest_window"
+SERVICE_IMPORT_STATISTICS = "import_statistics"
+SERVICE_EXPORT_INTERVALS = "export_intervals"
+SERVICE_SIMULATE_COST = "simulate_cost"
+SERVICE_PLAN_BATTERY = "plan_battery"
+SERVICE_PROFILE = "profile"
+
+ATTR_INTERVALS = "intervals"
+ATTR_DEADLINE = "deadline"
+ATTR_CONTIGUOUS = "contiguous"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FORMAT = "format"
+ATTR_PATH = "path"
+ATTR_PROFILE = "profile"
+ATTR_PROFILES = "profiles"
+ATTR_HISTORY_START = "history_start"
+ATTR_HISTORY_END = "history_end"
+ATTR_CAPACITY = "capacity"
+ATTR_POWER = "power"
+ATTR_EFFICIENCY = "efficiency"
+ATTR_SOC = "soc"
+ATTR_MIN_SOC = "min_soc"
+ATTR_MAX_SOC = "max_soc"
+ATTR_CYCLES = "cycles"
+
+EXPORT_FORMATS = ("csv", "parquet")
+# Exports without a path land here, under the config directory
+EXPORT_DIR = "localvolts_exports"
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NMI_ID): cv.string,
+        vol.Required(ATTR_INTERVALS): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+        vol.Optional(ATTR_CONTIGUOUS, default=True): cv.boolean,
+    }
+)
+
+IMPORT_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NMI_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+EXPORT_INTERVALS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NMI_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_FORMAT, default="csv"): vol.In(EXPORT_FORMATS),
+        vol.Optional(ATTR_PATH): cv.string,
+    }
+)
+
+# kW per interval; negative values export
+POWER_PROFILE = vol.All(cv.ensure_list, [vol.Coerce(float)], vol.Length(min=1))
+
+SIMULATE_COST_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(CONF_NMI_ID): cv.string,
+            vol.Exclusive(ATTR_PROFILE, "profile"): POWER_PROFILE,
+            vol.Exclusive(ATTR_PROFILES, "profile"): vol.All(
+                cv.ensure_list, [POWER_PROFILE], vol.Length(min=1)
+            ),
+            vol.Exclusive(ATTR_ENTITY_ID, "profile"): cv.entity_id,
+            vol.Optional(ATTR_HISTORY_START): cv.datetime,
+            vol.Optional(ATTR_HISTORY_END): cv.datetime,
+            vol.Optional(ATTR_START): cv.datetime,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_PROFILE, ATTR_PROFILES, ATTR_ENTITY_ID),
+)
+
+PERCENT = vol.All(vol.Coerce(float), vol.Range(min=0, max=100))
+
+PLAN_BATTERY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NMI_ID): cv.string,
+        vol.Optional(ATTR_CAPACITY): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+        vol.Optional(ATTR_POWER): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+        vol.Optional(ATTR_EFFICIENCY): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=1)),
+        vol.Optional(ATTR_SOC): PERCENT,
+        vol.Optional(ATTR_MIN_SOC, default=0): PERCENT,
+        vol.Optional(ATTR_MAX_SOC, default=100): PERCENT,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NMI_ID): cv.string,
+        vol.Optional(ATTR_CYCLES, default=10): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=1000)
+        ),
+        vol.Optional(ATTR_PATH): cv.string,
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Localvolts services."""
+
+    async def async_find_cheapest_window(call: ServiceCall) -> Dict[str, Any]:
+        """Return the cheapest time to run a load of N intervals."""
+        coordinator = _get_coordinator(hass, call.data.get(CONF_NMI_ID))
+        if not coordinator.forecast_hours:
+            raise ServiceValidationError(
+                f"Forecasts are disabled for NMI {coordinator.nmi_id}"
+            )
+
+        now = dt_util.utcnow()
+        deadline = _as_utc(call.data.get(ATTR_DEADLINE)) or coordinator.forecast.horizon_end(now)
+        if deadline is None:
+            raise HomeAssistantError("No forecast prices available yet")
+
+        window = find_cheapest_window(
+            coordinator.forecast,
+            "costsFlexUp",
+            now,
+            deadline,
+            call.data[ATTR_INTERVALS],
+            contiguous=call.data[ATTR_CONTIGUOUS],
+        )
+        if window is None:
+            raise HomeAssistantError(
+                "Not enough forecast intervals before the deadline for this run"
+            )
+
+        return {
+            "start": window["start"].isoformat(),
+            "end": window["end"].isoformat(),
+            "average_price": round(window["average_price"] / MONETARY_CONVERSION_FACTOR, 5),
+            "intervals": [
+                {
+                    "start": interval["start"].isoformat(),
+                    "end": interval["end"].isoformat(),
+                    "price": round(interval["price"] / MONETARY_CONVERSION_FACTOR, 5),
+                }
+                for interval in window["intervals"]
+            ],
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        async_find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_import_history(call: ServiceCall) -> Dict[str, Any]:
+        """Import interval history into long-term statistics."""
+        coordinator = _get_coordinator(hass, call.data.get(CONF_NMI_ID))
+        if "recorder" not in hass.config.components:
+            raise ServiceValidationError("The recorder is not running")
+
+        start = _as_utc(call.data[ATTR_START])
+        end = _as_utc(call.data.get(ATTR_END)) or dt_util.utcnow().replace(
+            minute=0, second=0, microsecond=0
+        )
+        if start >= end:
+            raise ServiceValidationError("Start must be before end")
+
+        try:
+            hours = await async_import_statistics(hass, coordinator, start, end)
+        except (aiohttp.ClientError, UpdateFailed) as err:
+            raise HomeAssistantError(f"Failed to fetch interval history: {err}") from err
+        return {"hours": hours}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_STATISTICS,
+        async_import_history,
+        schema=IMPORT_STATISTICS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_export_intervals(call: ServiceCall) -> Dict[str, Any]:
+        """Write archived intervals in a date range to a CSV or Parquet file."""
+        coordinator = _get_coordinator(hass, call.data.get(CONF_NMI_ID))
+        if coordinator.archive is None:
+            raise ServiceValidationError(
+                f"No interval archive for NMI {coordinator.nmi_id}"
+            )
+
+        start = _as_utc(call.data[ATTR_START])
+        end = _as_utc(call.data.get(ATTR_END)) or dt_util.utcnow()
+        if start >= end:
+            raise ServiceValidationError("Start must be before end")
+
+        file_format = call.data[ATTR_FORMAT]
+        if file_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+            raise ServiceValidationError("Parquet export needs the pyarrow package")
+
+        path = call.data.get(ATTR_PATH)
+        if path is None:
+            path = hass.config.path(
+                EXPORT_DIR,
+                f"{coordinator.nmi_id}_{start:%Y%m%d%H%M}_{end:%Y%m%d%H%M}.{file_format}",
+            )
+        else:
+            path = hass.config.path(path)
+            if not hass.config.is_allowed_path(os.path.dirname(path)):
+                raise ServiceValidationError(f"Writing to {path} is not allowed")
+
+        # Write out what the coordinator has queued so the export is current
+        await hass.async_add_executor_job(coordinator.archive.flush)
+        export = (
+            coordinator.archive.export_parquet
+            if file_format == "parquet"
+            else coordinator.archive.export_csv
+        )
+        try:
+            rows = await hass.async_add_executor_job(_export, export, path, start, end)
+        except (OSError, ValueError) as err:
+            raise HomeAssistantError(f"Failed to export intervals: {err}") from err
+        return {"path": path, "rows": rows}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_INTERVALS,
+        async_export_intervals,
+        schema=EXPORT_INTERVALS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_simulate_cost(call: ServiceCall) -> Dict[str, Any]:
+        """Price power profiles against the forecast import and export prices."""
+        coordinator = _get_coordinator(hass, call.data.get(CONF_NMI_ID))
+        if not coordinator.forecast_hours:
+            raise ServiceValidationError(
+                f"Forecasts are disabled for NMI {coordinator.nmi_id}"
+            )
+
+        if ATTR_ENTITY_ID in call.data:
+            profiles = [await _async_entity_profile(hass, call.data)]
+        elif ATTR_PROFILES in call.data:
+            profiles = call.data[ATTR_PROFILES]
+        else:
+            profiles = [call.data[ATTR_PROFILE]]
+        length = max(len(profile) for profile in profiles)
+        if any(len(profile) != length for profile in profiles):
+            raise ServiceValidationError("All profiles must have the same length")
+
+        now = dt_util.utcnow()
+        start = _as_utc(call.data.get(ATTR_START)) or now
+        if start < now - INTERVAL_LENGTH:
+            raise ServiceValidationError("Start must not be in the past")
+        # Profiles start with the interval containing ``start``
+        first_start = start - datetime.timedelta(
+            seconds=int(start.timestamp()) % int(INTERVAL_LENGTH.total_seconds())
+        )
+        import_prices = as_series(coordinator.forecast.series("costsFlexUp", start, length))
+        export_prices = as_series(coordinator.forecast.series("earningsFlexUp", start, length))
+        if len(import_prices) < length:
+            raise ServiceValidationError(
+                f"Profiles can cover at most {len(import_prices)} intervals"
+            )
+
+        result = await hass.async_add_executor_job(
+            simulate_profiles, np.array(profiles), import_prices, export_prices
+        )
+        totals = [
+            {
+                "cost": _dollars(cost),
+                "earnings": _dollars(earnings),
+                "net": _dollars(cost - earnings),
+            }
+            for cost, earnings in zip(
+                result["total_cost"].tolist(), result["total_earnings"].tolist()
+            )
+        ]
+        response: Dict[str, Any] = {
+            "start": first_start.isoformat(),
+            "end": (first_start + INTERVAL_LENGTH * length).isoformat(),
+            "missing_prices": int(result["missing"].sum()),
+        }
+        if len(profiles) > 1:
+            net = result["total_cost"] - result["total_earnings"]
+            response["profiles"] = totals
+            response["cheapest"] = int(np.argmin(net))
+            return response
+
+        response.update(totals[0])
+        response["intervals"] = [
+            {
+                "start": (first_start + INTERVAL_LENGTH * i).isoformat(),
+                "power": power,
+                "import_price": _dollars(import_price, 5),
+                "export_price": _dollars(export_price, 5),
+                "cost": _dollars(cost, 4),
+                "earnings": _dollars(earnings, 4),
+            }
+            for i, (power, import_price, export_price, cost, earnings) in enumerate(
+                zip(
+                    profiles[0],
+                    import_prices.tolist(),
+                    export_prices.tolist(),
+                    result["cost"][0].tolist(),
+                    result["earnings"][0].tolist(),
+                )
+            )
+        ]
+        return response
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SIMULATE_COST,
+        async_simulate_cost,
+        schema=SIMULATE_COST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_plan_battery(call: ServiceCall) -> Dict[str, Any]:
+        """Plan battery charging and discharging over the forecast horizon."""
+        coordinator = _get_coordinator(hass, call.data.get(CONF_NMI_ID))
+        if not coordinator.forecast_hours:
+            raise ServiceValidationError(
+                f"Forecasts are disabled for NMI {coordinator.nmi_id}"
+            )
+
+        configured = coordinator.dispatch.battery if coordinator.dispatch else None
+        capacity = call.data.get(ATTR_CAPACITY, configured.capacity if configured else None)
+        power = call.data.get(ATTR_POWER, configured.power if configured else None)
+        if capacity is None or power is None:
+            raise ServiceValidationError(
+                "No battery is configured; give its capacity and power"
+            )
+        try:
+            battery = BatterySpec(
+                capacity,
+                power,
+                call.data.get(ATTR_EFFICIENCY, DEFAULT_BATTERY_EFFICIENCY),
+                call.data[ATTR_MIN_SOC] / 100,
+                call.data[ATTR_MAX_SOC] / 100,
+            )
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+
+        now = dt_util.utcnow()
+        start_key = int(now.timestamp()) // INTERVAL_SECONDS + 1
+        if ATTR_SOC in call.data:
+            soc = call.data[ATTR_SOC] / 100
+        elif coordinator.dispatch is not None:
+            soc = coordinator.battery_soc(start_key)
+        else:
+            soc = battery.min_soc
+        count = datetime.timedelta(hours=coordinator.forecast_hours) // INTERVAL_LENGTH
+        imports = as_series(coordinator.forecast.series("costsFlexUp", now, count))
+        exports = as_series(coordinator.forecast.series("earningsFlexUp", now, count))
+
+        # A planner of its own, so the sensor's plan and its reuse are untouched
+        plan = await hass.async_add_executor_job(
+            DispatchPlanner(battery).plan, start_key, soc, imports, exports
+        )
+        return {
+            "value": _dollars(plan["value"]),
+            "schedule": dispatch_schedule(plan),
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_BATTERY,
+        async_plan_battery,
+        schema=PLAN_BATTERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_profile(call: ServiceCall) -> Dict[str, Any]:
+        """Profile the next refresh cycles, or stop a running capture with 0."""
+        domain_data = hass.data.get(DOMAIN, {})
+        running: Optional[CycleProfiler] = domain_data.get("profiler")
+        if running is not None and running.finished:
+            running = None
+        cycles = call.data[ATTR_CYCLES]
+        if cycles == 0:
+            if running is None:
+                raise ServiceValidationError("No profile is running")
+            running.stop()
+            return {"path": running.path, "cycles": 0}
+        if running is not None:
+            raise ServiceValidationError(
+                f"A profile is already running; it will be written to {running.path}"
+            )
+
+        if CONF_NMI_ID in call.data:
+            coordinators = [_get_coordinator(hass, call.data[CONF_NMI_ID])]
+        else:
+            coordinators = list(domain_data.get("coordinators", {}).values())
+            if not coordinators:
+                raise ServiceValidationError("No Localvolts NMI is configured")
+
+        path = call.data.get(ATTR_PATH)
+        if path is None:
+            path = hass.config.path(
+                f"localvolts_profile_{dt_util.utcnow():%Y%m%d%H%M%S}.txt"
+            )
+        else:
+            path = hass.config.path(path)
+            if not hass.config.is_allowed_path(os.path.dirname(path)):
+                raise ServiceValidationError(f"Writing to {path} is not allowed")
+
+        profiler = CycleProfiler(hass, coordinators, cycles, path)
+        profiler.attach()
+        domain_data["profiler"] = profiler
+        return {"path": path, "cycles": cycles}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_entity_profile(hass: HomeAssistant, data: Dict[str, Any]) -> List[float]:
+    """Return an entity's recorded power history as kW per interval.
+
+    The history between ``history_start`` (default: a day ago) and
+    ``history_end`` (default: now) is averaged over each 5-minute slot,
+    weighted by how long each state held. Non-numeric states are skipped.
+    """
+    if "recorder" not in hass.config.components:
+        raise ServiceValidationError("The recorder is not running")
+    # Imported on use so the integration loads without the recorder
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder import get_instance
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder.history import state_changes_during_period
+
+    entity_id = data[ATTR_ENTITY_ID]
+    end = _as_utc(data.get(ATTR_HISTORY_END)) or dt_util.utcnow()
+    start = _as_utc(data.get(ATTR_HISTORY_START)) or end - datetime.timedelta(days=1)
+    count = (end - start) // INTERVAL_LENGTH
+    if count <= 0:
+        raise ServiceValidationError("History start must be before its end")
+
+    history = await get_instance(hass).async_add_executor_job(
+        partial(
+            state_changes_during_period,
+            hass,
+            start,
+            end,
+            entity_id,
+            no_attributes=False,
+            include_start_time_state=True,
+        )
+    )
+    times: List[float] = []
+    values: List[float] = []
+    for state in history.get(entity_id, []):
+        try:
+            value = float(state.state)
+        except ValueError:
+            continue
+        if state.attributes.get(ATTR_UNIT_OF_MEASUREMENT) == UnitOfPower.WATT:
+            value /= 1000
+        times.append((state.last_changed - start).total_seconds())
+        values.append(value)
+    if not values:
+        raise ServiceValidationError(f"No numeric history for {entity_id}")
+    return resample_power(np.array(times), np.array(values), count).tolist()
+
+
+def _dollars(cents: float, digits: int = 2) -> Optional[float]:
+    """Convert cents to rounded dollars, or None for a missing value."""
+    if math.isnan(cents):
+        return None
+    return round(cents / MONETARY_CONVERSION_FACTOR, digits)
+
+
+def _export(export, path, start, end) -> int:
+    """Create the export's directory and write it. Runs in the executor."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return export(path, start, end)
+
+
+def _get_coordinator(
+    hass: HomeAssistant, nmi_id: Optional[str]
+) -> LocalvoltsDataUpdateCoordinator:
+    """Return the coordinator for an NMI, or the only one if none is given."""
+    coordinators = list(hass.data.get(DOMAIN, {}).get("coordinators", {}).values())
+    if nmi_id is not None:
+        for coordinator in coordinators:
+            if coordinator.nmi_id == nmi_id:
+                return coordinator
+        raise ServiceValidationError(f"NMI {nmi_id} is not configured")
+    if len(coordinators) == 1:
+        return coordinators[0]
+    if not coordinators:
+        raise ServiceValidationError("No Localvolts NMI is configured")
+    raise ServiceValidationError("Several NMIs are configured; specify nmi_id")
+
+
+def _as_utc(value):
+    """Convert a service datetime to UTC, reading naive values as local time."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return dt_util.as_utc(value)
@@ -0,0 +1,242 @@
+"""Import of Localvolts interval history into long-term statistics."""
+
+import datetime
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .backfill import BACKFILL_QUALITIES
+from .const import DOMAIN, MONETARY_CONVERSION_FACTOR
+from .coordinator import LocalvoltsDataUpdateCoordinator
+from .models import parse_number
+
+_LOGGER = logging.getLogger(__name__)
+
+# Hours of statistics handed to the recorder per insert
+STATISTICS_BATCH_HOURS = 24 * 7
+# How far back to look for the running sum an import continues from
+STATISTICS_SUM_LOOKBACK = datetime.timedelta(days=31)
+
+# Units match the sensors reporting the same values
+# API field -> (statistic suffix, name, unit, cents). Summed per hour.
+SUM_STATISTICS = {
+    "costsAll": ("cost", "cost", "$", True),
+    "importsAll": ("energy_imported", "energy imported", "kWh", False),
+    "exportsAll": ("energy_exported", "energy exported", "kWh", False),
+}
+# API field -> (statistic suffix, name, unit). Mean, min and max per hour.
+MEAN_STATISTICS = {
+    "costsFlexUp": ("import_price", "import price", "$/kWh"),
+    "earningsFlexUp": ("export_price", "export price", "$/kWh"),
+}
+
+HourlyValues = Dict[str, Dict[str, float]]
+
+
+def statistic_id(nmi_id: str, suffix: str) -> str:
+    """Return the external statistic id for one series of an NMI."""
+    return f"{DOMAIN}:{nmi_id.lower()}_{suffix}"
+
+
+def statistic_metadata(nmi_id: str) -> Dict[str, Dict[str, Any]]:
+    """Return recorder metadata for each imported field, keyed by field."""
+    metadata = {}
+    for field, (suffix, name, unit, _) in SUM_STATISTICS.items():
+        metadata[field] = {
+            "source": DOMAIN,
+            "statistic_id": statistic_id(nmi_id, suffix),
+            "name": f"Localvolts {nmi_id} {name}",
+            "unit_of_measurement": unit,
+            "has_mean": False,
+            "has_sum": True,
+        }
+    for field, (suffix, name, unit) in MEAN_STATISTICS.items():
+        metadata[field] = {
+            "source": DOMAIN,
+            "statistic_id": statistic_id(nmi_id, suffix),
+            "name": f"Localvolts {nmi_id} {name}",
+            "unit_of_measurement": unit,
+            "has_mean": True,
+            "has_sum": False,
+        }
+    return metadata
+
+
+def hour_start(interval_end: datetime.datetime) -> datetime.datetime:
+    """Return the start of the hour an interval ending at ``interval_end`` falls in."""
+    return (interval_end - datetime.timedelta(microseconds=1)).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+def _summarise_hour(records: Dict[datetime.datetime, Dict[str, Any]]) -> HourlyValues:
+    """Reduce one hour of deduplicated records to per-field statistics."""
+    values: HourlyValues = {}
+    for field, (_, _, _, cents) in SUM_STATISTICS.items():
+        numbers = [n for n in (parse_number(r.get(field)) for r in records.values()) if n is not None]
+        if numbers:
+            total = sum(numbers)
+            values[field] = {"state": total / MONETARY_CONVERSION_FACTOR if cents else total}
+    for field in MEAN_STATISTICS:
+        numbers = [
+            n / MONETARY_CONVERSION_FACTOR
+            for n in (parse_number(r.get(field)) for r in records.values())
+            if n is not None
+        ]
+        if numbers:
+            values[field] = {
+                "mean": sum(numbers) / len(numbers),
+                "min": min(numbers),
+                "max": max(numbers),
+            }
+    return values
+
+
+async def async_hourly_values(
+    pairs: AsyncIterator[Tuple[datetime.datetime, Dict[str, Any]]],
+) -> AsyncIterator[Tuple[datetime.datetime, HourlyValues]]:
+    """Group time-ordered (intervalEnd, record) pairs into hourly values.
+
+    Intervals are deduplicated by intervalEnd, preferring 'act' over 'exp'
+    quality, and only the hour being filled is held in memory. Hours with
+    no records are skipped.
+    """
+    current: Optional[datetime.datetime] = None
+    records: Dict[datetime.datetime, Dict[str, Any]] = {}
+    async for interval_end, item in pairs:
+        hour = hour_start(interval_end)
+        if hour != current:
+            if records:
+                yield current, _summarise_hour(records)
+            current, records = hour, {}
+        existing = records.get(interval_end)
+        if existing is None or BACKFILL_QUALITIES.index(
+            item.get("quality", "").lower()
+        ) <= BACKFILL_QUALITIES.index(existing.get("quality", "").lower()):
+            records[interval_end] = item
+    if records:
+        yield current, _summarise_hour(records)
+
+
+def import_end(
+    end: datetime.datetime, last_stored: Optional[datetime.datetime]
+) -> datetime.datetime:
+    """Return where an import ending at ``end`` has to stop.
+
+    ``end`` is rounded down to the hour so the last hour is never partial.
+    Every stored hour after the range carries a running sum that includes
+    the hours being replaced, so an import reaching into stored history
+    continues through the last stored hour (``last_stored``, its start) to
+    rewrite those sums as well.
+    """
+    end = end.replace(minute=0, second=0, microsecond=0)
+    if last_stored is not None:
+        end = max(end, last_stored + datetime.timedelta(hours=1))
+    return end
+
+
+class StatisticsBatch:
+    """Recorder rows for each field, with running sums carried across batches."""
+
+    def __init__(self, sums: Dict[str, float]) -> None:
+        """Start a batch continuing from the given running sums."""
+        self.sums = dict(sums)
+        self.rows: Dict[str, List[Dict[str, Any]]] = {}
+        self.hours = 0
+
+    def add(self, start: datetime.datetime, values: HourlyValues) -> None:
+        """Add one hour of values."""
+        for field, value in values.items():
+            row: Dict[str, Any] = {"start": start, **value}
+            if field in SUM_STATISTICS:
+                self.sums[field] = self.sums.get(field, 0.0) + value["state"]
+                row["sum"] = self.sums[field]
+            self.rows.setdefault(field, []).append(row)
+        self.hours += 1
+
+    def take(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return the rows gathered so far and start a new batch."""
+        rows, self.rows, self.hours = self.rows, {}, 0
+        return rows
+
+
+async def async_import_statistics(
+    hass: HomeAssistant,
+    coordinator: LocalvoltsDataUpdateCoordinator,
+    start: datetime.datetime,
+    end: datetime.datetime,
+) -> int:
+    """Import the hours in [start, end) as external statistics.
+
+    History is streamed through the coordinator's fetch path and written
+    in batches. Rows are keyed by statistic and hour, so importing a range
+    again replaces it rather than adding to it, and running sums continue
+    from the last stored hour before ``start``. A range ending before the
+    last stored hour is imported through to that hour (see import_end), so
+    the sums after it stay consistent. Returns the number of hours
+    imported.
+    """
+    # Imported on use so the integration loads without the recorder
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder import get_instance
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder.statistics import (
+        async_add_external_statistics,
+        get_last_statistics,
+        statistics_during_period,
+    )
+
+    start = start.replace(minute=0, second=0, microsecond=0)
+    metadata = statistic_metadata(coordinator.nmi_id)
+    sum_ids = {metadata[field]["statistic_id"]: field for field in SUM_STATISTICS}
+    recorder = get_instance(hass)
+
+    last_stored: Optional[datetime.datetime] = None
+    for stat_id in sum_ids:
+        last = await recorder.async_add_executor_job(
+            get_last_statistics, hass, 1, stat_id, False, {"sum"}
+        )
+        for row in last.get(stat_id, []):
+            stored = dt_util.utc_from_timestamp(row["start"])
+            if last_stored is None or stored > last_stored:
+                last_stored = stored
+    end = import_end(end, last_stored)
+
+    previous = await recorder.async_add_executor_job(
+        statistics_during_period,
+        hass,
+        start - STATISTICS_SUM_LOOKBACK,
+        start,
+        set(sum_ids),
+        "hour",
+        None,
+        {"sum"},
+    )
+    batch = StatisticsBatch(
+        {sum_ids[stat_id]: rows[-1]["sum"] or 0.0 for stat_id, rows in previous.items() if rows}
+    )
+
+    def flush() -> None:
+        for field, rows in batch.take().items():
+            async_add_external_statistics(hass, metadata[field], rows)
+
+    imported = 0
+    async for hour, values in async_hourly_values(
+        coordinator.async_stream_history(start, end)
+    ):
+        if not start <= hour < end:
+            continue
+        batch.add(hour, values)
+        imported += 1
+        if batch.hours >= STATISTICS_BATCH_HOURS:
+            flush()
+    flush()
+
+    _LOGGER.info(
+        "Imported %s hours of Localvolts statistics for NMI %s",
+        imported,
+        coordinator.nmi_id,
+    )
+    return imported
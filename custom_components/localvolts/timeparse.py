@@ -0,0 +1,29 @@
+"""Fast parsing of Localvolts API timestamps."""
+
+import datetime
+import functools
+
+from homeassistant.util import dt as dt_util
+
+# Forecast and backfill payloads repeat the same interval boundaries on every
+# refresh, so parsed values are memoised.
+PARSE_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_timestamp(value: str) -> datetime.datetime:
+    """Parse a Localvolts timestamp, assuming UTC when no offset is given.
+
+    Localvolts sends ISO 8601 timestamps such as ``2024-05-03T04:45:00Z``,
+    which ``datetime.fromisoformat`` parses natively. Anything it rejects
+    falls back to Home Assistant's more lenient parser.
+    """
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        parsed = dt_util.parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"Invalid Localvolts timestamp: {value!r}") from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
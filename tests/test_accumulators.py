@@ -0,0 +1,47 @@
+import datetime
+
+from custom_components.localvolts.accumulators import IntervalAccumulator
+
+UTC = datetime.timezone.utc
+
+
+def test_add_sums_fields_and_ignores_repeated_intervals():
+    accumulator = IntervalAccumulator()
+    end = datetime.datetime(2023, 1, 1, 0, 10, tzinfo=UTC)
+
+    assert accumulator.add(end, {"costsAll": 10, "importsAll": 0.5, "exportsAll": None})
+    assert not accumulator.add(end, {"costsAll": 10, "importsAll": 0.5})
+    assert accumulator.add(
+        end + datetime.timedelta(minutes=5), {"costsAll": "2.5", "exportsAll": "bad"}
+    )
+
+    assert accumulator.today == {"costsAll": 12.5, "importsAll": 0.5, "exportsAll": 0.0}
+    assert accumulator.lifetime == accumulator.today
+
+
+def test_daily_totals_reset_at_midnight():
+    accumulator = IntervalAccumulator()
+    accumulator.add(datetime.datetime(2023, 1, 1, 23, 55, tzinfo=UTC), {"costsAll": 4})
+    # Interval 23:55-00:00 still belongs to the first day
+    accumulator.add(datetime.datetime(2023, 1, 2, 0, 0, tzinfo=UTC), {"costsAll": 3})
+    assert accumulator.today["costsAll"] == 7
+
+    accumulator.add(datetime.datetime(2023, 1, 2, 0, 5, tzinfo=UTC), {"costsAll": 1})
+    assert accumulator.today["costsAll"] == 1
+    assert accumulator.lifetime["costsAll"] == 8
+
+    assert accumulator.roll_over(datetime.datetime(2023, 1, 3, 0, 1, tzinfo=UTC))
+    assert accumulator.today["costsAll"] == 0
+    assert accumulator.day_start == datetime.datetime(2023, 1, 3, tzinfo=UTC)
+
+
+def test_round_trip_through_storage_format():
+    accumulator = IntervalAccumulator()
+    accumulator.add(datetime.datetime(2023, 1, 1, 0, 5, tzinfo=UTC), {"importsAll": 1.25})
+
+    restored = IntervalAccumulator.from_dict(accumulator.as_dict())
+
+    assert restored.day == accumulator.day
+    assert restored.last_interval_end == accumulator.last_interval_end
+    assert restored.today == accumulator.today
+    assert restored.lifetime == accumulator.lifetime
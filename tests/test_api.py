@@ -0,0 +1,287 @@
+import asyncio
+import datetime
+import json
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+
+from custom_components.localvolts.api import LocalvoltsApiClient, iter_json_array
+from custom_components.localvolts.ratelimit import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    RequestScheduler,
+)
+
+UTC = datetime.timezone.utc
+BASE = datetime.datetime(2023, 1, 1, 0, 1, tzinfo=UTC)
+WINDOW = (BASE, BASE + datetime.timedelta(hours=1))
+
+
+def _client(monkeypatch, now):
+    monkeypatch.setattr(
+        "custom_components.localvolts.api.dt_util.utcnow", lambda: now[0]
+    )
+    client = LocalvoltsApiClient("partner")
+    calls = []
+
+    async def request(session, api_key, key, critical=False):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return [{"intervalEnd": key[1]}]
+
+    client._async_request = request
+    return client, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_request(monkeypatch):
+    client, calls = _client(monkeypatch, [BASE])
+
+    results = await asyncio.gather(
+        *(client.async_get_intervals(MagicMock(), "key", "nmi", *WINDOW) for _ in range(5))
+    )
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cache_lasts_until_interval_end(monkeypatch):
+    now = [BASE]
+    client, calls = _client(monkeypatch, now)
+
+    await client.async_get_intervals(MagicMock(), "key", "nmi", *WINDOW)
+    now[0] = BASE + datetime.timedelta(minutes=3)
+    await client.async_get_intervals(MagicMock(), "key", "nmi", *WINDOW)
+    await client.async_get_intervals(MagicMock(), "key", "other", *WINDOW)
+    assert len(calls) == 2
+
+    now[0] = BASE + datetime.timedelta(minutes=4)
+    await client.async_get_intervals(MagicMock(), "key", "nmi", *WINDOW)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_consumers_in_one_interval_share_a_window(monkeypatch):
+    now = [BASE + datetime.timedelta(seconds=10)]
+    client, calls = _client(monkeypatch, now)
+
+    # Each consumer asks for the hour from its own "now"
+    async def consumer():
+        start = now[0]
+        return await client.async_get_intervals(
+            MagicMock(), "key", "nmi", start, start + datetime.timedelta(hours=1)
+        )
+
+    first = await consumer()
+    now[0] += datetime.timedelta(seconds=100)
+    second = await consumer()
+    assert len(calls) == 1
+    assert second is first
+
+    # Concurrent consumers a moment apart share the in-flight request
+    now[0] = BASE + datetime.timedelta(minutes=5)
+    late = asyncio.ensure_future(consumer())
+    await asyncio.sleep(0)
+    now[0] += datetime.timedelta(seconds=2)
+    results = await asyncio.gather(late, consumer())
+    assert len(calls) == 2
+    assert results[0] is results[1]
+
+
+@pytest.mark.asyncio
+async def test_use_cache_false_bypasses_cached_response(monkeypatch):
+    client, calls = _client(monkeypatch, [BASE])
+
+    await client.async_get_intervals(MagicMock(), "key", "nmi", *WINDOW)
+    await client.async_get_intervals(MagicMock(), "key", "nmi", *WINDOW, use_cache=False)
+
+    assert len(calls) == 2
+
+
+async def _chunks(body, size):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def _decode(body, size):
+    return [item async for item in iter_json_array(_chunks(body, size))]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 2, 7, 4096])
+async def test_iter_json_array_decodes_across_chunk_boundaries(size):
+    records = [
+        {"intervalEnd": "2023-01-01T00:05:00Z", "costsAll": 1.5, "note": "a, ]"},
+        {"intervalEnd": "2023-01-01T00:10:00Z", "costsAll": -2, "name": "Zoë"},
+    ]
+    body = json.dumps(records, indent=1, ensure_ascii=False).encode()
+
+    assert await _decode(body, size) == records
+    assert await _decode(b" [ ] ", size) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b'{"error": "bad"}', b'[{"a": 1}, {"a"', b""])
+async def test_iter_json_array_rejects_non_arrays_and_truncation(body):
+    with pytest.raises(ValueError):
+        await _decode(body, 3)
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_first_answer_wins(monkeypatch):
+    client = LocalvoltsApiClient("partner")
+    started = []
+
+    async def request(session, api_key, key, critical=False):
+        started.append(key)
+        # The original request hangs; the hedge answers at once
+        if len(started) == 1:
+            await asyncio.sleep(10)
+        return [{"attempt": len(started)}]
+
+    client._async_request = request
+
+    data = await client.async_get_intervals(
+        MagicMock(), "key", "nmi", *WINDOW, use_cache=False, hedge_after=0.01
+    )
+
+    assert data == [{"attempt": 2}]
+    assert client.metrics.counters["hedged_requests"] == 1
+    assert client.metrics.counters["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_hedged():
+    client = LocalvoltsApiClient("partner")
+    calls = []
+
+    async def request(session, api_key, key, critical=False):
+        calls.append(key)
+        return [{}]
+
+    client._async_request = request
+
+    await client.async_get_intervals(MagicMock(), "key", "nmi", *WINDOW, hedge_after=1)
+
+    assert len(calls) == 1
+    assert "hedged_requests" not in client.metrics.counters
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+class _HangingSession:
+    """Session whose requests raise ``error`` or never answer."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.started = asyncio.Event()
+
+    def get(self, url, headers):
+        return self
+
+    async def __aenter__(self):
+        self.started.set()
+        if self.error is not None:
+            raise self.error
+        await asyncio.sleep(3600)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _half_open_client():
+    clock = _Clock()
+    client = LocalvoltsApiClient("partner")
+    client.scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+    for _ in range(client.scheduler.breaker.threshold):
+        client.scheduler.record_failure()
+    assert client.scheduler.breaker.state == OPEN
+    clock.now += 1000
+    return client
+
+
+async def _probe(client, session):
+    async with client._async_response(session, "key", ("nmi", "from", "to")):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_timed_out_probe_reopens_the_circuit():
+    client = _half_open_client()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await _probe(client, _HangingSession(asyncio.TimeoutError()))
+
+    breaker = client.scheduler.breaker
+    assert breaker.state == OPEN
+    assert client.metrics.counters["timeouts"] == 1
+    assert breaker._probe is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_lets_the_next_request_probe():
+    client = _half_open_client()
+    session = _HangingSession()
+
+    task = asyncio.create_task(_probe(client, session))
+    await session.started.wait()
+    assert client.scheduler.breaker.state == HALF_OPEN
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    breaker = client.scheduler.breaker
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+class _AnsweringSession:
+    """Session whose requests all get an empty 200 response."""
+
+    status = 200
+    headers = {}
+
+    def get(self, url, headers):
+        return self
+
+    def raise_for_status(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_body_failure_counts_once_as_a_failure():
+    client = LocalvoltsApiClient("partner")
+    breaker = client.scheduler.breaker
+
+    with pytest.raises(aiohttp.ClientPayloadError):
+        async with client._async_response(_AnsweringSession(), "key", ("nmi", "from", "to")):
+            raise aiohttp.ClientPayloadError("truncated")
+
+    assert breaker.failures == 1
+    assert client.metrics.counters["body_errors"] == 1
+    assert "connection_errors" not in client.metrics.counters
+
+    # A body read in full is the request's one success
+    async with client._async_response(_AnsweringSession(), "key", ("nmi", "from", "to")):
+        assert breaker.failures == 1
+    assert breaker.failures == 0
@@ -0,0 +1,83 @@
+import csv
+import datetime
+
+import pytest
+
+from custom_components.localvolts.archive import HEADER, RECORD, IntervalArchive
+
+UTC = datetime.timezone.utc
+START = datetime.datetime(2024, 5, 1, tzinfo=UTC)
+FIVE = datetime.timedelta(minutes=5)
+
+
+def _item(n, quality="act"):
+    return {"quality": quality, "costsAll": n, "importsAll": 0.5, "demandInterval": n % 2}
+
+
+def test_flush_appends_fixed_width_records_and_fills_gaps(tmp_path):
+    archive = IntervalArchive(str(tmp_path / "nmi.intervals"))
+    archive.add(START + FIVE, _item(1))
+    archive.add(START + 4 * FIVE, _item(4))
+    # Forecasts are never archived
+    archive.add(START + 5 * FIVE, _item(5, quality="fcst"))
+
+    assert archive.flush() == 2
+    assert (tmp_path / "nmi.intervals").stat().st_size == HEADER.size + 4 * RECORD.size
+
+    # Append-only: slots already written are left alone
+    archive.add(START + 4 * FIVE, _item(40))
+    archive.add(START + 5 * FIVE, _item(5))
+    assert archive.flush() == 1
+
+    totals = archive.totals(START, START + 10 * FIVE)
+    assert totals["intervals"] == 3
+    assert totals["costsAll"] == 10
+    assert totals["importsAll"] == 1.5
+
+
+def test_range_scan_covers_only_requested_slots(tmp_path):
+    archive = IntervalArchive(str(tmp_path / "nmi.intervals"))
+    for n in range(1, 11):
+        archive.add(START + n * FIVE, _item(n))
+    archive.flush()
+
+    chunks = list(archive.iter_range(START + 2 * FIVE, START + 7 * FIVE, chunk=2))
+    assert [len(records) for _, records in chunks] == [2, 2, 1]
+    assert chunks[0][0][0] == (START + 3 * FIVE).timestamp()
+    assert [value for _, records in chunks for value in records["costsAll"]] == [3, 4, 5, 6, 7]
+    assert archive.totals(START - 100 * FIVE, START)["intervals"] == 0
+
+
+def test_missing_archive_reads_as_empty(tmp_path):
+    archive = IntervalArchive(str(tmp_path / "missing.intervals"))
+
+    assert list(archive.iter_range(START, START + FIVE)) == []
+    assert archive.export_csv(str(tmp_path / "out.csv"), START, START + FIVE) == 0
+
+
+def test_export_csv_streams_rows(tmp_path):
+    archive = IntervalArchive(str(tmp_path / "nmi.intervals"))
+    archive.add(START + FIVE, {"quality": "exp", "costsAll": "1.5", "demandInterval": 1})
+    archive.add(START + 3 * FIVE, _item(3))
+    archive.flush()
+
+    path = tmp_path / "out.csv"
+    assert archive.export_csv(str(path), START, START + 3 * FIVE) == 2
+
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert rows[0]["intervalEnd"] == "2024-05-01T00:05:00+00:00"
+    assert rows[0]["quality"] == "exp"
+    assert rows[0]["demandInterval"] == "1"
+    assert float(rows[0]["costsAll"]) == 1.5
+    # Fields the API left out stay empty rather than NaN
+    assert rows[0]["importsAll"] == ""
+    assert rows[1]["quality"] == "act"
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "nmi.intervals"
+    path.write_bytes(b"x" * 64)
+
+    with pytest.raises(ValueError):
+        list(IntervalArchive(str(path)).iter_range(START, START + FIVE))
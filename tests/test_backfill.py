@@ -0,0 +1,71 @@
+import asyncio
+import datetime
+
+import pytest
+
+from custom_components.localvolts.backfill import (
+    async_fetch_range,
+    merge_intervals,
+    split_range,
+)
+from custom_components.localvolts.coordinator import LocalvoltsDataUpdateCoordinator
+
+UTC = datetime.timezone.utc
+BASE = datetime.datetime(2023, 1, 1, tzinfo=UTC)
+
+
+def test_split_range_bounds_chunks():
+    windows = split_range(BASE, BASE + datetime.timedelta(hours=14))
+
+    assert [end - start for start, end in windows] == [
+        datetime.timedelta(hours=6),
+        datetime.timedelta(hours=6),
+        datetime.timedelta(hours=2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_range_caps_in_flight_and_keeps_order():
+    in_flight = 0
+    peak = 0
+
+    async def fetch_chunk(start, end):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Later chunks finish first
+        await asyncio.sleep((BASE + datetime.timedelta(days=1) - start).total_seconds() / 1e6)
+        in_flight -= 1
+        return [{"start": start}]
+
+    records = await async_fetch_range(
+        fetch_chunk, BASE, BASE + datetime.timedelta(days=1), max_in_flight=2
+    )
+
+    assert peak == 2
+    assert [r["start"] for r in records] == [
+        BASE + datetime.timedelta(hours=6 * n) for n in range(4)
+    ]
+
+
+def test_merge_intervals_dedupes_and_prefers_actuals():
+    def end(n):
+        return (BASE + datetime.timedelta(minutes=5 * n)).isoformat()
+
+    records = [
+        {"quality": "exp", "intervalEnd": end(2), "costsAll": 1},
+        {"quality": "act", "intervalEnd": end(2), "costsAll": 2},
+        {"quality": "exp", "intervalEnd": end(2), "costsAll": 3},
+        {"quality": "exp", "intervalEnd": end(1), "costsAll": 4},
+        {"quality": "fcst", "intervalEnd": end(3), "costsAll": 5},
+        {"quality": "exp", "intervalEnd": end(0), "costsAll": 6},
+    ]
+
+    merged = merge_intervals(
+        records,
+        LocalvoltsDataUpdateCoordinator._parse_time,
+        BASE,
+        BASE + datetime.timedelta(minutes=20),
+    )
+
+    assert [item["costsAll"] for _, item in merged] == [4, 2]
@@ -0,0 +1,89 @@
+import datetime
+
+import pytest
+
+from custom_components.localvolts.billing import MonthlyBilling
+from custom_components.localvolts.forecast import ForecastStore
+
+UTC = datetime.timezone.utc
+
+
+def test_month_totals_and_demand_peak():
+    billing = MonthlyBilling()
+    end = datetime.datetime(2023, 1, 31, 23, 55, tzinfo=UTC)
+
+    assert billing.add(end, {"costsAll": 10, "importsAll": 0.5, "demandInterval": 1})
+    assert not billing.add(end, {"costsAll": 10, "importsAll": 0.5, "demandInterval": 1})
+    # Interval 23:55-00:00 still belongs to January
+    billing.add(end + datetime.timedelta(minutes=5), {"costsAll": 5, "importsAll": 2.0})
+    billing.add(
+        end + datetime.timedelta(minutes=10),
+        {"costsAll": 1, "importsAll": 0.25, "demandInterval": "1"},
+    )
+
+    # February starts afresh
+    assert billing.month == datetime.date(2023, 2, 1)
+    assert billing.totals["costsAll"] == 1
+    assert billing.peak_demand == 3.0
+    assert billing.demand_intervals == 1
+
+
+def test_peak_keeps_highest_demand_interval():
+    billing = MonthlyBilling()
+    start = datetime.datetime(2023, 3, 1, 6, 0, tzinfo=UTC)
+    for n, imports in enumerate((0.1, 0.4, 0.2)):
+        billing.add(
+            start + datetime.timedelta(minutes=5 * (n + 1)),
+            {"importsAll": imports, "demandInterval": 1},
+        )
+
+    assert billing.peak_demand == pytest.approx(4.8)
+    assert billing.peak_demand_at == start + datetime.timedelta(minutes=10)
+    assert billing.roll_over(datetime.datetime(2023, 4, 1, 0, 1, tzinfo=UTC))
+    assert billing.peak_demand is None
+
+
+def test_projection_uses_forecast_prices_then_average():
+    billing = MonthlyBilling()
+    end = datetime.datetime(2023, 1, 31, 23, 45, tzinfo=UTC)
+    billing.add(end, {"costsAll": 30, "importsAll": 1.0, "exportsAll": 0.0})
+    now = end
+
+    # Three intervals remain; without prices each costs the average (30)
+    assert billing.project(None, now) == pytest.approx(120)
+
+    forecast = ForecastStore(12)
+    forecast.update([(end + datetime.timedelta(minutes=10), {"costsFlexUp": 10})])
+    # The 23:50-23:55 interval costs 1 kWh at 10c instead of 30c
+    assert billing.project(forecast, now) == pytest.approx(100)
+
+
+def test_projection_prices_current_interval_and_stops_at_month_end():
+    billing = MonthlyBilling()
+    end = datetime.datetime(2023, 1, 31, 23, 50, tzinfo=UTC)
+    billing.add(end, {"costsAll": 30, "importsAll": 1.0, "exportsAll": 0.0})
+    now = end + datetime.timedelta(minutes=2)
+
+    forecast = ForecastStore(12)
+    forecast.update(
+        [
+            # 23:50-23:55, in progress
+            (end + datetime.timedelta(minutes=5), {"costsFlexUp": 10}),
+            # 00:00-00:05 on 1 February
+            (end + datetime.timedelta(minutes=15), {"costsFlexUp": 1000}),
+        ]
+    )
+    # 23:50-23:55 at 10c and 23:55-00:00 at the average; February is not billed
+    assert billing.project(forecast, now) == pytest.approx(70)
+
+
+def test_round_trip_through_storage_format():
+    billing = MonthlyBilling()
+    billing.add(
+        datetime.datetime(2023, 1, 1, 0, 5, tzinfo=UTC),
+        {"costsAll": 3, "importsAll": 0.2, "demandInterval": 1},
+    )
+
+    restored = MonthlyBilling.from_dict(billing.as_dict())
+
+    assert restored.as_dict() == billing.as_dict()
@@ -0,0 +1,53 @@
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+
+from custom_components.localvolts.connection import LocalvoltsConnectionPool
+from custom_components.localvolts.metrics import MetricsRecorder
+
+
+async def _empty(request):
+    return web.json_response([])
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_warmed_connection():
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", _empty)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    metrics = MetricsRecorder()
+    pool = LocalvoltsConnectionPool(
+        MagicMock(), f"http://127.0.0.1:{port}/v1/customer/interval", metrics
+    )
+    try:
+        assert pool.warmup_url == f"http://127.0.0.1:{port}"
+        await pool.async_warm()
+        async with pool.session.get(f"http://127.0.0.1:{port}/v1/customer/interval") as resp:
+            assert await resp.json() == []
+    finally:
+        await pool.async_close()
+        await runner.cleanup()
+
+    assert metrics.counters["warmups"] == 1
+    assert metrics.counters["warmup_failures"] == 0
+    assert metrics.counters["connections_created"] == 1
+    assert metrics.counters["connections_reused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_warmup_is_counted():
+    metrics = MetricsRecorder()
+    # Nothing listens on port 9 here
+    pool = LocalvoltsConnectionPool(MagicMock(), "http://127.0.0.1:9/v1", metrics)
+    try:
+        await pool.async_warm()
+    finally:
+        await pool.async_close()
+
+    assert metrics.counters["warmup_failures"] == 1
@@ -1,12 +1,57 @@
+import asyncio
 import datetime
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from custom_components.localvolts.accumulators import IntervalAccumulator
+from custom_components.localvolts.billing import MonthlyBilling
 from custom_components.localvolts.coordinator import (
     LocalvoltsDataUpdateCoordinator,
     UpdateFailed,
 )
+from custom_components.localvolts.dispatch import BatterySpec, DispatchPlanner
+from custom_components.localvolts.events import PriceEventTracker
+from custom_components.localvolts.forecast import ForecastStore
+from custom_components.localvolts.metrics import MetricsRecorder
+from custom_components.localvolts.models import IntervalRecord
+
+
+def _make_coordinator(**attrs):
+    """Build a coordinator without touching Home Assistant internals."""
+    coordinator = LocalvoltsDataUpdateCoordinator.__new__(
+        LocalvoltsDataUpdateCoordinator
+    )
+    coordinator.hass = MagicMock()
+    coordinator.api_key = "key"
+    coordinator.partner_id = "partner"
+    coordinator.nmi_id = "nmi"
+    coordinator.intervalEnd = None
+    coordinator.lastUpdate = None
+    coordinator.time_past_start = datetime.timedelta(0)
+    coordinator.data = {}
+    coordinator.next_poll = None
+    coordinator.accumulator = IntervalAccumulator()
+    coordinator.billing = MonthlyBilling()
+    coordinator.events = PriceEventTracker()
+    coordinator.metrics = MetricsRecorder()
+    coordinator._interval_polls = 0
+    coordinator._polling_interval = None
+    coordinator.low_latency = False
+    coordinator.connections = None
+    coordinator._store = MagicMock()
+    coordinator.archive = None
+    coordinator.forecast_hours = 0
+    coordinator.forecast = ForecastStore(12)
+    coordinator.dispatch = None
+    coordinator.dispatch_plan = None
+    coordinator._backfill_task = None
+    coordinator._forecast_task = None
+    coordinator._dispatch_task = None
+    coordinator._pending_intervals = []
+    for name, value in attrs.items():
+        setattr(coordinator, name, value)
+    return coordinator
 
 
 def test_format_time_converts_to_utc():
@@ -37,17 +82,7 @@ async def test_async_update_data_fetches_new_interval(monkeypatch):
         "custom_components.localvolts.coordinator.dt_util.utcnow", lambda: base_time
     )
 
-    coordinator = LocalvoltsDataUpdateCoordinator.__new__(
-        LocalvoltsDataUpdateCoordinator
-    )
-    coordinator.hass = MagicMock()
-    coordinator.api_key = "key"
-    coordinator.partner_id = "partner"
-    coordinator.nmi_id = "nmi"
-    coordinator.intervalEnd = None
-    coordinator.lastUpdate = None
-    coordinator.time_past_start = datetime.timedelta(0)
-    coordinator.data = {}
+    coordinator = _make_coordinator()
 
     monkeypatch.setattr(
         "custom_components.localvolts.coordinator.async_get_clientsession",
@@ -76,6 +111,10 @@ async def test_async_update_data_fetches_new_interval(monkeypatch):
     assert coordinator.lastUpdate == last_update
     assert coordinator.time_past_start == datetime.timedelta(minutes=5)
     assert result["costsAll"] == 10
+    assert coordinator.accumulator.today["costsAll"] == 10
+    assert coordinator._store.async_delay_save.call_count == 1
+    assert coordinator.metrics.samples["polls_per_interval"][-1] == 1
+    assert coordinator.metrics.samples["publication_lag"][-1] == 300
 
 
 @pytest.mark.asyncio
@@ -86,17 +125,11 @@ async def test_async_update_data_skips_fetch_within_same_interval(monkeypatch):
         lambda: start_time + datetime.timedelta(minutes=2),
     )
 
-    coordinator = LocalvoltsDataUpdateCoordinator.__new__(
-        LocalvoltsDataUpdateCoordinator
+    coordinator = _make_coordinator(
+        intervalEnd=start_time + datetime.timedelta(minutes=5),
+        lastUpdate=start_time + datetime.timedelta(minutes=1),
+        data={"costsAll": 3},
     )
-    coordinator.hass = MagicMock()
-    coordinator.api_key = "key"
-    coordinator.partner_id = "partner"
-    coordinator.nmi_id = "nmi"
-    coordinator.intervalEnd = start_time + datetime.timedelta(minutes=5)
-    coordinator.lastUpdate = start_time + datetime.timedelta(minutes=1)
-    coordinator.time_past_start = datetime.timedelta(0)
-    coordinator.data = {"costsAll": 3}
 
     mock_fetch = AsyncMock()
     monkeypatch.setattr(coordinator, "_fetch_intervals", mock_fetch)
@@ -115,17 +148,9 @@ async def test_async_update_data_marks_failure_without_exp(monkeypatch):
         "custom_components.localvolts.coordinator.dt_util.utcnow", lambda: base_time
     )
 
-    coordinator = LocalvoltsDataUpdateCoordinator.__new__(
-        LocalvoltsDataUpdateCoordinator
+    coordinator = _make_coordinator(
+        time_past_start=datetime.timedelta(seconds=30),
     )
-    coordinator.hass = MagicMock()
-    coordinator.api_key = "key"
-    coordinator.partner_id = "partner"
-    coordinator.nmi_id = "nmi"
-    coordinator.intervalEnd = None
-    coordinator.lastUpdate = None
-    coordinator.time_past_start = datetime.timedelta(seconds=30)
-    coordinator.data = {}
 
     monkeypatch.setattr(
         "custom_components.localvolts.coordinator.async_get_clientsession",
@@ -147,3 +172,362 @@ async def test_async_update_data_marks_failure_without_exp(monkeypatch):
         await coordinator._async_update_data()
 
     assert coordinator.time_past_start == datetime.timedelta(0)
+
+
+def test_next_poll_delay_sleeps_until_next_boundary():
+    base_time = datetime.datetime(2023, 1, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
+    coordinator = _make_coordinator(
+        intervalEnd=base_time + datetime.timedelta(minutes=5),
+    )
+
+    delay = coordinator._next_poll_delay(base_time + datetime.timedelta(seconds=20))
+
+    assert delay == datetime.timedelta(minutes=4, seconds=42)
+
+
+def test_next_poll_delay_polls_fast_then_backs_off():
+    base_time = datetime.datetime(2023, 1, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
+    coordinator = _make_coordinator(
+        intervalEnd=base_time,
+    )
+
+    fast = coordinator._next_poll_delay(base_time + datetime.timedelta(seconds=10))
+    slow = coordinator._next_poll_delay(base_time + datetime.timedelta(minutes=2))
+
+    assert fast == datetime.timedelta(seconds=3)
+    assert slow == datetime.timedelta(seconds=15)
+
+
+def test_low_latency_polls_every_second_within_budget():
+    base_time = datetime.datetime(2023, 1, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
+    coordinator = _make_coordinator(
+        intervalEnd=base_time,
+        low_latency=True,
+        client=MagicMock(metrics=MetricsRecorder()),
+    )
+    now = base_time + datetime.timedelta(seconds=3)
+
+    assert coordinator._next_poll_delay(now) == datetime.timedelta(seconds=1)
+    assert coordinator._hedge_delay() == 2.0
+    coordinator.client.metrics.observe("request_latency", 0.5)
+    assert coordinator._hedge_delay() == 0.5
+
+    # Once the interval's budget is spent, fall back to the normal cadence
+    coordinator._polling_interval = base_time
+    coordinator._interval_polls = 31
+    assert coordinator._next_poll_delay(now) == datetime.timedelta(seconds=3)
+    assert coordinator._hedge_delay() is None
+
+
+@pytest.mark.asyncio
+async def test_async_update_data_reschedules_after_failure(monkeypatch):
+    base_time = datetime.datetime(2023, 1, 1, 0, 0, 5, tzinfo=datetime.timezone.utc)
+    monkeypatch.setattr(
+        "custom_components.localvolts.coordinator.dt_util.utcnow", lambda: base_time
+    )
+
+    coordinator = _make_coordinator(
+        intervalEnd=base_time - datetime.timedelta(seconds=5),
+    )
+
+    monkeypatch.setattr(
+        "custom_components.localvolts.coordinator.async_get_clientsession",
+        lambda hass: MagicMock(name="session"),
+    )
+    monkeypatch.setattr(coordinator, "_fetch_intervals", AsyncMock(return_value=[]))
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+    assert coordinator.next_poll == base_time + datetime.timedelta(seconds=3)
+
+
+@pytest.mark.asyncio
+async def test_refresh_forecast_full_then_near_term(monkeypatch):
+    now = datetime.datetime(2023, 1, 1, 0, 0, 5, tzinfo=datetime.timezone.utc)
+    coordinator = _make_coordinator(forecast_hours=24, forecast=ForecastStore(300))
+
+    next_end = datetime.datetime(2023, 1, 1, 0, 10, tzinfo=datetime.timezone.utc)
+    mock_fetch = AsyncMock(
+        return_value=[
+            {"quality": "fcst", "intervalEnd": next_end.isoformat(), "costsFlexUp": 21.5}
+        ]
+    )
+    monkeypatch.setattr(coordinator, "_fetch_intervals", mock_fetch)
+
+    await coordinator._async_refresh_forecast(MagicMock(), now)
+    await coordinator._async_refresh_forecast(
+        MagicMock(), now + datetime.timedelta(minutes=5)
+    )
+
+    first_window = mock_fetch.await_args_list[0].args
+    second_window = mock_fetch.await_args_list[1].args
+    assert first_window[2] - first_window[1] == datetime.timedelta(hours=24)
+    assert second_window[2] - second_window[1] == datetime.timedelta(hours=1)
+    assert coordinator.forecast.value_at("costsFlexUp", now + datetime.timedelta(minutes=5)) == 21.5
+
+
+@pytest.mark.asyncio
+async def test_refresh_forecast_failure_keeps_store(monkeypatch):
+    now = datetime.datetime(2023, 1, 1, 0, 0, 5, tzinfo=datetime.timezone.utc)
+    coordinator = _make_coordinator(forecast_hours=24, forecast=ForecastStore(300))
+    monkeypatch.setattr(
+        coordinator, "_fetch_intervals", AsyncMock(side_effect=UpdateFailed("boom"))
+    )
+
+    await coordinator._async_refresh_forecast(MagicMock(), now)
+
+    assert coordinator.forecast.last_refresh is None
+
+
+@pytest.mark.asyncio
+async def test_forecast_refreshes_after_the_interval_is_published(monkeypatch):
+    base_time = datetime.datetime(2023, 1, 1, 0, 0, 5, tzinfo=datetime.timezone.utc)
+    monkeypatch.setattr(
+        "custom_components.localvolts.coordinator.dt_util.utcnow", lambda: base_time
+    )
+    monkeypatch.setattr(
+        "custom_components.localvolts.coordinator.async_get_clientsession",
+        lambda hass: MagicMock(name="session"),
+    )
+    coordinator = _make_coordinator(
+        forecast_hours=1, forecast=ForecastStore(24), async_update_listeners=MagicMock()
+    )
+    coordinator.hass.async_create_background_task = lambda coro, name: asyncio.create_task(coro)
+    interval_end = datetime.datetime(2023, 1, 1, 0, 5, tzinfo=datetime.timezone.utc)
+    next_end = interval_end + datetime.timedelta(minutes=5)
+    release = asyncio.Event()
+
+    async def fetch(session, from_time, to_time, use_cache=True, critical=False, hedge_after=None):
+        if critical:
+            return [
+                {
+                    "quality": "exp",
+                    "intervalEnd": interval_end.isoformat(),
+                    "lastUpdate": interval_end.isoformat(),
+                    "costsFlexUp": 20,
+                }
+            ]
+        await release.wait()
+        return [{"quality": "fcst", "intervalEnd": next_end.isoformat(), "costsFlexUp": 30}]
+
+    monkeypatch.setattr(coordinator, "_fetch_intervals", fetch)
+
+    result = await coordinator._async_update_data()
+
+    assert result.interval_end == interval_end
+    assert coordinator.forecast.last_refresh is None
+    coordinator.hass.bus.async_fire.assert_not_called()
+
+    release.set()
+    await coordinator._forecast_task
+
+    assert coordinator.forecast.value_at("costsFlexUp", interval_end) == 30
+    coordinator.async_update_listeners.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_new_interval_after_gap_backfills_missed_intervals(monkeypatch):
+    base_time = datetime.datetime(2023, 1, 1, 1, 0, 5, tzinfo=datetime.timezone.utc)
+    monkeypatch.setattr(
+        "custom_components.localvolts.coordinator.dt_util.utcnow", lambda: base_time
+    )
+    monkeypatch.setattr(
+        "custom_components.localvolts.coordinator.async_get_clientsession",
+        lambda hass: MagicMock(name="session"),
+    )
+
+    coordinator = _make_coordinator(async_update_listeners=MagicMock())
+    coordinator.hass.async_create_background_task = lambda coro, name: asyncio.create_task(coro)
+    last_seen = datetime.datetime(2023, 1, 1, 0, 50, tzinfo=datetime.timezone.utc)
+    coordinator.accumulator.add(last_seen, {"costsAll": 1})
+    current_end = base_time.replace(second=0) + datetime.timedelta(minutes=5)
+
+    def fetch(session, from_time, to_time, use_cache=True, critical=False, hedge_after=None):
+        if to_time - from_time == datetime.timedelta(minutes=5):
+            records = [current_end]
+        else:
+            # Missed intervals ending 00:55 and 01:00
+            records = [last_seen + datetime.timedelta(minutes=5 * n) for n in (0, 1, 2)]
+        return [
+            {
+                "quality": "exp",
+                "intervalEnd": end.isoformat(),
+                "lastUpdate": end.isoformat(),
+                "costsAll": 10,
+            }
+            for end in records
+        ]
+
+    monkeypatch.setattr(coordinator, "_fetch_intervals", AsyncMock(side_effect=fetch))
+
+    result = await coordinator._async_update_data()
+
+    # The new interval is published before the backfill has run
+    assert result.interval_end == current_end
+    assert coordinator.accumulator.last_interval_end == last_seen
+    await coordinator._backfill_task
+
+    assert coordinator.accumulator.today["costsAll"] == 31
+    assert coordinator.accumulator.last_interval_end == current_end
+    coordinator.async_update_listeners.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_intervals_published_during_backfill_wait_behind_it(monkeypatch):
+    coordinator = _make_coordinator(async_update_listeners=MagicMock())
+    coordinator.hass.async_create_background_task = lambda coro, name: asyncio.create_task(coro)
+    last_seen = datetime.datetime(2023, 1, 1, 0, 50, tzinfo=datetime.timezone.utc)
+    coordinator.accumulator.add(last_seen, {"costsAll": 1})
+    missed = last_seen + datetime.timedelta(minutes=5)
+    release = asyncio.Event()
+
+    async def fetch(session, from_time, to_time, use_cache=True, critical=False, hedge_after=None):
+        await release.wait()
+        return [
+            {"quality": "exp", "intervalEnd": missed.isoformat(), "costsAll": 10}
+        ]
+
+    monkeypatch.setattr(coordinator, "_fetch_intervals", fetch)
+
+    first = missed + datetime.timedelta(minutes=5)
+    second = first + datetime.timedelta(minutes=5)
+    coordinator._ingest_interval(MagicMock(), first, {"costsAll": 100})
+    await asyncio.sleep(0)
+    coordinator._ingest_interval(MagicMock(), second, {"costsAll": 1000})
+    assert coordinator.accumulator.last_interval_end == last_seen
+
+    release.set()
+    await coordinator._backfill_task
+
+    assert coordinator.accumulator.today["costsAll"] == 1111
+    assert coordinator.accumulator.last_interval_end == second
+    assert coordinator._pending_intervals == []
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_background_work(monkeypatch):
+    monkeypatch.setattr(
+        "homeassistant.helpers.update_coordinator.DataUpdateCoordinator.async_shutdown",
+        AsyncMock(),
+    )
+    coordinator = _make_coordinator(async_update_listeners=MagicMock())
+    coordinator.hass.async_create_background_task = lambda coro, name: asyncio.create_task(coro)
+    last_seen = datetime.datetime(2023, 1, 1, 0, 50, tzinfo=datetime.timezone.utc)
+    coordinator.accumulator.add(last_seen, {"costsAll": 1})
+
+    async def fetch(session, from_time, to_time, use_cache=True, critical=False, hedge_after=None):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(coordinator, "_fetch_intervals", fetch)
+    coordinator._ingest_interval(
+        MagicMock(), last_seen + datetime.timedelta(minutes=15), {"costsAll": 100}
+    )
+    task = coordinator._backfill_task
+    await asyncio.sleep(0)
+
+    await coordinator.async_shutdown()
+
+    assert task.cancelled()
+    # Nothing more is written into the dropped coordinator
+    assert coordinator.accumulator.last_interval_end == last_seen
+    coordinator._store.async_delay_save.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stream_history_yields_settled_records_per_day(monkeypatch):
+    monkeypatch.setattr(
+        "custom_components.localvolts.coordinator.async_get_clientsession",
+        lambda hass: MagicMock(name="session"),
+    )
+    start = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+    windows = []
+
+    async def stream(session, api_key, nmi_id, from_time, to_time):
+        windows.append((from_time, to_time))
+        end = from_time + datetime.timedelta(minutes=5)
+        yield {"quality": "act", "intervalEnd": end.isoformat(), "costsAll": 1}
+        yield {"quality": "fcst", "intervalEnd": end.isoformat(), "costsAll": 2}
+
+    coordinator = _make_coordinator(client=MagicMock(async_stream_intervals=stream))
+
+    records = [
+        pair
+        async for pair in coordinator.async_stream_history(
+            start, start + datetime.timedelta(days=2, hours=1)
+        )
+    ]
+
+    assert len(windows) == 3
+    assert [item["costsAll"] for _, item in records] == [1, 1, 1]
+    assert records[0][0] == start + datetime.timedelta(minutes=5)
+
+
+@pytest.mark.asyncio
+async def test_restore_brings_back_last_interval_and_totals():
+    interval_end = datetime.datetime(2023, 1, 1, 0, 5, tzinfo=datetime.timezone.utc)
+    saved = _make_coordinator()
+    saved.accumulator.add(interval_end, {"costsAll": 12})
+    saved.data = IntervalRecord(
+        {"quality": "exp", "costsFlexUp": 25.0}, interval_end, interval_end
+    )
+
+    coordinator = _make_coordinator()
+    coordinator._store.async_load = AsyncMock(return_value=saved._state_to_save())
+    await coordinator.async_restore()
+
+    assert coordinator.intervalEnd == interval_end
+    assert coordinator.lastUpdate == interval_end
+    assert coordinator.data.costs_flex_up == 0.25
+    assert coordinator.accumulator.lifetime["costsAll"] == 12
+
+
+@pytest.mark.asyncio
+async def test_restore_without_saved_state_leaves_defaults():
+    coordinator = _make_coordinator(data=None)
+    coordinator._store.async_load = AsyncMock(return_value=None)
+    await coordinator.async_restore()
+
+    assert coordinator.data is None
+    assert coordinator.intervalEnd is None
+
+
+@pytest.mark.asyncio
+async def test_battery_plan_follows_soc_sensor_and_previous_plan():
+    now = datetime.datetime(2023, 1, 1, 0, 0, 30, tzinfo=datetime.timezone.utc)
+    forecast = ForecastStore(24)
+    forecast.update(
+        (
+            now + datetime.timedelta(minutes=5 * n),
+            {"costsFlexUp": 10.0 * n, "earningsFlexUp": 8.0 * n},
+        )
+        for n in range(1, 13)
+    )
+
+    async def run(func, *args):
+        return func(*args)
+
+    coordinator = _make_coordinator(
+        forecast=forecast,
+        forecast_hours=1,
+        dispatch=DispatchPlanner(BatterySpec(10, 5)),
+        battery_soc_entity="sensor.battery",
+        async_update_listeners=MagicMock(),
+    )
+    coordinator.hass.async_add_executor_job = run
+    coordinator.hass.states.get.return_value = MagicMock(state="40")
+
+    await coordinator._async_plan_dispatch(now)
+
+    plan = coordinator.dispatch_plan
+    # The horizon runs to the end of the hour after the forecast hour
+    assert len(plan["power"]) == 23
+    # Cheapest first, dearest last: charge now, discharge at the end
+    assert plan["power"][0] > 0 > plan["power"][11]
+    # Then idle where there are no prices
+    assert not plan["power"][13:].any()
+    coordinator.async_update_listeners.assert_called_once()
+
+    # Without a reading, the SoC is where the plan expected it
+    coordinator.hass.states.get.return_value = None
+    assert coordinator.battery_soc(plan["start_key"] + 1) == plan["soc"][0]
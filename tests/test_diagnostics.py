@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.localvolts.const import CONF_API_KEY, DOMAIN
+from custom_components.localvolts.diagnostics import async_get_config_entry_diagnostics
+from custom_components.localvolts.metrics import MetricsRecorder
+
+
+@pytest.mark.asyncio
+async def test_api_key_is_redacted_from_data_and_options():
+    entry = MagicMock()
+    entry.entry_id = "entry"
+    entry.data = {CONF_API_KEY: "secret", "partner_id": "1"}
+    entry.options = {CONF_API_KEY: "secret", "forecast_hours": 2}
+    coordinator = MagicMock()
+    coordinator.metrics = MetricsRecorder()
+    coordinator.client.metrics = MetricsRecorder()
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"coordinators": {"entry": coordinator}}}
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"][CONF_API_KEY] != "secret"
+    assert diagnostics["entry"]["options"][CONF_API_KEY] != "secret"
+    assert "secret" not in str(diagnostics)
+    assert diagnostics["entry"]["data"]["partner_id"] == "1"
+    assert diagnostics["entry"]["options"]["forecast_hours"] == 2
+    assert diagnostics["profile"] is None
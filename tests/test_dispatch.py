@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+import pytest
+
+from custom_components.localvolts.dispatch import (
+    BatterySpec,
+    DispatchPlanner,
+    dispatch_schedule,
+    horizon_end_key,
+)
+
+
+def test_plan_charges_cheap_and_discharges_dear():
+    planner = DispatchPlanner(BatterySpec(10, 5, efficiency=1.0))
+    imports = np.array([10.0, 10.0, 50.0, 50.0])
+
+    plan = planner.plan(100, 0.5, imports, imports * 0.8)
+
+    assert list(np.sign(plan["power"])) == [1, 1, -1, -1]
+    # Never beyond the power limit
+    assert np.abs(plan["power"]).max() <= 5 + 1e-9
+    assert plan["soc"][1] == pytest.approx(0.58)
+    assert plan["recomputed"] == 4
+
+
+def test_plan_respects_soc_limits_and_idles_without_prices():
+    planner = DispatchPlanner(BatterySpec(10, 50, min_soc=0.2, max_soc=0.8))
+    imports = np.array([1.0, math.nan, 100.0])
+
+    plan = planner.plan(100, 0.5, imports, imports)
+
+    assert plan["soc"].min() >= 0.2 - 1e-9
+    assert plan["soc"].max() <= 0.8 + 1e-9
+    assert plan["power"][1] == 0
+
+
+def test_replan_reuses_work_after_last_changed_price():
+    battery = BatterySpec(13.5, 5)
+    planner = DispatchPlanner(battery)
+    rng = np.random.default_rng(1)
+    imports = rng.uniform(5, 50, 288)
+    exports = imports * 0.7
+    assert planner.plan(100, 0.3, imports, exports)["recomputed"] == 288
+
+    def check(start_key, soc, imports, exports, recomputed):
+        plan = planner.plan(start_key, soc, imports, exports)
+        fresh = DispatchPlanner(battery).plan(start_key, soc, imports, exports)
+        assert plan["recomputed"] == recomputed
+        assert plan["value"] == pytest.approx(fresh["value"])
+        assert np.array_equal(plan["power"], fresh["power"])
+
+    # The start moves forward towards the same horizon end
+    check(101, 0.3, imports[1:], exports[1:], 0)
+    # Only the next hour's prices changed
+    changed = imports[1:].copy()
+    changed[:12] += 20
+    check(101, 0.3, changed, exports[1:], 12)
+    # A new state of charge needs no new values at all
+    check(101, 0.6, changed, exports[1:], 0)
+    # A change far out invalidates everything before it
+    changed[250] += 20
+    check(101, 0.6, changed, exports[1:], 251)
+    # A new horizon end plans from scratch
+    check(101, 0.6, changed[:-1], exports[1:-1], 286)
+
+
+def test_horizon_end_is_rounded_up_to_the_hour():
+    assert horizon_end_key(100, 288) == 396
+    assert horizon_end_key(108, 288) == 396
+    assert horizon_end_key(96, 288) == 384
+
+
+def test_dispatch_schedule_lists_each_interval():
+    planner = DispatchPlanner(BatterySpec(10, 5))
+    # The first interval ends at 300 * 5_700_000 seconds past the epoch
+    plan = planner.plan(5_700_000, 0, np.array([1.0, 2.0]), np.array([0.5, 0.5]))
+
+    schedule = dispatch_schedule(plan)
+
+    assert [entry["start"] for entry in schedule] == [
+        "2024-03-09T15:55:00+00:00",
+        "2024-03-09T16:00:00+00:00",
+    ]
+    assert schedule[0]["soc"] >= 0
+
+
+def test_battery_spec_rejects_impossible_limits():
+    with pytest.raises(ValueError):
+        BatterySpec(0, 5)
+    with pytest.raises(ValueError):
+        BatterySpec(10, 5, min_soc=0.9, max_soc=0.5)
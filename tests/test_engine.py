@@ -0,0 +1,127 @@
+import asyncio
+import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.localvolts.engine import LocalvoltsFetchEngine
+
+
+def _hass():
+    hass = MagicMock()
+    hass.async_create_background_task = lambda coro, name: asyncio.create_task(coro)
+    return hass
+
+
+def _coordinator(next_poll):
+    coordinator = MagicMock()
+    coordinator.next_poll = next_poll
+    coordinator.async_refresh = AsyncMock()
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_tick_refreshes_due_coordinators_together(monkeypatch):
+    now = datetime.datetime(2023, 1, 1, 0, 5, 2, tzinfo=datetime.timezone.utc)
+    monkeypatch.setattr(
+        "custom_components.localvolts.engine.dt_util.utcnow", lambda: now
+    )
+    track = MagicMock()
+    monkeypatch.setattr(
+        "custom_components.localvolts.engine.async_track_point_in_utc_time", track
+    )
+
+    engine = LocalvoltsFetchEngine(_hass(), "partner")
+    house = _coordinator(now)
+    shed = _coordinator(now + datetime.timedelta(milliseconds=400))
+    flat = _coordinator(now + datetime.timedelta(minutes=4))
+    engine.coordinators = {"house": house, "shed": shed, "flat": flat}
+
+    engine._async_tick(now)
+    await asyncio.gather(*engine._refreshing.values())
+
+    assert house.async_refresh.await_count == 1
+    assert shed.async_refresh.await_count == 1
+    assert flat.async_refresh.await_count == 0
+    # Re-armed for the earliest coordinator still waiting
+    assert track.call_args.args[2] == now
+
+
+@pytest.mark.asyncio
+async def test_slow_refresh_neither_blocks_the_timer_nor_runs_twice(monkeypatch):
+    now = datetime.datetime(2023, 1, 1, 0, 5, 2, tzinfo=datetime.timezone.utc)
+    monkeypatch.setattr(
+        "custom_components.localvolts.engine.dt_util.utcnow", lambda: now
+    )
+    track = MagicMock()
+    monkeypatch.setattr(
+        "custom_components.localvolts.engine.async_track_point_in_utc_time", track
+    )
+    release = asyncio.Event()
+    later = now + datetime.timedelta(seconds=3)
+
+    async def slow_refresh():
+        await release.wait()
+        slow.next_poll = later
+
+    engine = LocalvoltsFetchEngine(_hass(), "partner")
+    slow = _coordinator(now)
+    slow.async_refresh = AsyncMock(side_effect=slow_refresh)
+    fast = _coordinator(now)
+    engine.coordinators = {"slow": slow, "fast": fast}
+
+    engine._async_tick(now)
+    await asyncio.sleep(0)
+    assert fast.async_refresh.await_count == 1
+    # Re-armed while the slow refresh is still running
+    assert engine._unsub_tick is not None
+
+    engine._async_tick(now)
+    await asyncio.sleep(0)
+    assert slow.async_refresh.await_count == 1
+    assert fast.async_refresh.await_count == 2
+
+    fast.next_poll = now + datetime.timedelta(minutes=5)
+    release.set()
+    await asyncio.gather(*engine._refreshing.values())
+    assert engine._refreshing == {}
+    assert track.call_args.args[2] == later
+
+
+def test_remove_last_coordinator_idles_engine(monkeypatch):
+    unsub = MagicMock()
+    monkeypatch.setattr(
+        "custom_components.localvolts.engine.async_track_point_in_utc_time",
+        lambda hass, action, point: unsub,
+    )
+
+    engine = LocalvoltsFetchEngine(MagicMock(), "partner")
+    engine.async_add_coordinator("house", _coordinator(None))
+    engine.async_add_coordinator("shed", _coordinator(None))
+
+    assert engine.async_remove_coordinator("house") is False
+    assert engine.async_remove_coordinator("shed") is True
+    assert engine._unsub_tick is None
+    assert engine._unsub_warmup is None
+    # Three tick timers replaced or cancelled, plus the warm-up timer
+    assert unsub.call_count == 4
+
+
+def test_warmup_runs_just_before_the_next_boundary(monkeypatch):
+    now = datetime.datetime(2023, 1, 1, 0, 7, 0, tzinfo=datetime.timezone.utc)
+    monkeypatch.setattr(
+        "custom_components.localvolts.engine.dt_util.utcnow", lambda: now
+    )
+    track = MagicMock()
+    monkeypatch.setattr(
+        "custom_components.localvolts.engine.async_track_point_in_utc_time", track
+    )
+    engine = LocalvoltsFetchEngine(MagicMock(), "partner")
+
+    engine._schedule_warmup()
+    assert track.call_args.args[2] == now.replace(minute=9, second=55)
+
+    # Too close to the boundary to warm for it; warm for the one after
+    now = now.replace(minute=9, second=57)
+    engine._schedule_warmup()
+    assert track.call_args.args[2] == now.replace(minute=14, second=55)
@@ -0,0 +1,109 @@
+import datetime
+
+import pytest
+
+from custom_components.localvolts.events import (
+    EVENT_DEMAND_WINDOW,
+    EVENT_EXPORT_PRICE_NEGATIVE,
+    EVENT_PRICE_RANK,
+    EVENT_PRICE_THRESHOLD,
+    PriceEventTracker,
+    parse_thresholds,
+)
+from custom_components.localvolts.forecast import ForecastStore
+from custom_components.localvolts.models import IntervalRecord
+
+UTC = datetime.timezone.utc
+BASE = datetime.datetime(2023, 1, 1, tzinfo=UTC)
+
+
+def _record(n, costs, earnings=5.0, demand=0):
+    end = BASE + datetime.timedelta(minutes=5 * n)
+    return IntervalRecord(
+        {"costsFlexUp": costs, "earningsFlexUp": earnings, "demandInterval": demand},
+        end,
+        end,
+    )
+
+
+def test_parse_thresholds():
+    assert parse_thresholds(" 0.3, 0.1,,0.3 ") == [0.1, 0.3]
+    assert parse_thresholds("") == []
+    with pytest.raises(ValueError):
+        parse_thresholds("cheap")
+
+
+def test_threshold_crossings_fire_once_per_direction():
+    tracker = PriceEventTracker([0.1, 0.3])
+
+    assert tracker.update(_record(1, 5)) == []
+    events = tracker.update(_record(2, 35))
+    assert [(e[1]["threshold"], e[1]["direction"]) for e in events] == [
+        (0.1, "above"),
+        (0.3, "above"),
+    ]
+    assert tracker.update(_record(3, 32)) == []
+    events = tracker.update(_record(4, 20))
+    assert [(e[0], e[1]["threshold"], e[1]["direction"]) for e in events] == [
+        (EVENT_PRICE_THRESHOLD, 0.3, "below")
+    ]
+
+
+def test_negative_export_and_demand_window_changes():
+    tracker = PriceEventTracker()
+    tracker.prime(_record(1, 20, earnings=5))
+
+    events = tracker.update(_record(2, 20, earnings=-1, demand=1))
+    assert [(e[0], e[1]) for e in events] == [
+        (EVENT_EXPORT_PRICE_NEGATIVE, {"negative": True, "price": -0.01, "interval_end": events[0][1]["interval_end"]}),
+        (EVENT_DEMAND_WINDOW, {"active": True, "interval_end": events[1][1]["interval_end"]}),
+    ]
+    assert tracker.update(_record(3, 20, earnings=-2, demand=1)) == []
+    events = tracker.update(_record(4, 20, earnings=1))
+    assert [e[0] for e in events] == [EVENT_EXPORT_PRICE_NEGATIVE, EVENT_DEMAND_WINDOW]
+
+
+def test_rank_event_when_price_moves_quartile_of_fixed_window():
+    tracker = PriceEventTracker(horizon=4)
+    forecast = ForecastStore(12)
+    forecast.update(
+        (BASE + datetime.timedelta(minutes=5 * n), {"costsFlexUp": price})
+        for n, price in ((2, 30), (3, 40), (4, 50), (5, 60))
+    )
+
+    # 20c against 30c to 60c ahead: the cheapest quarter
+    assert tracker.update(_record(1, 20), forecast) == []
+    # Cheap prices past the four-interval window don't move the rank
+    forecast.update(
+        (BASE + datetime.timedelta(minutes=5 * n), {"costsFlexUp": 5}) for n in range(6, 10)
+    )
+    # 25c against 40c, 50c, 60c and 5c: second of five, still the first quarter
+    assert tracker.update(_record(2, 25), forecast) == []
+    # 70c against 50c, 60c, 5c and 5c: the dearest
+    events = tracker.update(_record(3, 70), forecast)
+    assert events == [
+        (
+            EVENT_PRICE_RANK,
+            {
+                "quartile": 4,
+                "previous_quartile": 1,
+                "rank": 5,
+                "intervals": 5,
+                "price": 0.7,
+                "interval_end": (BASE + datetime.timedelta(minutes=15)).isoformat(),
+            },
+        )
+    ]
+
+
+def test_rank_compares_unrounded_cents():
+    tracker = PriceEventTracker(horizon=1)
+    forecast = ForecastStore(12)
+    forecast.update(
+        (BASE + datetime.timedelta(minutes=n), {"costsFlexUp": 19.9996}) for n in (5, 10)
+    )
+    tracker.update(_record(0, 1), forecast)
+
+    # 20.0004c rounds to $0.200 but is still dearer than 19.9996c
+    events = tracker.update(_record(1, 20.0004), forecast)
+    assert [(e[1]["rank"], e[1]["quartile"]) for e in events] == [(2, 3)]
@@ -0,0 +1,50 @@
+import datetime
+import math
+
+from custom_components.localvolts.forecast import ForecastStore
+
+UTC = datetime.timezone.utc
+BASE = datetime.datetime(2023, 1, 1, 0, 0, tzinfo=UTC)
+
+
+def _end(n):
+    return BASE + datetime.timedelta(minutes=5 * n)
+
+
+def test_value_at_finds_interval_containing_time():
+    store = ForecastStore(12)
+    store.update([(_end(1), {"costsFlexUp": 10}), (_end(2), {"costsFlexUp": "12"})])
+
+    assert store.value_at("costsFlexUp", BASE) == 10
+    assert store.value_at("costsFlexUp", BASE + datetime.timedelta(minutes=7)) == 12
+    assert store.value_at("costsFlexUp", _end(2)) is None
+    assert store.value_at("earningsFlexUp", BASE) is None
+
+
+def test_update_reports_only_revised_slots():
+    store = ForecastStore(12)
+    assert store.update([(_end(1), {"costsFlexUp": 10}), (_end(2), {"costsFlexUp": 11})]) == 2
+    assert store.update([(_end(1), {"costsFlexUp": 10}), (_end(2), {"costsFlexUp": 9})]) == 1
+
+
+def test_ring_slots_from_an_earlier_lap_read_as_missing():
+    store = ForecastStore(4)
+    store.update([(_end(1), {"costsFlexUp": 10})])
+
+    # _end(5) lands in the same slot as _end(1)
+    store.update([(_end(5), {"costsFlexUp": 20})])
+
+    assert store.value_at("costsFlexUp", BASE) is None
+    assert store.value_at("costsFlexUp", _end(4)) == 20
+
+
+def test_next_intervals_and_series():
+    store = ForecastStore(12)
+    store.update([(_end(n), {"costsFlexUp": n}) for n in (1, 2, 4)])
+
+    intervals = store.next_intervals("costsFlexUp", BASE, 4)
+    series = store.series("costsFlexUp", BASE, 4)
+
+    assert intervals == [(_end(1), 1), (_end(2), 2), (_end(3), None), (_end(4), 4)]
+    assert list(series[:2]) == [1, 2] and math.isnan(series[2])
+    assert store.horizon_end(BASE) == _end(2)
@@ -0,0 +1,21 @@
+from custom_components.localvolts.metrics import MetricsRecorder, percentiles
+
+
+def test_percentiles_use_nearest_rank():
+    summary = percentiles(range(1, 101))
+    assert summary == {"count": 100, "max": 100, "p50": 50, "p95": 95, "p99": 99}
+    assert percentiles([7.0]) == {"count": 1, "max": 7.0, "p50": 7.0, "p95": 7.0, "p99": 7.0}
+    assert percentiles([]) is None
+
+
+def test_recorder_keeps_only_recent_samples():
+    metrics = MetricsRecorder(size=3)
+    for value in (100, 1, 2, 3):
+        metrics.observe("lag", value)
+    metrics.increment("requests")
+    metrics.increment("requests", 2)
+
+    assert list(metrics.samples["lag"]) == [1, 2, 3]
+    assert metrics.summary("lag")["max"] == 3
+    assert metrics.summary("missing") is None
+    assert metrics.as_dict()["counters"] == {"requests": 3}
@@ -0,0 +1,52 @@
+import datetime
+
+import pytest
+
+from custom_components.localvolts.models import IntervalRecord, parse_number
+
+UTC = datetime.timezone.utc
+END = datetime.datetime(2023, 1, 1, 0, 5, tzinfo=UTC)
+UPDATED = datetime.datetime(2023, 1, 1, 0, 0, 21, tzinfo=UTC)
+
+
+def test_record_converts_fields_once():
+    item = {
+        "quality": "Exp",
+        "intervalEnd": "2023-01-01T00:05:00Z",
+        "lastUpdate": "2023-01-01T00:00:21Z",
+        "costsFlexUp": 23.4567,
+        "earningsFlexUp": "-1.5",
+        "costsAll": 12.345,
+        "importsAll": 0.2,
+        "exportsAll": None,
+        "demandInterval": 1,
+    }
+
+    record = IntervalRecord(item, END, UPDATED)
+
+    assert record.quality == "exp"
+    assert record.costs_flex_up == 0.235
+    assert record.earnings_flex_up == -0.015
+    assert record.costs_all == 0.12
+    assert record.imports_all == 0.2
+    assert record.exports_all is None
+    assert record.demand_interval == 1
+    assert record.attributes["intervalEnd"] == END.isoformat()
+    assert record.attributes["lastUpdate"] == UPDATED.isoformat()
+    assert record["costsAll"] == 12.345
+    assert record.get("missing", "x") == "x"
+
+
+def test_record_has_no_instance_dict():
+    record = IntervalRecord({}, END, UPDATED)
+
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+
+def test_parse_number_accepts_numbers_and_numeric_strings():
+    assert parse_number(3) == 3.0
+    assert parse_number("2.5") == 2.5
+    assert parse_number(None) is None
+    assert parse_number("n/a") is None
+    assert parse_number([1]) is None
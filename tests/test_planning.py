@@ -0,0 +1,98 @@
+import datetime
+import math
+
+import numpy as np
+
+from custom_components.localvolts.forecast import ForecastStore
+from custom_components.localvolts.planning import (
+    cheapest_contiguous,
+    cheapest_split,
+    find_cheapest_window,
+    resample_power,
+    simulate_profiles,
+)
+
+UTC = datetime.timezone.utc
+BASE = datetime.datetime(2023, 1, 1, tzinfo=UTC)
+
+
+def test_cheapest_contiguous_skips_windows_with_missing_prices():
+    prices = np.array([5.0, 1.0, math.nan, 1.0, 2.0, 9.0, 2.0])
+
+    assert cheapest_contiguous(prices, 2) == 3
+    assert cheapest_contiguous(prices, 8) is None
+
+
+def test_cheapest_split_returns_sorted_cheapest_indices():
+    prices = np.array([5.0, 1.0, math.nan, 0.5, 7.0, 2.0])
+
+    assert list(cheapest_split(prices, 3)) == [1, 3, 5]
+    assert cheapest_split(prices, 6) is None
+
+
+def test_find_cheapest_window_respects_deadline():
+    store = ForecastStore(48)
+    prices = [30, 20, 10, 12, 25, 1, 1]
+    store.update(
+        (BASE + datetime.timedelta(minutes=5 * (n + 1)), {"costsFlexUp": price})
+        for n, price in enumerate(prices)
+    )
+    now = BASE + datetime.timedelta(seconds=30)
+
+    window = find_cheapest_window(
+        store, "costsFlexUp", now, BASE + datetime.timedelta(minutes=25), 2
+    )
+    split = find_cheapest_window(
+        store,
+        "costsFlexUp",
+        now,
+        BASE + datetime.timedelta(minutes=35),
+        3,
+        contiguous=False,
+    )
+
+    assert window["start"] == BASE + datetime.timedelta(minutes=10)
+    assert window["end"] == BASE + datetime.timedelta(minutes=20)
+    assert window["average_price"] == 11
+    assert [i["price"] for i in split["intervals"]] == [10, 1, 1]
+
+
+def test_find_cheapest_window_skips_interval_in_progress():
+    store = ForecastStore(48)
+    store.update(
+        (BASE + datetime.timedelta(minutes=5 * (n + 1)), {"costsFlexUp": price})
+        for n, price in enumerate([1, 20, 10])
+    )
+    deadline = BASE + datetime.timedelta(minutes=15)
+
+    # 00:00-00:05 is the cheapest but already under way at 00:02
+    late = find_cheapest_window(
+        store, "costsFlexUp", BASE + datetime.timedelta(minutes=2), deadline, 1
+    )
+    on_time = find_cheapest_window(store, "costsFlexUp", BASE, deadline, 1)
+
+    assert late["start"] == BASE + datetime.timedelta(minutes=10)
+    assert late["average_price"] == 10
+    assert on_time["start"] == BASE
+
+
+def test_simulate_profiles_prices_imports_and_exports():
+    import_prices = np.array([10.0, 20.0, math.nan])
+    export_prices = np.array([5.0, 8.0, 6.0])
+    # 6 kW for 5 minutes is 0.5 kWh
+    power = np.array([[6.0, 6.0, 0.0], [-12.0, 0.0, 6.0]])
+
+    result = simulate_profiles(power, import_prices, export_prices)
+
+    assert list(result["total_cost"]) == [15.0, 0.0]
+    assert list(result["total_earnings"]) == [0.0, 5.0]
+    assert list(result["cost"][0]) == [5.0, 10.0, 0.0]
+    # The second profile imports when the import price is missing
+    assert list(result["missing"]) == [False, False, True]
+
+
+def test_resample_power_weights_by_time_held():
+    # 2 kW from before the start, 4 kW from 2.5 minutes in, off at 7.5 minutes
+    means = resample_power(np.array([-100.0, 150.0, 450.0]), np.array([2.0, 4.0, 0.0]), 3)
+
+    assert list(means) == [3.0, 2.0, 0.0]
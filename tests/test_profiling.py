@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.localvolts.profiling import CycleProfiler
+from custom_components.localvolts.timeparse import parse_timestamp
+
+
+class _Coordinator:
+    def __init__(self):
+        self.refreshes = 0
+
+    async def async_refresh(self):
+        self.refreshes += 1
+        parse_timestamp("2024-05-01T00:05:00Z")
+
+
+def _hass():
+    hass = MagicMock()
+    hass.async_add_executor_job = lambda func, *args: func(*args)
+    return hass
+
+
+@pytest.mark.asyncio
+async def test_profiles_cycles_then_restores_refresh(tmp_path):
+    coordinator = _Coordinator()
+    path = tmp_path / "profile.txt"
+    profiler = CycleProfiler(_hass(), [coordinator], 2, str(path))
+    profiler.attach()
+
+    assert "async_refresh" in coordinator.__dict__
+    await coordinator.async_refresh()
+    assert not profiler.finished
+    await coordinator.async_refresh()
+
+    # Back to the plain method once the cycles are done
+    assert profiler.finished
+    assert "async_refresh" not in coordinator.__dict__
+    await coordinator.async_refresh()
+    assert coordinator.refreshes == 3
+
+    functions = [row["function"] for row in profiler.summary]
+    assert any("parse_timestamp" in name for name in functions)
+    report = path.read_text()
+    assert "2 refresh cycle(s)" in report
+    assert "parse_timestamp" in report
+
+
+@pytest.mark.asyncio
+async def test_stop_before_any_cycle_writes_nothing(tmp_path):
+    coordinator = _Coordinator()
+    path = tmp_path / "profile.txt"
+    profiler = CycleProfiler(_hass(), [coordinator], 5, str(path))
+    profiler.attach()
+
+    profiler.stop()
+
+    assert profiler.finished
+    assert profiler.summary == []
+    assert "async_refresh" not in coordinator.__dict__
+    assert not path.exists()
@@ -0,0 +1,130 @@
+import datetime
+
+import pytest
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.localvolts.ratelimit import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    RequestScheduler,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_parse_retry_after_seconds_and_dates():
+    now = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+    assert parse_retry_after({"Retry-After": "7"}) == 7
+    assert parse_retry_after({"Retry-After": "Sun, 01 Jan 2023 00:00:20 GMT"}, now) == 20
+    assert parse_retry_after({"Retry-After": "100000"}) == 300
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after({}) is None
+
+
+def test_token_bucket_refills_and_keeps_reserve():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=3, clock=clock)
+
+    assert bucket.take(reserve=1) == 0
+    assert bucket.take(reserve=1) == 0
+    assert bucket.take(reserve=1) == pytest.approx(1.0)
+    assert bucket.take() == 0
+    clock.now += 0.5
+    assert bucket.take() == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_background_requests_wait_while_critical_uses_reserve():
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=1.0, burst=2, reserve=1, clock=clock, sleep=clock.sleep)
+
+    await scheduler.async_acquire()
+    await scheduler.async_acquire(critical=True)
+    assert clock.now == 0
+    await scheduler.async_acquire()
+    assert clock.now == pytest.approx(2.0)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_honours_server_backoff():
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+
+    scheduler.defer(5)
+    await scheduler.async_acquire(critical=True)
+    assert clock.now == 5
+
+    scheduler.defer(120)
+    with pytest.raises(UpdateFailed):
+        await scheduler.async_acquire(critical=True)
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_refuses_before_taking_a_token():
+    clock = FakeClock()
+    scheduler = RequestScheduler(burst=2, clock=clock, sleep=clock.sleep)
+    for _ in range(scheduler.breaker.threshold):
+        scheduler.record_failure()
+
+    with pytest.raises(UpdateFailed):
+        await scheduler.async_acquire(critical=True)
+    assert scheduler.bucket.tokens == 2
+
+
+def test_request_from_before_the_circuit_opened_does_not_release_the_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=1, open_time=10, clock=clock)
+
+    earlier = breaker.allow()
+    breaker.record_failure()
+    clock.now += 13
+    probe = breaker.allow()
+    assert probe and breaker.state == HALF_OPEN
+
+    # The earlier request finishes while the probe is still out
+    breaker.release(earlier)
+    assert not breaker.allow()
+
+    breaker.release(probe)
+    assert breaker.allow()
+
+
+def test_breaker_opens_then_probes_once():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=2, open_time=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now += 13
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    # A failed probe reopens for longer
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now += 13
+    assert not breaker.allow()
+    clock.now += 13
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
@@ -0,0 +1,139 @@
+import datetime
+from unittest.mock import MagicMock
+
+from custom_components.localvolts.accumulators import IntervalAccumulator
+from custom_components.localvolts.forecast import ForecastStore
+from custom_components.localvolts.metrics import MetricsRecorder
+from custom_components.localvolts.models import IntervalRecord
+from custom_components.localvolts.sensor import (
+    ACTUAL_COST,
+    COSTS_FLEX_UP,
+    ENERGY_USED,
+    LIFETIME,
+    TODAY,
+    LocalvoltsActualCostSensor,
+    LocalvoltsCheapestImportSensor,
+    LocalvoltsCostsFlexUpSensor,
+    LocalvoltsIntervalEndSensor,
+    LocalvoltsMetricSensor,
+    LocalvoltsNextPriceSensor,
+    LocalvoltsTotalSensor,
+)
+
+UTC = datetime.timezone.utc
+BASE = datetime.datetime(2023, 1, 1, tzinfo=UTC)
+
+
+def _coordinator():
+    coordinator = MagicMock()
+    coordinator.nmi_id = "nmi"
+    coordinator.accumulator = IntervalAccumulator()
+    coordinator.forecast_hours = 1
+    coordinator.forecast = ForecastStore(24)
+    return coordinator
+
+
+def test_total_sensors_report_dollars_and_kwh():
+    coordinator = _coordinator()
+    coordinator.accumulator.add(
+        BASE + datetime.timedelta(minutes=5), {"costsAll": 123.4, "importsAll": 0.25}
+    )
+
+    cost_today = LocalvoltsTotalSensor(coordinator, ACTUAL_COST, TODAY)
+    energy_total = LocalvoltsTotalSensor(coordinator, ENERGY_USED, LIFETIME)
+
+    assert cost_today.native_value == 1.23
+    assert cost_today.last_reset == BASE
+    assert energy_total.native_value == 0.25
+    assert energy_total.last_reset is None
+
+
+def test_forecast_sensors_read_from_store(monkeypatch):
+    monkeypatch.setattr(
+        "custom_components.localvolts.sensor.dt_util.utcnow", lambda: BASE
+    )
+    coordinator = _coordinator()
+    coordinator.intervalEnd = BASE + datetime.timedelta(minutes=5)
+    coordinator.forecast.update(
+        (BASE + datetime.timedelta(minutes=5 * n), {"costsFlexUp": price})
+        for n, price in ((1, 30), (2, 25), (3, 5), (4, 12))
+    )
+
+    next_price = LocalvoltsNextPriceSensor(coordinator, COSTS_FLEX_UP)
+    cheapest = LocalvoltsCheapestImportSensor(coordinator)
+
+    assert next_price.native_value == 0.25
+    assert next_price.extra_state_attributes == {
+        "intervalEnd": (BASE + datetime.timedelta(minutes=10)).isoformat()
+    }
+    assert cheapest.native_value == 0.05
+    assert cheapest.extra_state_attributes == {
+        "intervalEnd": (BASE + datetime.timedelta(minutes=15)).isoformat()
+    }
+
+
+def test_interval_sensors_read_the_record():
+    coordinator = _coordinator()
+    end = BASE + datetime.timedelta(minutes=5)
+    coordinator.intervalEnd = end
+    coordinator.data = IntervalRecord(
+        {"costsFlexUp": 25.0, "costsAll": 3.456, "demandInterval": 0}, end, BASE
+    )
+
+    price = LocalvoltsCostsFlexUpSensor(coordinator)
+    cost = LocalvoltsActualCostSensor(coordinator)
+    interval_end = LocalvoltsIntervalEndSensor(coordinator)
+
+    assert price.native_value == 0.25
+    assert price.extra_state_attributes == {
+        "intervalEnd": end.isoformat(),
+        "lastUpdate": BASE.isoformat(),
+        "demandInterval": 0,
+    }
+    assert cost.native_value == 0.03
+    assert interval_end.extra_state_attributes["costsAll"] == 3.456
+    assert interval_end.native_value == end
+
+
+def test_interval_sensor_skips_unchanged_writes():
+    coordinator = _coordinator()
+    end = BASE + datetime.timedelta(minutes=5)
+    coordinator.last_update_success = True
+    coordinator.data = IntervalRecord({"costsFlexUp": 25.0}, end, BASE)
+    coordinator.interval_changed = True
+
+    price = LocalvoltsCostsFlexUpSensor(coordinator)
+    price.async_write_ha_state = MagicMock()
+
+    price._handle_coordinator_update()
+    attributes = price.extra_state_attributes
+    coordinator.interval_changed = False
+    price._handle_coordinator_update()
+    assert price.async_write_ha_state.call_count == 1
+
+    # A new record with the same values does not write either
+    coordinator.data = IntervalRecord({"costsFlexUp": 25.0}, end, BASE)
+    coordinator.interval_changed = True
+    price._handle_coordinator_update()
+    assert price.async_write_ha_state.call_count == 1
+
+    coordinator.data = IntervalRecord(
+        {"costsFlexUp": 30.0}, end + datetime.timedelta(minutes=5), end
+    )
+    price._handle_coordinator_update()
+    assert price.async_write_ha_state.call_count == 2
+    assert price.extra_state_attributes is not attributes
+
+
+def test_metric_sensor_reports_scaled_percentiles():
+    coordinator = _coordinator()
+    coordinator.client.metrics = MetricsRecorder()
+    for latency in (0.1, 0.2, 0.4):
+        coordinator.client.metrics.observe("request_latency", latency)
+
+    sensor = LocalvoltsMetricSensor(coordinator, "request_latency")
+
+    assert sensor.native_value == 400
+    assert sensor.extra_state_attributes["p50"] == 200
+    assert sensor.extra_state_attributes["count"] == 3
+    assert sensor.entity_registry_enabled_default is False
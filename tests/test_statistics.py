@@ -0,0 +1,76 @@
+import datetime
+
+import pytest
+
+from custom_components.localvolts.statistics import (
+    StatisticsBatch,
+    async_hourly_values,
+    hour_start,
+    import_end,
+    statistic_metadata,
+)
+
+UTC = datetime.timezone.utc
+BASE = datetime.datetime(2023, 1, 1, tzinfo=UTC)
+
+
+async def _pairs(items):
+    for minutes, item in items:
+        yield BASE + datetime.timedelta(minutes=minutes), item
+
+
+def test_hour_start_places_interval_by_its_end():
+    assert hour_start(BASE + datetime.timedelta(minutes=5)) == BASE
+    assert hour_start(BASE + datetime.timedelta(hours=1)) == BASE
+    assert hour_start(BASE + datetime.timedelta(minutes=65)) == BASE + datetime.timedelta(hours=1)
+
+
+@pytest.mark.asyncio
+async def test_hourly_values_dedupe_and_prefer_act():
+    items = [
+        (5, {"quality": "exp", "costsAll": 100, "importsAll": 1.0, "costsFlexUp": 20}),
+        (5, {"quality": "act", "costsAll": 50, "importsAll": 0.5, "costsFlexUp": 10}),
+        (10, {"quality": "act", "costsAll": 30, "importsAll": 0.25, "costsFlexUp": 30}),
+        # A duplicate 'exp' arriving later does not replace the 'act' record
+        (10, {"quality": "exp", "costsAll": 999, "importsAll": 9.0, "costsFlexUp": 99}),
+        (65, {"quality": "exp", "costsAll": 10, "exportsAll": 2.0}),
+    ]
+
+    hours = [pair async for pair in async_hourly_values(_pairs(items))]
+
+    assert [hour for hour, _ in hours] == [BASE, BASE + datetime.timedelta(hours=1)]
+    first = hours[0][1]
+    assert first["costsAll"]["state"] == pytest.approx(0.8)
+    assert first["importsAll"]["state"] == pytest.approx(0.75)
+    assert first["costsFlexUp"] == {"mean": 0.2, "min": 0.1, "max": 0.3}
+    assert "exportsAll" not in first
+    assert hours[1][1]["exportsAll"] == {"state": 2.0}
+
+
+def test_batch_carries_running_sums():
+    batch = StatisticsBatch({"costsAll": 10.0})
+    batch.add(BASE, {"costsAll": {"state": 1.0}, "costsFlexUp": {"mean": 0.2, "min": 0.1, "max": 0.3}})
+    first = batch.take()
+    batch.add(BASE + datetime.timedelta(hours=1), {"costsAll": {"state": 2.5}})
+
+    assert first["costsAll"] == [{"start": BASE, "state": 1.0, "sum": 11.0}]
+    assert "sum" not in first["costsFlexUp"][0]
+    assert batch.take()["costsAll"][0]["sum"] == 13.5
+    assert batch.hours == 0
+
+
+def test_metadata_uses_external_statistic_ids():
+    metadata = statistic_metadata("NMI123")
+    assert metadata["costsAll"]["statistic_id"] == "localvolts:nmi123_cost"
+    assert metadata["costsAll"]["has_sum"]
+    assert metadata["earningsFlexUp"]["has_mean"]
+
+
+def test_import_end_is_whole_hours_through_the_stored_history():
+    hour = datetime.timedelta(hours=1)
+    end = BASE + 5 * hour + datetime.timedelta(minutes=40)
+
+    assert import_end(end, None) == BASE + 5 * hour
+    assert import_end(end, BASE + 2 * hour) == BASE + 5 * hour
+    # Hours stored after the range have their running sums rewritten too
+    assert import_end(end, BASE + 9 * hour) == BASE + 10 * hour
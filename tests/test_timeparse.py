@@ -0,0 +1,34 @@
+import datetime
+
+import pytest
+
+from custom_components.localvolts.timeparse import parse_timestamp
+
+UTC = datetime.timezone.utc
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2024-05-03T04:45:00Z", datetime.datetime(2024, 5, 3, 4, 45, tzinfo=UTC)),
+        ("2024-05-03T04:45:00", datetime.datetime(2024, 5, 3, 4, 45, tzinfo=UTC)),
+        (
+            "2024-05-03T04:40:23.125Z",
+            datetime.datetime(2024, 5, 3, 4, 40, 23, 125000, tzinfo=UTC),
+        ),
+        (
+            "2024-05-03T14:45:00+10:00",
+            datetime.datetime(2024, 5, 3, 4, 45, tzinfo=UTC),
+        ),
+    ],
+)
+def test_parse_timestamp_formats(value, expected):
+    parsed = parse_timestamp(value)
+
+    assert parsed == expected
+    assert parsed.tzinfo is not None
+
+
+def test_parse_timestamp_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_timestamp("not a time")